@@ -0,0 +1 @@
+"""Scripts de mesure de performance, à lancer avec `python -m benchmarks.<script>`."""
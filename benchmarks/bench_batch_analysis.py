@@ -0,0 +1,82 @@
+"""
+Compare le débit de MultiModelInterviewAnalyzer entre un appel `run_full_analysis`
+par entretien et un seul appel `run_batch_analysis`, et vérifie que les sorties
+sont identiques.
+
+    python -m benchmarks.bench_batch_analysis --interviews 50 --turns 8
+"""
+import argparse
+import math
+import random
+import time
+
+from src.deep_learning_analyzer import MultiModelInterviewAnalyzer
+from src.model_registry import model_registry
+
+ANSWERS = [
+    "J'ai travaillé trois ans sur des pipelines de données en Python et Airflow.",
+    "Ce poste m'intéresse parce que j'aime les projets à fort impact.",
+    "Est-ce que l'équipe travaille en méthode agile ?",
+    "Je ne suis pas certain de bien comprendre la question, je suis un peu stressé.",
+    "J'ai mis en place une API FastAPI pour servir un modèle de classification.",
+    "Je souhaite évoluer vers des responsabilités de lead technique.",
+    "Quelles sont les prochaines étapes du processus de recrutement ?",
+    "Lors de mon alternance, j'ai automatisé le reporting avec Power BI.",
+]
+JOB_REQUIREMENTS = [
+    "Développeur Python expérimenté en API et traitement de données.",
+    "Data engineer maîtrisant Airflow, SQL et le cloud.",
+    "Data analyst à l'aise avec Power BI et la communication métier.",
+]
+
+
+def make_conversations(n_interviews, n_turns, seed=0):
+    rng = random.Random(seed)
+    conversations, requirements = [], []
+    for _ in range(n_interviews):
+        conversation = []
+        for turn in range(n_turns):
+            conversation.append({"role": "assistant", "content": f"Question {turn + 1} ?"})
+            conversation.append({"role": "user", "content": rng.choice(ANSWERS)})
+        conversations.append(conversation)
+        requirements.append([rng.choice(JOB_REQUIREMENTS)])
+    return conversations, requirements
+
+
+def _same(a, b, tol=1e-4):
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k], tol) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y, tol) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(float(a), float(b), abs_tol=tol)
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--interviews", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=8)
+    args = parser.parse_args()
+
+    conversations, requirements = make_conversations(args.interviews, args.turns)
+    analyzer = MultiModelInterviewAnalyzer()
+    model_registry.warmup()
+
+    start = time.perf_counter()
+    single = [analyzer.run_full_analysis(c, r) for c, r in zip(conversations, requirements)]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = analyzer.run_batch_analysis(conversations, requirements)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"Entretiens : {args.interviews} x {args.turns} tours")
+    print(f"run_full_analysis  : {single_seconds:.2f}s ({args.interviews / single_seconds:.2f} entretiens/s)")
+    print(f"run_batch_analysis : {batch_seconds:.2f}s ({args.interviews / batch_seconds:.2f} entretiens/s)")
+    print(f"Gain : x{single_seconds / batch_seconds:.2f}")
+    print(f"Sorties identiques : {_same(single, batched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare les deux modes de classification d'intention (zero-shot NLI et
+similarité d'embeddings MiniLM) : taux d'accord sur l'intention principale
+et latence par énoncé.
+
+    python -m benchmarks.bench_intent_modes --repeat 3
+"""
+import argparse
+import time
+
+from benchmarks.bench_batch_analysis import ANSWERS
+from src.deep_learning_analyzer import MultiModelInterviewAnalyzer
+from src.model_registry import model_registry
+
+EXTRA_UTTERANCES = [
+    "Pouvez-vous m'en dire plus sur la taille de l'équipe ?",
+    "Honnêtement je ne sais pas trop, je n'ai jamais fait ça.",
+    "J'ai conçu un entrepôt de données sur BigQuery avec dbt.",
+    "Rejoindre votre entreprise serait une vraie opportunité pour moi.",
+]
+
+
+def _time_mode(analyzer, utterances, repeat):
+    analyzer._classify_intents(utterances[:1])  # chauffe
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = analyzer._classify_intents(utterances)
+    elapsed = (time.perf_counter() - start) / (repeat * len(utterances))
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    utterances = ANSWERS + EXTRA_UTTERANCES
+    model_registry.warmup(["similarity_model", "intent_label_embeddings", "intent_classifier"])
+
+    nli_results, nli_latency = _time_mode(MultiModelInterviewAnalyzer(intent_mode="nli"), utterances, args.repeat)
+    emb_results, emb_latency = _time_mode(MultiModelInterviewAnalyzer(intent_mode="embedding"), utterances, args.repeat)
+
+    agreements = 0
+    for text, nli, emb in zip(utterances, nli_results, emb_results):
+        agree = nli["labels"][0] == emb["labels"][0]
+        agreements += agree
+        print(f"[{'=' if agree else '≠'}] {text[:60]:<60} | nli: {nli['labels'][0]} | embedding: {emb['labels'][0]}")
+
+    print(f"\nAccord sur l'intention principale : {agreements}/{len(utterances)} ({agreements / len(utterances):.0%})")
+    print(f"Latence NLI       : {nli_latency * 1000:.1f} ms/énoncé")
+    print(f"Latence embedding : {emb_latency * 1000:.1f} ms/énoncé (x{nli_latency / emb_latency:.1f})")
+
+
+if __name__ == "__main__":
+    main()
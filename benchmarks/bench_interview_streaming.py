@@ -0,0 +1,144 @@
+"""
+Latence perçue d'un tour d'entretien : réponse bloquante (/simulate-interview/)
+contre réponse streamée en SSE (/simulate-interview/stream), avec un modèle de chat
+factice qui émet ses tokens à intervalle fixe. Aucun appel réseau n'est fait.
+
+    python -m benchmarks.bench_interview_streaming --tokens 80 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Iterator, AsyncIterator, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from benchmarks.bench_interview_turn import CV_DOCUMENT, JOB_OFFER
+
+
+class SlowFakeChatModel(GenericFakeChatModel):
+    """
+    Modèle factice qui rejoue la même réponse, un token toutes les `token_delay` secondes,
+    en streaming comme en appel bloquant (qui rend la main après le dernier token).
+    """
+
+    response: str
+    token_delay: float = 0.02
+    messages: Any = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.messages = _repeat(self.response)
+
+    def _next_tokens(self, messages, stop=None, **kwargs) -> List[str]:
+        # Découpage de GenericFakeChatModel._stream (espaces conservés)
+        result = super()._generate(messages, stop=stop, **kwargs)
+        return [token for token in re.split(r"(\s)", result.generations[0].message.content) if token]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._next_tokens(messages, stop=stop, **kwargs)
+        time.sleep(self.token_delay * len(tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._next_tokens(messages, stop=stop, **kwargs)
+        await asyncio.sleep(self.token_delay * len(tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        for token in self._next_tokens(messages, stop=stop, **kwargs):
+            time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        for token in self._next_tokens(messages, stop=stop, **kwargs):
+            await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def _repeat(content):
+    while True:
+        yield AIMessage(content=content)
+
+
+def make_fake_llm(tokens, token_delay):
+    response = " ".join(f"mot{i}" for i in range(tokens))
+    return SlowFakeChatModel(response=response, token_delay=token_delay)
+
+
+def request_body():
+    return {
+        "user_id": "bench", "job_offer_id": "bench", "cv_document": CV_DOCUMENT, "job_offer": JOB_OFFER,
+        "messages": [{"role": "user", "content": "Bonjour"}], "conversation_history": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    import main as api
+    from src.interview_simulator.entretient_version_prod import InterviewProcessor
+
+    fake_llm = make_fake_llm(args.tokens, args.token_delay)
+    api.app.dependency_overrides[api.get_interview_llm] = lambda: fake_llm
+    client = TestClient(api.app)
+
+    # Chemin bloquant : même graphe, invoqué de bout en bout avant de répondre
+    blocking = []
+    for _ in range(args.repeat):
+        processor = InterviewProcessor(CV_DOCUMENT, JOB_OFFER, conversation_history=[], llm=fake_llm)
+        start = time.perf_counter()
+        processor.run([{"role": "user", "content": "Bonjour"}])
+        blocking.append(time.perf_counter() - start)
+
+    first_event, total, server_ttft = [], [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        first = None
+        tokens = []
+        with client.stream("POST", "/simulate-interview/stream", json=request_body()) as response:
+            event_name = None
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    event_name = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event_name == "token":
+                        first = first or time.perf_counter()
+                        tokens.append(data["content"])
+                    elif event_name == "done":
+                        assert "".join(tokens) == data["response"], "Les tokens doivent reconstituer la réponse"
+                        server_ttft.append(data["ttft_ms"])
+                    elif event_name == "error":
+                        raise RuntimeError(data["detail"])
+        first_event.append(first - start)
+        total.append(time.perf_counter() - start)
+
+    median = lambda values: sorted(values)[len(values) // 2]
+    print(f"Réponse de {args.tokens} tokens, {args.token_delay * 1000:.0f} ms/token")
+    print(f"bloquant       : première donnée après {median(blocking) * 1000:.0f} ms")
+    # TestClient rend le corps d'un bloc : côté client, le premier token arrive avec le dernier
+    print(f"SSE streamé    : premier token émis après {median(server_ttft):.0f} ms (TTFT serveur), "
+          f"reçu par TestClient après {median(first_event) * 1000:.0f} ms, fin après {median(total) * 1000:.0f} ms")
+    print(f"/interview/streaming-stats/ : {client.get('/interview/streaming-stats/').json()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Surcoût par tour de /simulate-interview/ hors appel LLM : reconstruction complète
+à chaque requête (client, bind_tools, lecture du prompt, compilation du graphe,
+rendu du prompt) contre graphe compilé une fois et prompt mis en cache.
+
+    python -m benchmarks.bench_interview_turn --turns 20 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_core.messages import SystemMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.prebuilt import ToolNode
+
+from src.config import read_system_prompt, format_cv
+from src.interview_simulator import entretient_version_prod as interview
+from src.prompt_layout import assemble
+
+CV_DOCUMENT = {
+    "candidat": {
+        "informations_personnelles": {"nom": "Jane Doe", "email": "jane@example.com"},
+        "compétences": {"hard_skills": ["Python", "FastAPI", "Docker", "SQL"], "soft_skills": ["Rigueur"]},
+        "expériences": [
+            {"poste": f"Développeuse {i}", "entreprise": f"Société {i}", "start_date": "2018", "end_date": "2021",
+             "responsabilités": ["API REST", "Tests", "CI/CD"]}
+            for i in range(5)
+        ],
+        "formations": [{"diplome": "Master Informatique", "ecole": "Université", "annee": "2018"}],
+        "projets": [{"titre": f"Projet {i}", "description": "Plateforme de données"} for i in range(5)],
+    }
+}
+JOB_OFFER = {
+    "entreprise": "ACME", "poste": "Développeur Python", "mission": "Concevoir des API",
+    "profil_recherche": "3 ans d'expérience", "competences": "Python, Docker", "pole": "Data",
+}
+
+
+def legacy_turn():
+    """Ce que faisait chaque requête avant la mise en cache."""
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(temperature=0.6, model_name="gpt-4o-mini", api_key=os.environ["OPENAI_API_KEY"])
+    llm.bind_tools(interview.TOOLS)
+    instructions = read_system_prompt(interview.INSTRUCTIONS_PATH)
+    template = read_system_prompt(interview.CONTEXT_TEMPLATE_PATH)
+    builder = StateGraph(interview.State)
+    builder.add_node("chatbot", lambda state: state)
+    builder.add_node("call_tool", ToolNode(interview.TOOLS))
+    builder.add_edge(START, "chatbot")
+    builder.add_conditional_edges("chatbot", lambda state: END, {"call_tool": "call_tool", END: END})
+    builder.add_edge("call_tool", "chatbot")
+    builder.compile()
+    cv_data = CV_DOCUMENT["candidat"]
+    context = template.format(
+        entreprise=JOB_OFFER.get("entreprise", "notre entreprise"),
+        poste=JOB_OFFER.get("poste", "ce poste"),
+        mission=JOB_OFFER.get("mission", "Non spécifiée"),
+        profil_recherche=JOB_OFFER.get("profil_recherche", "Non spécifié"),
+        competences=JOB_OFFER.get("competences", "Non spécifiées"),
+        pole=JOB_OFFER.get("pole", "Non spécifié"),
+        cv=format_cv(cv_data),
+    )
+    return SystemMessage(content=assemble(instructions, context))
+
+
+def cached_turn():
+    processor = interview.InterviewProcessor(CV_DOCUMENT, JOB_OFFER, conversation_history=[])
+    interview.get_llm_with_tools()
+    return SystemMessage(content=processor.system_prompt)
+
+
+def measure(fn, turns, repeat):
+    per_turn = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(turns):
+            fn()
+        per_turn.append((time.perf_counter() - start) / turns)
+    return statistics.median(per_turn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20, help="Tours d'un même entretien")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    assert legacy_turn().content == cached_turn().content, "Le prompt rendu doit être identique"
+
+    legacy = measure(legacy_turn, args.turns, args.repeat)
+    cached = measure(cached_turn, args.turns, args.repeat)
+    print(f"Entretien de {args.turns} tours, médiane sur {args.repeat} répétitions")
+    print(f"reconstruction par tour : {legacy * 1000:.2f} ms/tour")
+    print(f"graphe et prompt en cache : {cached * 1000:.3f} ms/tour  (x{legacy / cached:.0f})")
+    print(f"cache des prompts : {interview.prompt_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Appels LLM concurrents contre le serveur factice (benchmarks/mock_openai_server.py),
+démarré dans ce processus : ancien chemin (un ChatOpenAI et un client HTTP par
+requête, réessais du SDK) contre clients partagés et gouvernés de `src.llm_clients`.
+
+Le serveur renvoie 429 au-delà de `--server-limit` requêtes simultanées : sans
+limite côté client, une partie des appels échoue (500 côté API) ; avec, ils attendent.
+
+    python -m benchmarks.bench_llm_clients --requests 100 --server-limit 8 --client-limit 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+PORT = 8765
+
+
+def start_mock_server(port, latency, server_limit):
+    import uvicorn
+
+    from benchmarks.mock_openai_server import create_app
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(latency=latency, max_concurrency=server_limit, retry_after=latency),
+        host="127.0.0.1", port=port, log_level="warning",
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_calls(make_llm, n_requests):
+    from langchain_core.messages import HumanMessage
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await make_llm().ainvoke([HumanMessage(content="Bonjour, je suis prêt pour l'entretien.")])
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, type(e).__name__
+
+    return await asyncio.gather(*(one() for _ in range(n_requests)))
+
+
+def report(label, results, elapsed, server_stats):
+    latencies = sorted(duration for duration, error in results if error is None)
+    errors = [error for _, error in results if error is not None]
+    p50 = statistics.median(latencies) if latencies else float("nan")
+    print(f"{label:<10} {len(latencies):>4} succès, {len(errors):>4} échecs {sorted(set(errors))}  "
+          f"p50 {p50:.2f}s  total {elapsed:.2f}s  429 reçus {server_stats['rate_limited']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="Latence du serveur factice (s)")
+    parser.add_argument("--server-limit", type=int, default=8, help="Concurrence au-delà de laquelle le serveur répond 429")
+    parser.add_argument("--client-limit", type=int, default=8, help="LLM_MAX_CONCURRENCY côté client")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{PORT}/v1"
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-bench", "LLM_BASE_URL": base_url,
+        "LLM_MAX_CONCURRENCY": str(args.client_limit), "LLM_QUEUE_TIMEOUT_SECONDS": "300",
+    })
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+    from src import llm_clients
+
+    server = start_mock_server(PORT, args.latency, args.server_limit)
+    stats_url = f"http://127.0.0.1:{PORT}/stats"
+
+    legacy = lambda: ChatOpenAI(model="gpt-4o-mini", temperature=0.6, base_url=base_url)
+    shared = llm_clients.create_chat_llm("gpt-4o-mini", temperature=0.6)
+    for label, make_llm in (("legacy", legacy), ("governed", lambda: shared)):
+        before = httpx.get(stats_url).json()
+        start = time.perf_counter()
+        results = asyncio.run(run_calls(make_llm, args.requests))
+        elapsed = time.perf_counter() - start
+        after = httpx.get(stats_url).json()
+        report(label, results, elapsed, {key: after[key] - before[key] for key in ("rate_limited", "requests")})
+        # Le client async partagé est lié à la boucle qui vient de se fermer
+        llm_clients.get_async_http_client.cache_clear()
+        shared = llm_clients.create_chat_llm("gpt-4o-mini", temperature=0.6)
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare les backends d'inférence PyTorch fp32 et ONNX Runtime int8 :
+écart de précision (labels, scores, embeddings), latence et RSS.
+
+Chaque backend tourne dans un sous-processus pour que le RSS mesuré ne
+mélange pas les deux. Les artefacts ONNX doivent avoir été exportés au
+préalable avec `python -m src.onnx_backend export`.
+
+    python -m benchmarks.bench_onnx_backend --repeat 5
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_batch_analysis import ANSWERS
+
+
+def _timed(fn, repeat):
+    result = fn()  # chauffe
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def run_worker(repeat):
+    """Exécuté dans le sous-processus, avec INFERENCE_BACKEND déjà positionné."""
+    from src.deep_learning_analyzer import MultiModelInterviewAnalyzer, CANDIDATE_LABELS
+
+    analyzer = MultiModelInterviewAnalyzer()
+    sentiments, sentiment_latency = _timed(lambda: analyzer.sentiment_analyzer(ANSWERS), repeat)
+    intents, intent_latency = _timed(
+        lambda: analyzer.intent_classifier(ANSWERS, CANDIDATE_LABELS, multi_label=False), repeat
+    )
+    embeddings, embedding_latency = _timed(lambda: analyzer.similarity_model.encode(ANSWERS).tolist(), repeat)
+    return {
+        "sentiments": [{r["label"]: r["score"] for r in result} for result in sentiments],
+        "intents": [dict(zip(r["labels"], r["scores"])) for r in intents],
+        "embeddings": embeddings,
+        "latency_ms": {
+            "sentiment": sentiment_latency * 1000,
+            "intent": intent_latency * 1000,
+            "embedding": embedding_latency * 1000,
+        },
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run_backend(backend, repeat):
+    env = dict(os.environ, INFERENCE_BACKEND=backend)
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_onnx_backend", "--worker", "--repeat", str(repeat)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _top(scores):
+    return max(scores, key=scores.get)
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+
+def _accuracy_delta(reference, candidate):
+    report = {}
+    for key in ("sentiments", "intents"):
+        pairs = list(zip(reference[key], candidate[key]))
+        report[f"{key}_top1_agreement"] = sum(_top(r) == _top(c) for r, c in pairs) / len(pairs)
+        report[f"{key}_max_abs_score_delta"] = max(abs(r[label] - c[label]) for r, c in pairs for label in r)
+    cosines = [_cosine(r, c) for r, c in zip(reference["embeddings"], candidate["embeddings"])]
+    report["embeddings_min_cosine"] = min(cosines)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat)))
+        return
+
+    torch_results = _run_backend("torch", args.repeat)
+    onnx_results = _run_backend("onnx", args.repeat)
+
+    print(f"{'':<12}{'torch':>12}{'onnx':>12}")
+    for stage in ("sentiment", "intent", "embedding"):
+        t, o = torch_results["latency_ms"][stage], onnx_results["latency_ms"][stage]
+        print(f"{stage + ' (ms)':<12}{t:>12.1f}{o:>12.1f}")
+    print(f"{'RSS (Mo)':<12}{torch_results['max_rss_mb']:>12.0f}{onnx_results['max_rss_mb']:>12.0f}")
+    print("\nÉcart de précision (onnx vs torch) :")
+    for name, value in _accuracy_delta(torch_results, onnx_results).items():
+        print(f"  {name}: {value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
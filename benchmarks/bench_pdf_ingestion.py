@@ -0,0 +1,87 @@
+"""
+Compare l'ancienne lecture des CV (fichier temporaire + PyPDFLoader.load_and_split
++ concaténation par `+=`) à l'extraction en mémoire de `src.pdf_ingestion`.
+
+    python -m benchmarks.bench_pdf_ingestion chemin/vers/pdfs --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.pdf_ingestion import extract_pdf_text
+
+
+def legacy_load(pdf_bytes):
+    """Reproduit le chemin historique de /parse-cv/."""
+    from langchain_community.document_loaders import PyPDFLoader
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(pdf_bytes)
+        path = tmp.name
+    try:
+        pages = PyPDFLoader(path).load_and_split()
+        text = ""
+        for page in pages:
+            text += page.page_content + "\n\n"
+        return text
+    finally:
+        os.remove(path)
+
+
+def in_memory_load(pdf_bytes):
+    return extract_pdf_text(pdf_bytes)
+
+
+def load_corpus(directory):
+    files = sorted(Path(directory).glob("**/*.pdf"))
+    if not files:
+        sys.exit(f"Aucun PDF trouvé dans {directory}")
+    return [(f.name, f.read_bytes()) for f in files]
+
+
+def measure(fn, corpus, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, pdf_bytes in corpus:
+            fn(pdf_bytes)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Répertoire contenant les PDF d'exemple")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne mesure que l'extraction en mémoire")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    total_mb = sum(len(b) for _, b in corpus) / 1024 ** 2
+    print(f"{len(corpus)} PDF, {total_mb:.1f} Mo au total")
+
+    variants = [("in-memory", in_memory_load)]
+    if not args.skip_legacy:
+        variants.insert(0, ("legacy", legacy_load))
+        # Le texte extrait peut différer (load_and_split redécoupe les pages), on signale seulement l'écart
+        mismatches = [name for name, b in corpus if legacy_load(b).split() != in_memory_load(b).split()]
+        if mismatches:
+            print(f"Texte différent pour {len(mismatches)} PDF : {', '.join(mismatches[:5])}")
+
+    results = {}
+    for label, fn in variants:
+        durations = measure(fn, corpus, args.repeat)
+        results[label] = statistics.median(durations)
+        per_pdf_ms = results[label] / len(corpus) * 1000
+        print(f"{label:<10} médiane {results[label]:.3f}s  ({per_pdf_ms:.1f} ms/PDF)")
+
+    if "legacy" in results:
+        print(f"Gain : x{results['legacy'] / results['in-memory']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compare le scoring historique (un json.dumps et un str.count par compétence) au
+scoring indexé de `ContextualScoringEngine`, sur des CV synthétiques volumineux.
+Vérifie au passage que `analyse_competences` est strictement identique.
+
+    python -m benchmarks.bench_scoring_engine --skills 200 --experiences 60 --repeat 5
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from src.scoring_engine import ALPHA, BETA, GAMMA, CONTEXT_WEIGHTS, ContextualScoringEngine
+
+VOCABULARY = [
+    "python", "java", "javascript", "c", "c++", "c#", "go", "sql", "nosql", "docker", "kubernetes",
+    "aws", "gcp", "azure", "react", "vue", "angular", "node", "django", "flask", "fastapi", "spark",
+    "pandas", "numpy", "pytorch", "tensorflow", "scikit-learn", "git", "linux", "terraform", "r",
+]
+FILLER = "projet équipe développement mise en production amélioration des performances client données".split()
+
+
+def legacy_calculate_scores(engine):
+    """Copie de l'implémentation d'origine, référence pour l'égalité des sorties."""
+    cv_data = engine.cv_data
+    skills = cv_data.get("compétences", {}).get("hard_skills", [])
+    if not skills:
+        return {}
+    scored_skills = []
+    for skill in skills:
+        skill_lower = skill.lower()
+        contexts = []
+        if skill_lower in json.dumps(cv_data.get("formations", []), ensure_ascii=False).lower():
+            contexts.append(CONTEXT_WEIGHTS["formations"])
+        if skill_lower in json.dumps(cv_data.get("projets", []), ensure_ascii=False).lower():
+            contexts.append(CONTEXT_WEIGHTS["projets"])
+        if skill_lower in json.dumps(cv_data.get("expériences", []), ensure_ascii=False).lower():
+            contexts.append(CONTEXT_WEIGHTS["expériences"])
+        if len(contexts) > 1:
+            context_score = CONTEXT_WEIGHTS["multiple"]
+        elif contexts:
+            context_score = contexts[0]
+        else:
+            context_score = 0.1
+        frequency_score = engine.full_text.count(skill_lower)
+        max_duration = 0
+        for exp in cv_data.get("expériences", []):
+            if skill_lower in json.dumps(exp, ensure_ascii=False).lower():
+                duration = engine._calculate_duration_in_years(exp.get("start_date"), exp.get("end_date"))
+                if duration > max_duration:
+                    max_duration = duration
+        depth_score = max_duration
+        normalized_frequency = 1 - (1 / (1 + frequency_score))
+        normalized_depth = 1 - (1 / (1 + depth_score))
+        final_score = (ALPHA * context_score) + (BETA * normalized_frequency) + (GAMMA * normalized_depth)
+        scored_skills.append({
+            "skill": skill,
+            "score": round(final_score, 2),
+            "details": {
+                "context_score": context_score,
+                "frequency": frequency_score,
+                "max_duration_years": round(depth_score, 1),
+            },
+        })
+    scored_skills.sort(key=lambda x: x["score"], reverse=True)
+    return {"analyse_competences": scored_skills}
+
+
+def _sentence(rng, words=40):
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for _ in range(words // 8):
+        tokens.insert(rng.randrange(len(tokens)), rng.choice(VOCABULARY).upper() if rng.random() < 0.2 else rng.choice(VOCABULARY))
+    return " ".join(tokens)
+
+
+def make_cv(n_skills, n_experiences, seed=0):
+    rng = random.Random(seed)
+    skills = list(VOCABULARY)
+    while len(skills) < n_skills:
+        skills.append(f"{rng.choice(VOCABULARY)}-{rng.choice(FILLER)}")
+    skills = skills[:n_skills] + ["Python", "aa", "aaa"]
+    rng.shuffle(skills)
+    return {
+        "candidat": {
+            "compétences": {"hard_skills": skills},
+            "formations": [{"diplome": _sentence(rng, 10), "ecole": _sentence(rng, 5)} for _ in range(4)],
+            "projets": [{"titre": _sentence(rng, 6), "description": _sentence(rng) + " aaaaa"} for _ in range(10)],
+            "expériences": [
+                {
+                    "poste": _sentence(rng, 6),
+                    "description": _sentence(rng, 80),
+                    "start_date": str(rng.randint(2005, 2020)),
+                    "end_date": rng.choice(["2022", "2023", "Aujourd'hui", "non spécifié"]),
+                }
+                for _ in range(n_experiences)
+            ],
+        }
+    }
+
+
+def measure(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--experiences", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seeds", type=int, default=20, help="Nombre de CV aléatoires pour la vérification d'égalité")
+    args = parser.parse_args()
+
+    for seed in range(args.seeds):
+        cv = make_cv(args.skills // 4 or 1, args.experiences // 4 or 1, seed=seed)
+        assert ContextualScoringEngine(cv).calculate_scores() == legacy_calculate_scores(ContextualScoringEngine(cv)), seed
+    print(f"Sorties identiques sur {args.seeds} CV aléatoires")
+
+    cv = make_cv(args.skills, args.experiences)
+    size_kb = len(json.dumps(cv, ensure_ascii=False)) / 1024
+    legacy = measure(lambda: legacy_calculate_scores(ContextualScoringEngine(cv)), args.repeat)
+    indexed = measure(lambda: ContextualScoringEngine(cv).calculate_scores(), args.repeat)
+    print(f"CV de {size_kb:.0f} Ko, {args.skills} compétences, {args.experiences} expériences")
+    print(f"historique : {legacy * 1000:.1f} ms")
+    print(f"indexé     : {indexed * 1000:.1f} ms  (x{legacy / indexed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
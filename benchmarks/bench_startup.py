@@ -0,0 +1,96 @@
+"""
+Mesure le coût de démarrage de l'API : temps d'import de `main`, puis délai
+avant que `/` (liveness) et `/ready` (readiness) répondent sur un uvicorn réel.
+
+    python -m benchmarks.bench_startup --repeat 3 --port 8765
+    python -m benchmarks.bench_startup --import-only --top 15   # modules les plus lents (-X importtime)
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def measure_import(repeat):
+    durations = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True
+        ).stdout
+        durations.append(float(output.strip().splitlines()[-1]))
+    return durations
+
+
+def slowest_imports(top):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        # Format : "import time:  self [us] | cumulative | module"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def _wait_for(url, deadline, expected_status=200):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == expected_status:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def measure_time_to_ready(port, timeout):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        live = _wait_for(f"http://127.0.0.1:{port}/", deadline)
+        ready = _wait_for(f"http://127.0.0.1:{port}/ready", deadline)
+        return (live - start if live else None), (ready - start if ready else None)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--import-only", action="store_true")
+    parser.add_argument("--top", type=int, default=0, help="Affiche les N imports les plus lents.")
+    args = parser.parse_args()
+
+    durations = measure_import(args.repeat)
+    print(f"Import de main : médiane {statistics.median(durations):.2f}s (min {min(durations):.2f}s)")
+    if args.top:
+        for cumulative_us, name in slowest_imports(args.top):
+            print(f"  {cumulative_us / 1e6:>6.2f}s  {name}")
+    if args.import_only:
+        return
+
+    for run in range(args.repeat):
+        live, ready = measure_time_to_ready(args.port, args.timeout)
+        live_str = f"{live:.2f}s" if live is not None else "timeout"
+        ready_str = f"{ready:.2f}s" if ready is not None else "timeout"
+        print(f"Run {run + 1} : liveness {live_str}, readiness {ready_str}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Vérifie `ConcurrencyLimiter` (src/llm_clients.py) face aux annulations et expirations
+qui arrivent au moment où une place est donnée (déconnexion SSE/WebSocket) :
+la place ne doit être ni perdue ni rendue deux fois, la limite jamais dépassée.
+
+    python -m benchmarks.check_llm_limiter --rounds 2000
+
+Sort avec le code 1 si `in_flight` ne revient pas à 0 ou si la limite est dépassée.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import threading
+
+from src.llm_clients import ConcurrencyLimiter
+
+
+async def cancel_after_grant() -> int:
+    """limit=1 : B reçoit la place de A puis est annulé avant d'avoir repris la main."""
+    limiter = ConcurrencyLimiter(1)
+    assert await limiter.acquire_async(1.0)
+    waiting = asyncio.create_task(limiter.acquire_async(1.0))
+    await asyncio.sleep(0)
+    limiter.release()
+    waiting.cancel()
+    try:
+        await waiting
+    except asyncio.CancelledError:
+        pass
+    else:
+        limiter.release()
+    return limiter.in_flight
+
+
+def timeout_after_grant() -> int:
+    """Appel synchrone : la place arrive entre l'expiration de l'attente et le verrou."""
+    limiter = ConcurrencyLimiter(1)
+    assert limiter.acquire(1.0)
+    original = limiter._abandon
+
+    def late_grant(waiter):
+        limiter.release()
+        return original(waiter)
+
+    limiter._abandon = late_grant
+    if limiter.acquire(0.0):
+        limiter.release()
+    return limiter.in_flight
+
+
+async def stress(rounds: int, limit: int, seed: int) -> dict:
+    """Appels concurrents aux délais et annulations aléatoires ; relève le pic de détenteurs."""
+    rng = random.Random(seed)
+    limiter = ConcurrencyLimiter(limit)
+    state = {"holders": 0, "peak": 0}
+    lock = threading.Lock()
+
+    async def one():
+        if not await limiter.acquire_async(rng.uniform(0.0, 0.004)):
+            return
+        with lock:
+            state["holders"] += 1
+            state["peak"] = max(state["peak"], state["holders"])
+        try:
+            await asyncio.sleep(rng.uniform(0.0, 0.002))
+        finally:
+            with lock:
+                state["holders"] -= 1
+            limiter.release()
+
+    tasks = [asyncio.create_task(one()) for _ in range(rounds)]
+    for task in rng.sample(tasks, rounds // 3):
+        asyncio.get_running_loop().call_later(rng.uniform(0.0, 0.01), task.cancel)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"in_flight": limiter.in_flight, "peak": state["peak"], "queued": limiter.queued}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    errors = []
+    in_flight = asyncio.run(cancel_after_grant())
+    print(f"annulation après attribution   in_flight {in_flight}")
+    if in_flight != 0:
+        errors.append(f"annulation après attribution : in_flight = {in_flight}")
+    in_flight = timeout_after_grant()
+    print(f"expiration après attribution   in_flight {in_flight}")
+    if in_flight != 0:
+        errors.append(f"expiration après attribution : in_flight = {in_flight}")
+    result = asyncio.run(stress(args.rounds, args.limit, args.seed))
+    print(f"charge aléatoire               {result}")
+    if result["in_flight"] or result["queued"] or result["peak"] > args.limit:
+        errors.append(f"charge aléatoire : {result} pour une limite de {args.limit}")
+
+    for error in errors:
+        print(f"ÉCHEC {error}", file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Vérifie que la partie statique des prompts est identique octet pour octet d'une
+session à l'autre, condition du cache de préfixe du fournisseur :
+
+- prompt système de l'entretien : consignes en tête, offre et CV ensuite ;
+- les sept tâches du pipeline CV : consignes de la tâche, contenu du CV en dernier
+  (les tâches sans CV reçoivent les sorties précédentes en contexte, ajouté par crewai).
+
+    python -m benchmarks.check_prompt_prefix --sessions 20
+
+Sort avec le code 1 si un prompt ne commence pas par sa partie statique ou si
+celle-ci varie entre deux sessions. À lancer avant de modifier un prompt ; les mêmes
+vérifications tournent dans tests/test_prompt_prefix.py.
+
+Le fournisseur place les schémas des outils avant le prompt système : ils comptent
+dans le préfixe. Même avec eux, aucun préfixe statique n'atteint aujourd'hui le seuil
+de 1024 tokens (entretien ~ 840 avec les outils) : le gain entre sessions dépend du préambule ajouté
+par crewai et de l'historique de la conversation, pas de ces seules consignes.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import fixtures
+from src.crew.crew_pool import CV_TASKS
+from src.crew.tasks import TASK_SPECS
+from src.interview_simulator import entretient_version_prod as interview
+from src.prompt_layout import common_prefix_length, placeholders, prefix_digest, static_prefix
+from src.utils.lru_cache import LRUCache
+
+# Seuil en dessous duquel OpenAI ne met pas le préfixe en cache (tokens ≈ caractères / 4)
+PROVIDER_CACHE_MIN_TOKENS = 1024
+
+
+def tool_schemas(tools) -> str:
+    """Schémas des outils tels qu'envoyés au fournisseur, en tête du préfixe mis en cache."""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    return json.dumps([convert_to_openai_tool(tool) for tool in tools], ensure_ascii=False)
+
+
+def check(name, static_part, prompts, errors, tools_prefix=""):
+    for i, prompt in enumerate(prompts):
+        if not prompt.startswith(static_part):
+            errors.append(f"{name} : la session {i} ne commence pas par la partie statique")
+    shared = common_prefix_length(prompts)
+    if len(prompts) > 1 and shared < len(static_part):
+        errors.append(f"{name} : préfixe commun de {shared} caractères pour une partie statique de {len(static_part)}")
+    tokens = (len(tools_prefix) + len(static_part)) // 4
+    note = "" if tokens >= PROVIDER_CACHE_MIN_TOKENS else f"  (sous le seuil de {PROVIDER_CACHE_MIN_TOKENS} tokens du fournisseur)"
+    print(f"{name:<28} statique {len(static_part):>6} car. ~{tokens:>5} tokens  sha256 {prefix_digest(static_part)}{note}")
+
+
+def interview_prompts(sessions):
+    # Cache de rendu vidé : chaque session est réellement rendue
+    interview._rendered_prompts = LRUCache(interview.INTERVIEW_PROMPT_CACHE_SIZE)
+    return [
+        interview.render_system_prompt(fixtures.make_cv_profile(seed)["candidat"], fixtures.make_job_offer(seed))
+        for seed in range(sessions)
+    ]
+
+
+def task_prompts(name, sessions, errors):
+    description = TASK_SPECS[name]["description"]
+    fields = placeholders(description)
+    if fields and (fields != ["cv_content"] or not description.rstrip().endswith("{cv_content}")):
+        errors.append(f"{name} : champs {fields}, le contenu du CV doit être le seul et venir en dernier")
+    return static_prefix(description), [
+        description.format(cv_content=fixtures.cv_text(fixtures.make_cv_profile(seed))) if fields else description
+        for seed in range(sessions)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="Sessions (CV et offres distincts) comparées")
+    args = parser.parse_args()
+
+    errors = []
+    check("entretien", interview.load_instructions(), interview_prompts(args.sessions), errors,
+          tools_prefix=tool_schemas(interview.TOOLS))
+    for name in CV_TASKS:
+        static_part, prompts = task_prompts(name, args.sessions, errors)
+        check(name, static_part, prompts, errors)
+
+    for error in errors:
+        print(f"ÉCHEC {error}", file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
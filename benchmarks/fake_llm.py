@@ -0,0 +1,178 @@
+"""
+Modèles de chat factices et déterministes pour mesurer les pipelines sans OpenAI.
+
+- `DeterministicChatModel` : modèle de chat langchain (InterviewProcessor, graphe
+  LangGraph, anciennes versions de crewai qui acceptent un modèle langchain) ;
+- `make_crew_llm` : LLM pour les agents crewai (sous-classe de `crewai.BaseLLM`
+  quand elle existe).
+
+La réponse est choisie par marqueur : la première entrée de `responses` dont la
+clé apparaît dans le prompt, sinon `default_response`. Latence et débit de tokens
+sont configurables ; `usage_metadata` est renseigné pour la traçabilité des tokens.
+"""
+import asyncio
+import json
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import Field
+
+from src.crew.tasks import TASK_SPECS
+
+DEFAULT_INTERVIEW_REPLY = "Merci. Pouvez-vous me présenter un projet dont vous êtes particulièrement fier ?"
+# Format attendu par le parseur des agents crewai (sans outils)
+CREW_ANSWER_TEMPLATE = "Thought: I now can give a great answer\nFinal Answer: {}"
+FAKE_MODEL_NAME = "fake-deterministic"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximation grossière (4 caractères par token), suffisante pour des compteurs relatifs."""
+    return max(1, len(text) // 4)
+
+
+def task_marker(task_name: str) -> str:
+    """Début de l'`expected_output` d'une tâche : crewai le recopie dans le prompt de l'agent."""
+    return TASK_SPECS[task_name]["expected_output"][:80]
+
+
+def responses_for_tasks(outputs: Dict[str, Any]) -> Dict[str, str]:
+    """{nom de tâche: sortie} -> {marqueur: réponse}, les dict/listes étant sérialisés en JSON."""
+    return {
+        task_marker(name): output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+        for name, output in outputs.items()
+    }
+
+
+def pick_response(prompt: str, responses: Dict[str, str], default: str) -> str:
+    for marker, response in responses.items():
+        if marker in prompt:
+            return response
+    return default
+
+
+class DeterministicChatModel(BaseChatModel):
+    """Modèle de chat factice : même prompt, même réponse, après `latency` secondes."""
+
+    responses: Dict[str, str] = Field(default_factory=dict)
+    default_response: str = DEFAULT_INTERVIEW_REPLY
+    latency: float = 0.0
+    # Délai entre deux tokens streamés (0 = tout d'un coup)
+    token_delay: float = 0.0
+    # Préfixe "Final Answer:" des agents crewai
+    crew_format: bool = False
+    model_name: str = FAKE_MODEL_NAME
+
+    @property
+    def _llm_type(self) -> str:
+        return "deterministic-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        # Le modèle ne produit jamais d'appel d'outil : le lier à des outils ne change rien
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = pick_response(prompt, self.responses, self.default_response)
+        if self.crew_format:
+            content = CREW_ANSWER_TEMPLATE.format(content)
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                            "total_tokens": input_tokens + output_tokens},
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _chunks(self, message: AIMessage) -> List[ChatGenerationChunk]:
+        words = message.content.split(" ")
+        chunks = [
+            ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+            for i, word in enumerate(words)
+        ]
+        # L'usage n'est porté que par le dernier fragment (comme stream_usage chez OpenAI)
+        chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=message.usage_metadata, response_metadata=message.response_metadata
+        )))
+        return chunks
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for chunk in self._chunks(self._respond(messages)):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._respond(messages)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+@lru_cache(maxsize=1)
+def _crew_llm_class():
+    """Sous-classe de `crewai.BaseLLM` (crewai >= 0.100), ou None pour les versions antérieures."""
+    try:
+        from crewai import BaseLLM
+    except ImportError:
+        return None
+
+    class DeterministicCrewLLM(BaseLLM):
+        def __init__(self, responses: Dict[str, str], default_response: str, latency: float = 0.0):
+            super().__init__(model=FAKE_MODEL_NAME, temperature=0)
+            self.responses = responses
+            self.default_response = default_response
+            self.latency = latency
+            self.calls = 0
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+            if isinstance(messages, str):
+                prompt = messages
+            else:
+                prompt = "\n".join(str(message.get("content", "")) for message in messages)
+            time.sleep(self.latency)
+            self.calls += 1
+            return CREW_ANSWER_TEMPLATE.format(pick_response(prompt, self.responses, self.default_response))
+
+        def supports_function_calling(self) -> bool:
+            return False
+
+        def supports_stop_words(self) -> bool:
+            return False
+
+        def get_context_window_size(self) -> int:
+            return 128_000
+
+    return DeterministicCrewLLM
+
+
+def make_crew_llm(outputs: Dict[str, Any], default_response: str = "{}", latency: float = 0.0):
+    """
+    LLM factice pour `analyse_cv(..., llm=...)` et `build_crew(..., llm=...)`.
+    `outputs` associe un nom de tâche de TASK_SPECS à sa sortie canonique.
+    """
+    responses = responses_for_tasks(outputs)
+    crew_llm_class = _crew_llm_class()
+    if crew_llm_class is None:
+        # crewai < 0.100 : les agents acceptent directement un modèle de chat langchain
+        return DeterministicChatModel(
+            responses=responses, default_response=default_response, latency=latency, crew_format=True
+        )
+    return crew_llm_class(responses, default_response, latency=latency)
@@ -0,0 +1,189 @@
+"""
+Données synthétiques et reproductibles (graine fixe) pour les benchmarks : profils
+de CV, CV PDF générés sans dépendance, offres d'emploi et transcriptions d'entretien.
+
+Le profil d'un CV sert à la fois à écrire le PDF et aux sorties canoniques du LLM
+factice (`cv_task_outputs`) : `analyse_cv` sur ce PDF reconstruit donc le profil.
+"""
+import random
+from typing import Any, Dict, List
+
+from benchmarks.bench_batch_analysis import ANSWERS, JOB_REQUIREMENTS
+
+HARD_SKILLS = [
+    "Python", "SQL", "Docker", "Kubernetes", "FastAPI", "Django", "PostgreSQL", "MongoDB", "Airflow",
+    "Spark", "Pandas", "PyTorch", "Scikit-learn", "AWS", "GCP", "Terraform", "Git", "Linux", "Power BI", "React",
+]
+SOFT_SKILLS = ["Rigueur", "Communication", "Autonomie", "Esprit d'équipe", "Curiosité", "Pédagogie"]
+COMPANIES = ["Enedis", "Capgemini", "Doctolib", "BlaBlaCar", "Orange", "Decathlon", "Thales", "Ubisoft"]
+JOB_TITLES = ["Développeur Python", "Data Engineer", "Data Analyst", "Ingénieur DevOps", "Data Scientist"]
+SCHOOLS = ["Université Paris-Saclay", "WILD CODE SCHOOL", "INSA Lyon", "DataCamp", "OpenClassrooms"]
+DEGREES = ["Master Informatique", "Titre RNCP niveau 6", "Licence Mathématiques", "Certification Cloud"]
+RESPONSIBILITIES = [
+    "Conception d'API REST avec {}", "Mise en production de pipelines {}", "Optimisation des requêtes {}",
+    "Automatisation du déploiement avec {}", "Encadrement d'un stagiaire sur {}", "Migration vers {}",
+]
+CITIES = ["Paris", "Lyon", "Nantes", "Lille", "Bordeaux", "Toulouse"]
+
+# Géométrie A4 du générateur PDF (points)
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT = 595, 842
+PDF_MARGIN, PDF_LINE_HEIGHT, PDF_FONT_SIZE = 50, 14, 10
+PDF_LINES_PER_PAGE = (PDF_PAGE_HEIGHT - 2 * PDF_MARGIN) // PDF_LINE_HEIGHT
+PDF_LINE_WIDTH = 95
+
+
+def make_cv_profile(seed: int = 0, n_experiences: int = 4, n_projects: int = 3, n_skills: int = 10) -> Dict[str, Any]:
+    """Profil au format de sortie de `task_build_profile` (clé racine `candidat`)."""
+    rng = random.Random(seed)
+    hard_skills = rng.sample(HARD_SKILLS, min(n_skills, len(HARD_SKILLS)))
+    experiences = []
+    year = 2024
+    for _ in range(n_experiences):
+        duration = rng.randint(1, 3)
+        experiences.append({
+            "Poste": rng.choice(JOB_TITLES),
+            "Entreprise": rng.choice(COMPANIES),
+            "start_date": str(year - duration),
+            "end_date": "Aujourd'hui" if year == 2024 else str(year),
+            "responsabilités": [rng.choice(RESPONSIBILITIES).format(rng.choice(hard_skills)) for _ in range(3)],
+        })
+        year -= duration
+    projects = [
+        {"title": f"Projet {i + 1}", "role": "Lead technique",
+         "technologies": rng.sample(hard_skills, 2), "outcomes": ["Temps de traitement divisé par deux"]}
+        for i in range(n_projects)
+    ]
+    return {
+        "candidat": {
+            "informations_personnelles": {
+                "nom": f"Camille Martin {seed}", "email": f"camille.martin{seed}@example.com",
+                "numero_de_telephone": "06 12 34 56 78", "localisation": rng.choice(CITIES),
+            },
+            "compétences": {"hard_skills": hard_skills, "soft_skills": rng.sample(SOFT_SKILLS, 3)},
+            "expériences": experiences,
+            "projets": {"professional": projects, "personal": []},
+            "formations": [{"degree": rng.choice(DEGREES), "institution": rng.choice(SCHOOLS),
+                            "start_date": str(year - 2), "end_date": str(year)}],
+            "reconversion": {"is_reconversion": False, "analysis": "Parcours continu dans la tech."},
+        }
+    }
+
+
+def cv_text(profile: Dict[str, Any]) -> str:
+    """Rendu texte d'un profil, dans l'ordre habituel d'un CV."""
+    candidat = profile["candidat"]
+    info = candidat["informations_personnelles"]
+    lines = [info["nom"].upper(), f"{info['email']} | {info['numero_de_telephone']} | {info['localisation']}", "",
+             "EXPÉRIENCES PROFESSIONNELLES"]
+    for exp in candidat["expériences"]:
+        lines.append(f"{exp['Poste']} - {exp['Entreprise']} ({exp['start_date']} - {exp['end_date']})")
+        lines.extend(f"  - {item}" for item in exp["responsabilités"])
+    lines += ["", "PROJETS"]
+    for project in candidat["projets"]["professional"]:
+        lines.append(f"{project['title']} ({project['role']}) : {', '.join(project['technologies'])}")
+        lines.extend(f"  - {item}" for item in project["outcomes"])
+    lines += ["", "FORMATION"]
+    for formation in candidat["formations"]:
+        lines.append(f"{formation['degree']} - {formation['institution']} ({formation['start_date']} - {formation['end_date']})")
+    lines += ["", "COMPÉTENCES", ", ".join(candidat["compétences"]["hard_skills"]),
+              ", ".join(candidat["compétences"]["soft_skills"])]
+    return "\n".join(lines)
+
+
+def _pdf_escape(line: str) -> bytes:
+    encoded = line.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _wrap(text: str) -> List[str]:
+    lines = []
+    for line in text.splitlines():
+        while len(line) > PDF_LINE_WIDTH:
+            cut = line.rfind(" ", 0, PDF_LINE_WIDTH)
+            cut = cut if cut > 0 else PDF_LINE_WIDTH
+            lines.append(line[:cut])
+            line = line[cut:].lstrip()
+        lines.append(line)
+    return lines
+
+
+def text_to_pdf(text: str) -> bytes:
+    """
+    PDF minimal (Helvetica, WinAnsiEncoding) écrit à la main : une page par
+    PDF_LINES_PER_PAGE lignes, texte extractible par pypdf.
+    """
+    lines = _wrap(text) or [""]
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)]
+    # Objets : 1 catalogue, 2 arbre des pages, 3 police, puis (page, contenu) par page
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % pid for pid in page_ids) + b"] /Count %d >>" % len(pages),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = b"BT /F1 %d Tf %d TL %d %d Td\n" % (
+            PDF_FONT_SIZE, PDF_LINE_HEIGHT, PDF_MARGIN, PDF_PAGE_HEIGHT - PDF_MARGIN
+        )
+        stream += b"".join(b"(" + _pdf_escape(line) + b") Tj T*\n" for line in page_lines) + b"ET"
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, page_id + 1)
+        )
+        objects[page_id + 1] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[object_id] for object_id in sorted(objects))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def make_cv_pdf(seed: int = 0, n_experiences: int = 4, **profile_kwargs) -> bytes:
+    """CV PDF synthétique ; le nombre de pages croît avec `n_experiences` (environ 12 par page)."""
+    return text_to_pdf(cv_text(make_cv_profile(seed, n_experiences=n_experiences, **profile_kwargs)))
+
+
+def cv_task_outputs(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Sorties canoniques de chaque tâche du pipeline CV, cohérentes avec `profile`."""
+    candidat = profile["candidat"]
+    return {
+        "task_extract_informations": candidat["informations_personnelles"],
+        "task_extract_skills": candidat["compétences"],
+        "task_extract_experience": candidat["expériences"],
+        "task_extract_projects": candidat["projets"],
+        "task_extract_education": candidat["formations"],
+        "task_detect_reconversion": {"reconversion_analysis": candidat["reconversion"]},
+        "task_build_profile": profile,
+    }
+
+
+def make_job_offer(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "entreprise": rng.choice(COMPANIES),
+        "poste": rng.choice(JOB_TITLES),
+        "mission": "Concevoir et maintenir les pipelines de données et les API associées.",
+        "profil_recherche": f"{rng.randint(2, 6)} ans d'expérience, autonome et rigoureux.",
+        "competences": ", ".join(rng.sample(HARD_SKILLS, 5)),
+        "pole": rng.choice(["Data", "Plateforme", "Produit"]),
+    }
+
+
+def make_transcript(n_turns: int = 8, seed: int = 0) -> List[Dict[str, str]]:
+    """Conversation assistant/candidat alternée, au format de `conversation_history`."""
+    rng = random.Random(seed)
+    transcript = []
+    for turn in range(n_turns):
+        transcript.append({"role": "assistant", "content": f"Question {turn + 1} : pouvez-vous détailler ce point ?"})
+        transcript.append({"role": "user", "content": rng.choice(ANSWERS)})
+    return transcript
+
+
+def make_job_requirements(seed: int = 0) -> List[str]:
+    return [random.Random(seed).choice(JOB_REQUIREMENTS)]
@@ -0,0 +1,119 @@
+"""
+Test de charge des tours d'entretien avec un LLM factice à latence fixe : combien
+de tours concurrents un worker absorbe-t-il avant de mettre les requêtes en file ?
+
+- `threadpool` : ancien chemin, `run_in_threadpool(processor.run)` (limité par le
+  threadpool Starlette/anyio, 40 threads par défaut) ;
+- `async` : nouveau chemin, `await processor.arun(...)` sur la boucle d'événements ;
+- `--url` : cible un serveur uvicorn réel (POST /simulate-interview/). Pour mesurer
+  ce serveur sans OpenAI, surcharger `get_interview_llm` dans un script de lancement.
+
+    python -m benchmarks.load_test_interview --concurrency 10 50 200 --latency 1.0
+    python -m benchmarks.load_test_interview --url http://localhost:8000 --concurrency 50 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from benchmarks.bench_interview_turn import CV_DOCUMENT, JOB_OFFER
+
+MESSAGES = [{"role": "user", "content": "Bonjour, je suis prêt pour l'entretien."}]
+
+
+class FixedLatencyChatModel(GenericFakeChatModel):
+    """Modèle factice qui répond toujours la même chose après `latency` secondes (sync et async)."""
+
+    latency: float = 1.0
+    messages: object = None
+
+    def _next(self):
+        return iter([AIMessage(content="Pouvez-vous présenter votre dernier projet ?")])
+
+    def _generate(self, *args, **kwargs):
+        time.sleep(self.latency)
+        self.messages = self._next()
+        return super()._generate(*args, **kwargs)
+
+    async def _agenerate(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.messages = self._next()
+        return super()._generate(*args, **kwargs)
+
+
+async def run_threadpool(processor_factory, concurrency):
+    from fastapi.concurrency import run_in_threadpool
+
+    async def one():
+        processor = processor_factory()
+        await run_in_threadpool(processor.run, messages=MESSAGES)
+
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+
+
+async def run_async(processor_factory, concurrency):
+    from src.utils.executors import configure_default_executor
+
+    # Comme le lifespan de l'API : parties synchrones de LangGraph sur un exécuteur dimensionné
+    configure_default_executor()
+
+    async def one():
+        processor = processor_factory()
+        await processor.arun(messages=MESSAGES)
+
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+
+
+async def run_http(url, concurrency, timeout):
+    import httpx
+
+    body = {
+        "user_id": "load", "job_offer_id": "load", "cv_document": CV_DOCUMENT, "job_offer": JOB_OFFER,
+        "messages": MESSAGES, "conversation_history": [],
+    }
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        responses = await asyncio.gather(
+            *(client.post("/simulate-interview/", json=body) for _ in range(concurrency)), return_exceptions=True
+        )
+    return sum(1 for r in responses if not isinstance(r, Exception) and r.status_code == 200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 40, 100, 200])
+    parser.add_argument("--latency", type=float, default=1.0, help="Latence simulée d'un appel LLM (s)")
+    parser.add_argument("--url", help="Serveur à cibler au lieu du test en processus")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    if args.url:
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            ok = asyncio.run(run_http(args.url, concurrency, args.timeout))
+            elapsed = time.perf_counter() - start
+            print(f"{concurrency:>5} requêtes : {elapsed:.2f}s, {ok} succès, {ok / elapsed:.1f} tours/s")
+        return
+
+    from src.interview_simulator.entretient_version_prod import InterviewProcessor
+
+    llm = FixedLatencyChatModel(latency=args.latency)
+    factory = lambda: InterviewProcessor(CV_DOCUMENT, JOB_OFFER, conversation_history=[], llm=llm)
+    print(f"LLM factice : {args.latency:.2f}s par appel. Idéal = {args.latency:.2f}s quelle que soit la concurrence.")
+    for concurrency in args.concurrency:
+        row = [f"{concurrency:>5} tours"]
+        for label, runner in (("threadpool", run_threadpool), ("async", run_async)):
+            start = time.perf_counter()
+            asyncio.run(runner(factory, concurrency))
+            elapsed = time.perf_counter() - start
+            row.append(f"{label} {elapsed:6.2f}s ({concurrency / elapsed:6.1f} tours/s)")
+        print(" | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
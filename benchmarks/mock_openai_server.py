@@ -0,0 +1,141 @@
+"""
+Serveur factice compatible OpenAI (POST /v1/chat/completions, streamé ou non) pour
+tester les clients LLM sans quota : latence fixe, limite de requêtes simultanées
+au-delà de laquelle il répond 429 (avec Retry-After), taux d'erreurs 500 aléatoires.
+Le cache de préfixe d'OpenAI est simulé : un préfixe déjà vu d'au moins 1024 tokens,
+par tranches de 128, est compté dans `usage.prompt_tokens_details.cached_tokens`.
+
+    python -m benchmarks.mock_openai_server --port 8001 --latency 0.5 --max-concurrency 8
+    LLM_BASE_URL=http://localhost:8001/v1 uvicorn main:app
+
+GET /stats renvoie les compteurs (requêtes, 429, 500, pic de concurrence, tokens en cache).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = "Merci pour votre réponse. Pouvez-vous détailler le contexte technique de ce projet ?"
+# Règles du cache de prompt d'OpenAI (tokens approximés à 4 caractères)
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT_TOKENS = 128
+CHARS_PER_TOKEN = 4
+
+
+def create_app(latency: float = 0.5, max_concurrency: int = 0, error_rate: float = 0.0,
+               retry_after: float = 1.0, seed: int = 0, prompt_cache: bool = True) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    rng = random.Random(seed)
+    state = {"requests": 0, "rate_limited": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0,
+             "prompt_tokens": 0, "cached_tokens": 0}
+    seen_prefixes = set()
+
+    def completion_id() -> str:
+        return f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    def cached_tokens(prompt: str) -> int:
+        """Plus long préfixe déjà vu (par tranches de 128 tokens à partir de 1024), puis mémorise ceux du prompt."""
+        step = CACHE_INCREMENT_TOKENS * CHARS_PER_TOKEN
+        boundaries = range(CACHE_MIN_TOKENS * CHARS_PER_TOKEN, len(prompt) + 1, step)
+        digests = [hashlib.sha256(prompt[:end].encode("utf-8")).digest() for end in boundaries]
+        cached = 0
+        for end, digest in zip(boundaries, digests):
+            if digest not in seen_prefixes:
+                break
+            cached = end // CHARS_PER_TOKEN
+        seen_prefixes.update(digests)
+        return cached
+
+    def usage(body: dict) -> dict:
+        prompt = "".join(f"{m.get('role')}:{m.get('content') or ''}\n" for m in body.get("messages", []))
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        cached = cached_tokens(prompt) if prompt_cache else 0
+        completion_tokens = len(REPLY) // CHARS_PER_TOKEN
+        state["prompt_tokens"] += prompt_tokens
+        state["cached_tokens"] += cached
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached}}
+
+    async def stream(body: dict, id_: str):
+        created = int(time.time())
+        for i, word in enumerate(REPLY.split(" ")):
+            chunk = {"id": id_, "object": "chat.completion.chunk", "created": created, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+                                  "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(latency / 20)
+        final = {"id": id_, "object": "chat.completion.chunk", "created": created, "model": body["model"],
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(final)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {"id": id_, "object": "chat.completion.chunk", "created": created, "model": body["model"],
+                           "choices": [], "usage": usage(body)}
+            yield f"data: {json.dumps(usage_chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state["requests"] += 1
+        if max_concurrency and state["in_flight"] >= max_concurrency:
+            state["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429, headers={"retry-after": str(retry_after)},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            )
+        if error_rate and rng.random() < error_rate:
+            state["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Internal error", "type": "server_error"}})
+
+        state["in_flight"] += 1
+        state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+        if body.get("stream"):
+            async def tracked():
+                try:
+                    async for part in stream(body, completion_id()):
+                        yield part
+                finally:
+                    state["in_flight"] -= 1
+            return StreamingResponse(tracked(), media_type="text/event-stream")
+        try:
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id(), "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": usage(body),
+            }
+        finally:
+            state["in_flight"] -= 1
+
+    @app.get("/stats")
+    def stats():
+        return dict(state)
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=0, help="0 = pas de 429")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Désactive la simulation du cache de préfixe")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.max_concurrency, args.error_rate, args.retry_after,
+                     prompt_cache=not args.no_prompt_cache)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
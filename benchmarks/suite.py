@@ -0,0 +1,262 @@
+"""
+Suite de benchmarks hors ligne des chemins critiques, avec LLM factice
+déterministe (aucun appel OpenAI), baselines enregistrées et détection des régressions.
+
+    python -m benchmarks.suite --list
+    python -m benchmarks.suite --save main                 # écrit benchmarks/baselines/main.json
+    python -m benchmarks.suite --compare main --threshold 0.15
+    python -m benchmarks.suite --only scoring_engine interview_run --repeat 20
+
+Un benchmark dont une dépendance manque (crewai, faiss, torch...) est marqué
+`skipped`. `dl_analyzer` charge les vrais modèles (cache Hugging Face requis) :
+il n'y a pas de substitut factice pertinent pour mesurer l'inférence.
+`--compare` sort avec le code 1 si une médiane dépasse la baseline de plus de `--threshold`.
+
+`benchmarks/baselines/main.json` est la baseline de référence (`--save main --repeat 30`),
+avec son environnement (Python, machine, versions des paquets) : sur une autre machine,
+enregistrer sa propre baseline avant de comparer.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from benchmarks import fixtures
+from benchmarks.fake_llm import DeterministicChatModel, make_crew_llm
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+KNOWLEDGE_BASE_PATH = Path(__file__).resolve().parent.parent / "knowledge_base"
+
+# nom -> (fonction de préparation, modules requis) ; la préparation renvoie la fonction mesurée
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, requires: tuple = ()):
+    def decorator(setup: Callable[[argparse.Namespace], Callable[[], Any]]):
+        BENCHMARKS[name] = (setup, requires)
+        return setup
+    return decorator
+
+
+@benchmark("load_pdf", requires=("pypdf",))
+def setup_load_pdf(args):
+    from src.config import load_pdf
+
+    path = Path(tempfile.mkdtemp(prefix="bench-pdf-")) / "cv.pdf"
+    path.write_bytes(fixtures.make_cv_pdf(seed=args.seed, n_experiences=args.experiences))
+    return lambda: load_pdf(str(path))
+
+
+@benchmark("analyse_cv", requires=("crewai",))
+def setup_analyse_cv(args):
+    from src.crew.crew_pool import analyse_cv
+
+    profile = fixtures.make_cv_profile(seed=args.seed, n_experiences=args.experiences)
+    llm = make_crew_llm(fixtures.cv_task_outputs(profile), latency=args.llm_latency)
+    text = fixtures.cv_text(profile)
+    return lambda: analyse_cv(text, llm=llm)
+
+
+@benchmark("scoring_engine")
+def setup_scoring_engine(args):
+    from src.scoring_engine import ContextualScoringEngine
+
+    profile = fixtures.make_cv_profile(seed=args.seed, n_experiences=args.experiences, n_skills=len(fixtures.HARD_SKILLS))
+    return lambda: ContextualScoringEngine(profile).calculate_scores()
+
+
+@benchmark("interview_run", requires=("langgraph",))
+def setup_interview_run(args):
+    from src.interview_simulator.entretient_version_prod import InterviewProcessor
+
+    profile = fixtures.make_cv_profile(seed=args.seed, n_experiences=args.experiences)
+    job_offer = fixtures.make_job_offer(args.seed)
+    history = fixtures.make_transcript(args.turns, seed=args.seed)
+    messages = [{"role": "user", "content": "Je suis prêt pour la question suivante."}]
+    llm = DeterministicChatModel(latency=args.llm_latency)
+
+    def run():
+        return InterviewProcessor(profile, job_offer, history, llm=llm).run(messages)
+    return run
+
+
+@benchmark("rag_retrieval", requires=("faiss", "langchain_community", "langchain_text_splitters"))
+def setup_rag_retrieval(args):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    import src.rag_handler as rag_module
+    from src.crew.crew_pool import known_feedback_queries
+    from src.model_registry import model_registry
+
+    # Embeddings factices (hash du texte) et store temporaire : seul le chemin de recherche est mesuré
+    model_registry.register("rag_embeddings", lambda: DeterministicFakeEmbedding(size=384), pinned=True)
+    model_registry.unload("rag_embeddings")
+    rag_module.VECTOR_STORE_PATH = tempfile.mkdtemp(prefix="bench-rag-")
+    handler = rag_module.RAGHandler(knowledge_base_path=str(KNOWLEDGE_BASE_PATH))
+    queries = known_feedback_queries()
+
+    def retrieve():
+        # Caches vidés : chaque itération encode et cherche réellement
+        handler._embedding_cache.clear()
+        handler._results_cache.clear()
+        return handler.get_relevant_feedback_batch(queries, k=3)
+    return retrieve
+
+
+@benchmark("dl_analyzer", requires=("torch", "transformers", "sentence_transformers"))
+def setup_dl_analyzer(args):
+    from src.deep_learning_analyzer import MultiModelInterviewAnalyzer
+
+    transcripts = [fixtures.make_transcript(args.turns, seed=args.seed + i) for i in range(args.interviews)]
+    requirements = [fixtures.make_job_requirements(args.seed + i) for i in range(args.interviews)]
+    analyzer = MultiModelInterviewAnalyzer()
+    return lambda: analyzer.run_batch_analysis(transcripts, requirements)
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "status": "ok",
+        "median_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+        "min_ms": round(durations[0], 3),
+        "repeat": repeat,
+    }
+
+
+def missing_requirements(requires: tuple) -> list:
+    return [module for module in requires if importlib.util.find_spec(module) is None]
+
+
+def run_suite(args) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name in args.only or BENCHMARKS:
+        setup, requires = BENCHMARKS[name]
+        missing = missing_requirements(requires)
+        if missing:
+            results[name] = {"status": "skipped", "reason": f"modules absents : {', '.join(missing)}"}
+        else:
+            try:
+                results[name] = measure(setup(args), args.repeat, args.warmup)
+            except Exception as e:
+                results[name] = {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+        print(format_result(name, results[name]), flush=True)
+    return results
+
+
+def format_result(name: str, result: Dict[str, Any]) -> str:
+    if result["status"] != "ok":
+        return f"{name:<16} {result['status']:<8} {result['reason']}"
+    return f"{name:<16} médiane {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms"
+
+
+# Paquets dont la version influe sur les médianes (None si absent : benchmark sauté)
+ENVIRONMENT_PACKAGES = ("pypdf", "langchain-core", "langgraph", "crewai", "faiss-cpu", "torch", "sentence-transformers")
+
+
+def package_version(name: str):
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: package_version(name) for name in ENVIRONMENT_PACKAGES},
+    }
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, args, results) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    config = {key: getattr(args, key) for key in ("seed", "experiences", "turns", "interviews", "llm_latency", "repeat", "warmup")}
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": config,
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def compare(results, baseline, threshold: float) -> list:
+    """Affiche l'écart à la baseline et renvoie les benchmarks en régression."""
+    regressions = []
+    print(f"\nComparaison avec la baseline du {baseline['created_at']} (seuil +{threshold:.0%})")
+    if baseline.get("environment") != environment():
+        print(f"Attention : environnement différent de la baseline ({baseline.get('environment')}).")
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if result["status"] != "ok" or not reference or reference.get("status") != "ok":
+            print(f"{name:<16} non comparable")
+            continue
+        ratio = result["median_ms"] / reference["median_ms"] if reference["median_ms"] else float("inf")
+        verdict = "RÉGRESSION" if ratio > 1 + threshold else ("amélioration" if ratio < 1 - threshold else "stable")
+        print(f"{name:<16} {reference['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  x{ratio:5.2f}  {verdict}")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--list", action="store_true", help="Liste les benchmarks et leurs dépendances")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Sous-ensemble de benchmarks")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--experiences", type=int, default=12, help="Expériences par CV synthétique")
+    parser.add_argument("--turns", type=int, default=8, help="Tours par transcription")
+    parser.add_argument("--interviews", type=int, default=8, help="Entretiens par lot (dl_analyzer)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Latence simulée d'un appel LLM (s)")
+    parser.add_argument("--save", metavar="NOM", help="Enregistre les résultats comme baseline")
+    parser.add_argument("--compare", metavar="NOM", help="Compare à une baseline enregistrée")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Ralentissement toléré (0.15 = +15 %%)")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, requires) in BENCHMARKS.items():
+            missing = missing_requirements(requires)
+            print(f"{name:<16} {'modules absents : ' + ', '.join(missing) if missing else 'disponible'}")
+        return
+
+    results = run_suite(args)
+    if args.save:
+        print(f"Baseline enregistrée : {save_baseline(args.save, args, results)}")
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text(encoding="utf-8"))
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
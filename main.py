@@ -1,11 +1,14 @@
-import tempfile
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+import math
+import time
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Response, Depends, WebSocket, WebSocketDisconnect, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-from pymongo import MongoClient
-from bson.objectid import ObjectId
 import uvicorn
 import os
 import logging
@@ -14,33 +17,146 @@ from tasks.worker_celery import run_interview_analysis_task
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 from src.cv_parsing_agents import CvParserAgent
-from src.interview_simulator.entretient_version_prod import InterviewProcessor
-from src.scoring_engine import ContextualScoringEngine
-from src.rag_handler import RAGHandler
-
-app = FastAPI(
-    title="API d'IA pour la RH",
-    description="Une API pour le parsing de CV et la simulation d'entretiens.",
-    version="1.2.0"
+from src.interview_simulator.entretient_version_prod import InterviewProcessor, render_system_prompt
+from src.interview_simulator.session_store import (
+    create_session_store, new_session_id, messages_to_transcript, warn_if_process_local, SessionLocks, INTERVIEW_SESSION_TTL_SECONDS
 )
+from src.interview_simulator.streaming import stream_interview_turn, format_sse, ttft_recorder, find_analysis_task_id
+from src.scoring_engine import ContextualScoringEngine, BatchScoringEngine
+from src.rag_handler import get_rag_handler
+from src.model_registry import model_registry
+from src.crew.crew_pool import known_feedback_queries
+from src.db import get_async_mongo_client
+from src.feedback_store import aensure_feedback_indexes, get_feedback, list_feedbacks, FEEDBACK_PAGE_SIZE_MAX
+from src.utils.lru_cache import LRUCache
+from src.utils.request_context import set_current_interview_ids
+from src.utils.executors import run_cpu_bound, configure_default_executor, shutdown_cpu_executor
+from src.utils.tracing import trace_pipeline, finish_after_body, stage, metrics_payload
+from src.cv_parse_cache import ParseResultCache, create_parse_cache_backend
+from src.pdf_ingestion import PdfIngestionError, PDF_MAX_BYTES
+from src.llm_clients import LLMUnavailableError, aclose_http_clients, governor_stats
+from src.llm_cache import llm_cache_stats
+
+# Les ressources lourdes (vector store, modèles, MongoDB) sont initialisées en
+# parallèle après le démarrage : `/` répond tout de suite, `/ready` quand tout est prêt.
+startup_status: Dict[str, str] = {}
+# Un composant en échec (MongoDB pas encore joignable, téléchargement interrompu...) est
+# réessayé avec un délai croissant jusqu'à ce qu'il soit prêt
+STARTUP_RETRY_BASE_SECONDS = float(os.getenv("STARTUP_RETRY_BASE_SECONDS", "2"))
+STARTUP_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "60"))
 
-# Initialisation des services au démarrage
-try:
+
+def init_rag_handler():
     logger.info("Initialisation du RAG Handler...")
-    rag_handler = RAGHandler()
+    rag_handler = get_rag_handler()
     if rag_handler.vector_store:
         logger.info(f"Vector store chargé avec {rag_handler.vector_store.index.ntotal} vecteurs.")
+        if os.getenv("RAG_PRECOMPUTE_QUERIES", "0") == "1":
+            rag_handler.precompute_queries(known_feedback_queries())
     else:
         logger.warning("Le RAG Handler n'a pas pu être initialisé (pas de documents ?). Le feedback contextuel sera désactivé.")
-except Exception as e:
-    logger.error(f"Erreur critique lors de l'initialisation du RAG Handler: {e}", exc_info=True)
-    rag_handler = None
 
-# Configuration MongoDB
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client.hr_ai_system
-feedback_collection = db.interview_feedbacks
+
+async def init_mongo():
+    await get_async_mongo_client().admin.command("ping")
+    await aensure_feedback_indexes()
+
+
+STARTUP_COMPONENTS = {
+    "rag_handler": init_rag_handler,
+    "mongo": init_mongo,
+    # Précharge les modèles demandés par MODEL_WARMUP pour éviter un premier appel lent
+    "models": model_registry.warmup_from_env,
+}
+
+
+async def _init_component(name: str, init_fn) -> None:
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            if asyncio.iscoroutinefunction(init_fn):
+                await init_fn()
+            else:
+                await run_in_threadpool(init_fn)
+            startup_status[name] = "ready"
+            logger.info(f"Composant '{name}' prêt en {time.perf_counter() - start:.1f}s.")
+            return
+        except Exception as e:
+            startup_status[name] = "failed"
+            delay = min(STARTUP_RETRY_MAX_SECONDS, STARTUP_RETRY_BASE_SECONDS * 2 ** attempt)
+            attempt += 1
+            logger.error(
+                f"Erreur lors de l'initialisation de '{name}' (tentative {attempt}), nouvel essai dans {delay:.0f}s : {e}",
+                exc_info=attempt == 1,
+            )
+        await asyncio.sleep(delay)
+
+
+async def _init_all_components() -> None:
+    start = time.perf_counter()
+    await asyncio.gather(*(_init_component(name, fn) for name, fn in STARTUP_COMPONENTS.items()))
+    logger.info(f"Initialisation terminée en {time.perf_counter() - start:.1f}s : {startup_status}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_default_executor()
+    warn_if_process_local(interview_sessions)
+    startup_status.update({name: "pending" for name in STARTUP_COMPONENTS})
+    init_task = asyncio.create_task(_init_all_components())
+    yield
+    init_task.cancel()
+    shutdown_cpu_executor()
+    await aclose_http_clients()
+
+
+app = FastAPI(
+    title="API d'IA pour la RH",
+    description="Une API pour le parsing de CV et la simulation d'entretiens.",
+    version="1.2.0",
+    lifespan=lifespan
+)
+
+cv_parse_cache = ParseResultCache(create_parse_cache_backend())
+interview_sessions = create_session_store()
+interview_session_locks = SessionLocks()
+
+# Pipelines tracés par le middleware (préfixe de chemin -> label Prometheus)
+TRACED_PIPELINES = {
+    "/parse-cv/": "parse_cv",
+    "/score-candidates/": "score_candidates",
+    "/simulate-interview": "simulate_interview",
+    "/interview-sessions": "interview_session",
+}
+STREAMED_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Trace chaque requête d'un pipeline : durée par étape (Server-Timing) et métriques
+    Prometheus. `X-Profile: 1` profile la requête si PROFILING_ENABLED=1.
+    Une réponse streamée (SSE, NDJSON) part avant la fin du traitement : pas de
+    Server-Timing, la trace se ferme quand le dernier morceau du corps est envoyé.
+    """
+    pipeline = next((name for prefix, name in TRACED_PIPELINES.items() if request.url.path.startswith(prefix)), None)
+    if pipeline is None:
+        return await call_next(request)
+    profile = request.headers.get("x-profile") == "1"
+    with trace_pipeline(pipeline, request_id=request.headers.get("x-request-id"), profile=profile) as trace:
+        response = await call_next(request)
+        trace.keep_open = response.headers.get("content-type", "").split(";")[0] in STREAMED_MEDIA_TYPES
+    response.headers["X-Request-ID"] = trace.request_id
+    if trace.keep_open:
+        response.body_iterator = finish_after_body(response.body_iterator, trace)
+        return response
+    if trace.spans:
+        response.headers["Server-Timing"] = trace.server_timing()
+    if trace.profile_path:
+        response.headers["X-Profile-Path"] = trace.profile_path
+    return response
+
 
 class InterviewRequest(BaseModel):
     user_id: str = Field(..., example="google_user_12345")
@@ -59,69 +175,375 @@ def read_root() -> HealthCheck:
     """Vérifie que l'API est en cours d'exécution."""
     return HealthCheck(status="ok")
 
+
+@app.get("/ready", tags=["Status"], summary="Disponibilité des ressources de l'API")
+def read_readiness():
+    """Renvoie 200 quand toutes les ressources initialisées au démarrage sont prêtes, 503 sinon."""
+    ready = all(status == "ready" for status in startup_status.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "components": startup_status},
+    )
+
+
+@app.get("/models/", tags=["Status"], summary="Modèles résidents et mémoire occupée")
+def get_models_status():
+    """Retourne, pour chaque modèle du registre, son état de chargement et sa mémoire estimée."""
+    return model_registry.memory_report()
+
+
+@app.get("/metrics", tags=["Status"], summary="Métriques Prometheus (durées par étape, tokens LLM)")
+def get_metrics():
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+
+@app.get("/rag/cache-stats/", tags=["Status"], summary="Compteurs des caches du RAG")
+def get_rag_cache_stats():
+    """Retourne les hits/misses des caches d'embeddings de requêtes et de résultats top-k."""
+    if not model_registry.is_loaded("rag_handler"):
+        raise HTTPException(status_code=503, detail="Le RAG Handler n'est pas initialisé.")
+    return get_rag_handler().cache_stats()
+
+@app.get("/llm/stats/", tags=["Status"], summary="Appels LLM en cours et en attente par modèle")
+def get_llm_stats():
+    return governor_stats()
+
+
+@app.get("/llm/cache-stats/", tags=["Status"], summary="Cache des réponses LLM par agent")
+def get_llm_cache_stats():
+    """Hits exacts et sémantiques, taux de hit, tokens et secondes d'appel LLM évités."""
+    return llm_cache_stats()
+
+
+def _llm_unavailable(e: LLMUnavailableError) -> HTTPException:
+    """Fournisseur LLM saturé : 503 avec Retry-After plutôt qu'une erreur interne."""
+    logger.warning(str(e))
+    headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+    return HTTPException(status_code=503, detail=str(e), headers=headers)
+
+
+def _llm_unavailable_event(e: LLMUnavailableError) -> dict:
+    logger.warning(str(e))
+    return {"event": "error", "data": {"detail": str(e), "status_code": 503, "retry_after": e.retry_after}}
+
 # --- Endpoint du parser de CV ---
 @app.post("/parse-cv/", tags=["CV Parsing"], summary="Analyser un CV au format PDF avec scoring contextuel")
-async def parse_cv_endpoint(file: UploadFile = File(...)):
+async def parse_cv_endpoint(response: Response, file: UploadFile = File(...)):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Le fichier doit être au format PDF.")
-    tmp_path = None  
+    if file.size is not None and file.size > PDF_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Le PDF dépasse la taille maximale autorisée.")
     try:
-        contents = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(contents)
-            tmp.flush()
-            tmp_path = tmp.name
-        
-        logger.info(f"Début du parsing du CV temporaire : {tmp_path}")
-        cv_agent = CvParserAgent(pdf_path=tmp_path)
-        parsed_data = await run_in_threadpool(cv_agent.process)
-        if not parsed_data:
-            raise HTTPException(status_code=500, detail="Échec du parsing du CV.")
-        logger.info("Parsing du CV réussi. Lancement du scoring contextuel.")
-        scoring_engine = ContextualScoringEngine(parsed_data)
-        scored_skills_data = await run_in_threadpool(scoring_engine.calculate_scores)
-        if parsed_data.get("candidat"):
-            parsed_data["candidat"].update(scored_skills_data)
-        else:
-            parsed_data.update(scored_skills_data)
-
-        logger.info("Scoring terminé. Retour de la réponse complète.")
+        contents = await file.read(PDF_MAX_BYTES + 1)
+        if len(contents) > PDF_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Le PDF dépasse la taille maximale autorisée.")
+        # Un même PDF (même hash) n'est analysé qu'une fois : cache + calcul partagé
+        parsed_data, cache_status = await cv_parse_cache.get_or_compute(
+            contents, lambda: _parse_and_score_cv(contents)
+        )
+        response.headers["X-Cache"] = cache_status
+        logger.info(f"Réponse /parse-cv/ (cache : {cache_status}).")
         return parsed_data
 
+    except PdfIngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except LLMUnavailableError as e:
+        raise _llm_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors du parsing ou du scoring du CV : {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erreur interne du serveur : {e}")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
+
+
+def _score_cv(parsed_data: dict) -> dict:
+    with stage("scoring"):
+        return ContextualScoringEngine(parsed_data).calculate_scores()
+
+
+def _build_batch_engine(cv_list: list) -> BatchScoringEngine:
+    with stage("batch_index"):
+        return BatchScoringEngine(cv_list)
+
+
+def _rank_candidates(engine: BatchScoringEngine, skills: Optional[List[str]], top_n: int) -> list:
+    with stage("batch_scoring"):
+        return engine.rank(skills, top_n)
+
+
+async def _parse_and_score_cv(contents: bytes) -> dict:
+    # Le PDF est lu directement depuis la mémoire : plus de fichier temporaire
+    logger.info(f"Début du parsing du CV ({len(contents)} octets).")
+    cv_agent = CvParserAgent(pdf_bytes=contents)
+    parsed_data = await cv_agent.aprocess()
+    if not parsed_data:
+        raise HTTPException(status_code=500, detail="Échec du parsing du CV.")
+    logger.info("Parsing du CV réussi. Lancement du scoring contextuel.")
+    scored_skills_data = await run_cpu_bound(_score_cv, parsed_data)
+    if parsed_data.get("candidat"):
+        parsed_data["candidat"].update(scored_skills_data)
+    else:
+        parsed_data.update(scored_skills_data)
+
+    logger.info("Scoring terminé. Retour de la réponse complète.")
+    return parsed_data
+
+# --- Endpoint de scoring en masse ---
+class CandidateProfile(BaseModel):
+    candidate_id: str = Field(..., example="candidate_123")
+    cv_data: Dict[str, Any] = Field(..., example={"candidat": {"compétences": {"hard_skills": ["Python", "FastAPI"]}}})
+
+class OfferSkills(BaseModel):
+    offer_id: str = Field(..., example="job_offer_abcde")
+    skills: List[str] = Field(..., example=["Python", "Docker"])
+
+class BatchScoringRequest(BaseModel):
+    candidates: List[CandidateProfile]
+    # Sans offre, chaque candidat est noté sur ses propres hard skills
+    offers: List[OfferSkills] = Field(default_factory=list)
+    top_n: int = Field(default=10, ge=1)
+
+@app.post("/score-candidates/", tags=["CV Parsing"], summary="Classer de nombreux CV parsés par offre (NDJSON)")
+async def score_candidates_endpoint(request: BatchScoringRequest):
+    """
+    Retourne une ligne JSON par candidat classé, offre par offre : les résultats
+    d'une offre sont envoyés dès qu'elle est calculée.
+    """
+    candidate_ids = [candidate.candidate_id for candidate in request.candidates]
+    engine = await run_cpu_bound(_build_batch_engine, [candidate.cv_data for candidate in request.candidates])
+    offers = request.offers or [OfferSkills(offer_id="", skills=[])]
+
+    async def stream_rankings():
+        for offer in offers:
             try:
-                os.remove(tmp_path)
-                logger.info(f"Fichier temporaire supprimé : {tmp_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"Erreur lors de la suppression du fichier temporaire : {cleanup_error}")
+                ranking = await run_cpu_bound(_rank_candidates, engine, offer.skills or None, request.top_n)
+            except Exception as e:
+                logger.error(f"Erreur de scoring pour l'offre '{offer.offer_id}' : {e}", exc_info=True)
+                yield json.dumps({"offer_id": offer.offer_id or None, "error": str(e)}, ensure_ascii=False) + "\n"
+                continue
+            for entry in ranking:
+                entry["offer_id"] = offer.offer_id or None
+                entry["candidate_id"] = candidate_ids[entry.pop("index")]
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream_rankings(), media_type="application/x-ndjson")
+
 
 # --- Endpoint de simulation d'entretien ---
+def get_interview_llm():
+    """Modèle utilisé par les endpoints d'entretien ; None = gpt-4o-mini. Surchargé en test (dependency_overrides)."""
+    return None
+
+
 @app.post("/simulate-interview/", tags=["Simulation d'Entretien"], summary="Gérer une conversation d'entretien")
-async def simulate_interview_endpoint(request: InterviewRequest):
+async def simulate_interview_endpoint(request: InterviewRequest, llm=Depends(get_interview_llm)):
+    set_current_interview_ids(request.user_id, request.job_offer_id)
     try:
         processor = InterviewProcessor(
             cv_document=request.cv_document,
             job_offer=request.job_offer,
-            conversation_history=request.conversation_history
+            conversation_history=request.conversation_history,
+            llm=llm,
         )
-        ai_response_object = await run_in_threadpool(processor.run, messages=request.messages)
-        
-        # On retourne juste la réponse de l'assistant pour le chat
-        return {"response": ai_response_object["messages"][-1].content}
+        ai_response_object = await processor.arun(messages=request.messages)
+        new_messages = ai_response_object["messages"][len(request.conversation_history) + len(request.messages):]
+
+        # On retourne juste la réponse de l'assistant pour le chat (et l'analyse lancée, le cas échéant)
+        return {
+            "response": ai_response_object["messages"][-1].content,
+            "analysis_task_id": find_analysis_task_id(new_messages),
+        }
 
+    except LLMUnavailableError as e:
+        raise _llm_unavailable(e)
     except Exception as e:
         logger.error(f"Erreur interne dans /simulate-interview/: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erreur interne du serveur : {e}")
 
 
+@app.post("/simulate-interview/stream", tags=["Simulation d'Entretien"], summary="Tour d'entretien streamé (Server-Sent Events)")
+async def simulate_interview_stream_endpoint(request: InterviewRequest, llm=Depends(get_interview_llm)):
+    """
+    Même contrat que /simulate-interview/, mais la réponse arrive token par token
+    (événements `token`), avec `tool_start`/`tool_end` pendant l'analyse et un `done` final.
+    """
+    set_current_interview_ids(request.user_id, request.job_offer_id)
+    try:
+        processor = InterviewProcessor(
+            cv_document=request.cv_document,
+            job_offer=request.job_offer,
+            conversation_history=request.conversation_history,
+            llm=llm,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_stream():
+        try:
+            async for event in stream_interview_turn(processor, request.messages):
+                yield format_sse(event)
+        except LLMUnavailableError as e:
+            yield format_sse(_llm_unavailable_event(e))
+        except Exception as e:
+            logger.error(f"Erreur interne dans /simulate-interview/stream: {e}", exc_info=True)
+            yield format_sse({"event": "error", "data": {"detail": f"Erreur interne du serveur : {e}"}})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/interview/streaming-stats/", tags=["Status"], summary="Time-to-first-token des entretiens streamés")
+def interview_streaming_stats():
+    return {"ttft": ttft_recorder.stats()}
+
+
+# --- Sessions d'entretien : le client n'envoie que les nouveaux messages ---
+class StartInterviewRequest(BaseModel):
+    user_id: str = Field(..., example="google_user_12345")
+    job_offer_id: str = Field(..., example="job_offer_abcde")
+    cv_document: Dict[str, Any] = Field(..., example={"candidat": {"nom": "John Doe", "compétences": {"hard_skills": ["Python", "FastAPI"]}}})
+    job_offer: Dict[str, Any] = Field(..., example={"poste": "Développeur Python", "description": "Recherche développeur expérimenté..."})
+    conversation_history: List[Dict[str, Any]] = Field(default_factory=list)
+
+class InterviewTurnRequest(BaseModel):
+    messages: List[Dict[str, Any]] = Field(..., example=[{"role": "user", "content": "Bonjour"}])
+
+
+def _open_interview_session(request: StartInterviewRequest) -> tuple:
+    from langchain_core.messages import convert_to_messages, messages_to_dict
+
+    if not request.cv_document or "candidat" not in request.cv_document:
+        raise ValueError("Document CV invalide fourni.")
+    if not request.job_offer:
+        raise ValueError("Données de l'offre d'emploi non fournies.")
+    session = {
+        "user_id": request.user_id,
+        "job_offer_id": request.job_offer_id,
+        "cv_document": request.cv_document,
+        "job_offer": request.job_offer,
+        "system_prompt": render_system_prompt(request.cv_document["candidat"], request.job_offer),
+    }
+    return session, messages_to_dict(convert_to_messages(request.conversation_history))
+
+
+async def _run_interview_turn(session: dict, messages: List[Dict[str, Any]], llm=None) -> tuple:
+    """Exécute un tour ; retourne la réponse, l'analyse lancée éventuelle et les messages à ajouter à l'historique."""
+    from langchain_core.messages import messages_from_dict, messages_to_dict
+
+    history = messages_from_dict(session["messages"])
+    processor = InterviewProcessor(
+        cv_document=session["cv_document"],
+        job_offer=session["job_offer"],
+        conversation_history=history,
+        system_prompt=session["system_prompt"],
+        llm=llm,
+    )
+    result = await processor.arun(messages=messages)
+    new_messages = result["messages"][len(history):]
+    return result["messages"][-1].content, find_analysis_task_id(new_messages), messages_to_dict(new_messages)
+
+
+@app.post("/interview-sessions/", tags=["Simulation d'Entretien"], status_code=201, summary="Ouvrir une session d'entretien")
+async def start_interview_session(request: StartInterviewRequest):
+    try:
+        session, history = await run_cpu_bound(_open_interview_session, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session_id = new_session_id()
+    await interview_sessions.create(session_id, session, history)
+    return {"session_id": session_id, "expires_in": INTERVIEW_SESSION_TTL_SECONDS}
+
+
+@app.post("/interview-sessions/{session_id}/messages", tags=["Simulation d'Entretien"], summary="Envoyer un tour d'entretien")
+async def interview_session_turn(session_id: str, request: InterviewTurnRequest, llm=Depends(get_interview_llm)):
+    async with interview_session_locks.hold(session_id):
+        session = await interview_sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session d'entretien inconnue ou expirée.")
+        set_current_interview_ids(session["user_id"], session["job_offer_id"])
+        try:
+            response, analysis_task_id, new_messages = await _run_interview_turn(session, request.messages, llm)
+        except LLMUnavailableError as e:
+            raise _llm_unavailable(e)
+        except Exception as e:
+            logger.error(f"Erreur interne dans la session {session_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Erreur interne du serveur : {e}")
+        if not await interview_sessions.append_messages(session_id, new_messages):
+            raise HTTPException(status_code=404, detail="Session d'entretien expirée pendant le tour.")
+    return {"response": response, "analysis_task_id": analysis_task_id}
+
+
+@app.websocket("/interview-sessions/{session_id}/ws")
+async def interview_session_websocket(websocket: WebSocket, session_id: str, llm=Depends(get_interview_llm)):
+    """
+    Tours streamés d'une session : le client envoie {"messages": [...]} et reçoit
+    les événements {"event": ..., "data": ...} du tour, jusqu'à `done` ou `error`.
+    """
+    from langchain_core.messages import messages_from_dict, messages_to_dict
+
+    await websocket.accept()
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            async with interview_session_locks.hold(session_id):
+                session = await interview_sessions.get(session_id)
+                if session is None:
+                    await websocket.send_json({"event": "error", "data": {"detail": "Session d'entretien inconnue ou expirée."}})
+                    await websocket.close(code=4404)
+                    return
+                set_current_interview_ids(session["user_id"], session["job_offer_id"])
+                history = messages_from_dict(session["messages"])
+                processor = InterviewProcessor(
+                    cv_document=session["cv_document"],
+                    job_offer=session["job_offer"],
+                    conversation_history=history,
+                    system_prompt=session["system_prompt"],
+                    llm=llm,
+                )
+                try:
+                    async for event in stream_interview_turn(processor, payload.get("messages", [])):
+                        if event["event"] == "done":
+                            new_messages = event.pop("state")["messages"][len(history):]
+                            await interview_sessions.append_messages(session_id, messages_to_dict(new_messages))
+                        await websocket.send_json(event)
+                except WebSocketDisconnect:
+                    raise
+                except LLMUnavailableError as e:
+                    await websocket.send_json(_llm_unavailable_event(e))
+                except Exception as e:
+                    logger.error(f"Erreur interne dans la session {session_id}: {e}", exc_info=True)
+                    await websocket.send_json({"event": "error", "data": {"detail": f"Erreur interne du serveur : {e}"}})
+    except WebSocketDisconnect:
+        logger.info(f"Client déconnecté de la session {session_id}.")
+
+
+@app.get("/interview-sessions/{session_id}", tags=["Simulation d'Entretien"], summary="Historique d'une session d'entretien")
+async def get_interview_session(session_id: str):
+    session = await interview_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session d'entretien inconnue ou expirée.")
+    return {
+        "session_id": session_id,
+        "user_id": session["user_id"],
+        "job_offer_id": session["job_offer_id"],
+        "messages": messages_to_transcript(session["messages"]),
+    }
+
+
+@app.delete("/interview-sessions/{session_id}", tags=["Simulation d'Entretien"], status_code=204, summary="Clore une session d'entretien")
+async def delete_interview_session(session_id: str):
+    if not await interview_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session d'entretien inconnue ou expirée.")
+    return Response(status_code=204)
+
+
 # --- Endpoints pour l'analyse asynchrone ---
 class AnalysisRequest(BaseModel):
     conversation_history: List[Dict[str, Any]]
     job_description_text: str
+    # Rattachent le feedback enregistré dans MongoDB au candidat et à l'offre
+    user_id: Optional[str] = None
+    job_offer_id: Optional[str] = None
 
 @app.post("/trigger-analysis/", tags=["Analyse Asynchrone"], status_code=202)
 def trigger_analysis(request: AnalysisRequest):
@@ -131,17 +553,19 @@ def trigger_analysis(request: AnalysisRequest):
     """
     task = run_interview_analysis_task.delay(
         request.conversation_history, 
-        [request.job_description_text]
+        [request.job_description_text],
+        user_id=request.user_id,
+        job_offer_id=request.job_offer_id,
     )
     return {"task_id": task.id}
 
 
-@app.get("/analysis-status/{task_id}", tags=["Analyse Asynchrone"])
-def get_analysis_status(task_id: str):
-    """
-    Vérifie le statut de la tâche d'analyse.
-    Si terminée, retourne le résultat.
-    """
+# Analyses terminées : servies depuis la mémoire, puis MongoDB, avant le backend Celery
+ANALYSIS_STATUS_CACHE_SIZE = int(os.getenv("ANALYSIS_STATUS_CACHE_SIZE", "1024"))
+analysis_status_cache = LRUCache(ANALYSIS_STATUS_CACHE_SIZE)
+
+
+def _celery_analysis_status(task_id: str) -> dict:
     task_result = AsyncResult(task_id)
     if task_result.ready():
         if task_result.successful():
@@ -154,6 +578,80 @@ def get_analysis_status(task_id: str):
     else:
         return {"status": "PENDING"}
 
+
+@app.get("/analysis-status/{task_id}", tags=["Analyse Asynchrone"])
+async def get_analysis_status(task_id: str):
+    """
+    Vérifie le statut de la tâche d'analyse.
+    Si terminée, retourne le résultat.
+    """
+    cached = analysis_status_cache.get(task_id)
+    if cached is not None:
+        return cached
+    try:
+        feedback = await get_feedback(task_id)
+    except Exception as e:
+        logger.warning(f"MongoDB indisponible pour l'analyse {task_id} : {e}")
+        feedback = None
+    if feedback:
+        status = {"status": "SUCCESS", "result": feedback["feedback"]}
+    else:
+        status = await run_in_threadpool(_celery_analysis_status, task_id)
+    if status["status"] == "SUCCESS":
+        analysis_status_cache.set(task_id, status)
+    return status
+
+
+ANALYSIS_STREAM_POLL_SECONDS = float(os.getenv("ANALYSIS_STREAM_POLL_SECONDS", "1.0"))
+ANALYSIS_STREAM_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_STREAM_TIMEOUT_SECONDS", "600"))
+
+@app.get("/analysis-status/{task_id}/stream", tags=["Analyse Asynchrone"])
+async def stream_analysis_status(task_id: str):
+    """
+    Suit la tâche d'analyse en Server-Sent Events : un événement `status` à chaque
+    changement d'état, puis `done` (rapport) ou `error`.
+    """
+    async def event_stream():
+        deadline = time.monotonic() + ANALYSIS_STREAM_TIMEOUT_SECONDS
+        last_status = None
+        while time.monotonic() < deadline:
+            status = await get_analysis_status(task_id)
+            if status["status"] == "SUCCESS":
+                yield format_sse({"event": "done", "data": status})
+                return
+            if status["status"] == "FAILURE":
+                yield format_sse({"event": "error", "data": status})
+                return
+            if status["status"] != last_status:
+                last_status = status["status"]
+                yield format_sse({"event": "status", "data": status})
+            await asyncio.sleep(ANALYSIS_STREAM_POLL_SECONDS)
+        yield format_sse({"event": "error", "data": {"status": "TIMEOUT", "error": "Analyse toujours en cours."}})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# --- Rapports de feedback enregistrés ---
+@app.get("/feedbacks/", tags=["Analyse Asynchrone"], summary="Lister les rapports de feedback (paginé)")
+async def list_feedbacks_endpoint(
+    user_id: Optional[str] = None,
+    job_offer_id: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=FEEDBACK_PAGE_SIZE_MAX),
+):
+    """Métadonnées des rapports, du plus récent au plus ancien ; ni transcription ni rapport complet."""
+    if not user_id and not job_offer_id:
+        raise HTTPException(status_code=400, detail="user_id ou job_offer_id est requis.")
+    return await list_feedbacks(user_id=user_id, job_offer_id=job_offer_id, page=page, page_size=page_size)
+
+
+@app.get("/feedbacks/{task_id}", tags=["Analyse Asynchrone"], summary="Lire un rapport de feedback")
+async def get_feedback_endpoint(task_id: str, include_transcript: bool = False):
+    feedback = await get_feedback(task_id, include_transcript=include_transcript)
+    if feedback is None:
+        raise HTTPException(status_code=404, detail="Rapport de feedback introuvable.")
+    return feedback
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
@@ -1,11 +1,9 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
-from langchain_groq import ChatGroq
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_openai import ChatOpenAI
 from typing import Dict, List, Any, Tuple, Optional, Type
-from crewai import LLM
+# Les clients LLM et loaders (langchain, crewai) sont importés dans les fonctions
+# qui les utilisent, pour ne pas alourdir le démarrage des workers.
 #########################################################################################################
 # formatage du json
 def format_cv(document):
@@ -39,12 +37,9 @@ def read_system_prompt(file_path):
         return file.read()
 
 def load_pdf(pdf_path):
-    loader = PyPDFLoader(pdf_path)
-    pages = loader.load_and_split()
-    cv_text = ""
-    for page in pages:
-        cv_text += page.page_content + "\n\n"
-    return cv_text    
+    from src.pdf_ingestion import extract_pdf_text
+    with open(pdf_path, "rb") as f:
+        return extract_pdf_text(f)
 
 #########################################################################################################        
 # modéles 
@@ -57,18 +52,15 @@ def chat_gemini():
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 model_openai = "gpt-4o"  
 
-def crew_openai():
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.1,
-        api_key=OPENAI_API_KEY
-    )
-    return llm
+# Clients partagés (pools HTTP, limites par modèle, réessais) : voir src/llm_clients.py
+# Modèle des agents crewai : entre dans la version du cache de parsing (src/cv_parse_cache.py)
+CREW_LLM_MODEL = "gpt-4o-mini"
+CREW_LLM_TEMPERATURE = 0.1
+
+def crew_openai(cache=None):
+    from src.llm_clients import create_crew_llm
+    return create_crew_llm(CREW_LLM_MODEL, temperature=CREW_LLM_TEMPERATURE, cache=cache)
 
 def chat_openai():
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.6,
-        api_key=OPENAI_API_KEY
-    )
-    return llm
+    from src.llm_clients import create_chat_llm
+    return create_chat_llm("gpt-4o", temperature=0.6)
@@ -1,75 +1,88 @@
-from crewai import Agent
-from crewai import LLM
+from functools import lru_cache
 from src.config import crew_openai
 
-LLM_agent = crew_openai()
 
-# Interview Simulation Agents
-report_generator_agent = Agent(
-    role='Rédacteur de Rapports Synthétiques',
-    goal='Générer un feedback pertinent, a partir du deroulement de lentretient',
-    backstory=(
-        "Sepcialisé dans le recrutement et les ressources humaines, capable d'evaluer les candidats"
-        "sur la communication et la pertinences des reponses en fonction des questions posées, redige"
-        "en un rapport clair, un feedback détaillé sur le candidat."
+@lru_cache(maxsize=None)
+def get_agent_llm(agent_name: str = None):
+    """
+    LLM des agents, créé au premier usage plutôt qu'à l'import. Le pool HTTP et les
+    limites sont communs ; seul le cache de réponses (src/llm_cache.py) est propre à l'agent.
+    """
+    from src.llm_cache import get_agent_cache
+
+    return crew_openai(cache=get_agent_cache(agent_name) if agent_name else None)
+
+
+AGENT_SPECS = {
+    # Interview Simulation Agents
+    "report_generator_agent": dict(
+        role='Rédacteur de Rapports Synthétiques',
+        goal='Générer un feedback pertinent, a partir du deroulement de lentretient',
+        backstory=(
+            "Sepcialisé dans le recrutement et les ressources humaines, capable d'evaluer les candidats"
+            "sur la communication et la pertinences des reponses en fonction des questions posées, redige"
+            "en un rapport clair, un feedback détaillé sur le candidat."
+        ),
+        allow_delegation=False,
+        verbose=False
     ),
-    allow_delegation=False,
-    verbose=False,
-    llm=LLM_agent
-)
 
-# CV Parsing Agents
-skills_extractor_agent = Agent(
-    role="Spécialiste de l'extraction de compétences (hard & soft skills)",
-    goal="Identifier et extraire toutes les compétences pertinentes du CV.",
-    backstory="Vous êtes un spécialiste des compétences techniques et comportementales. Votre mission est de parcourir les CV et de lister de manière exhaustive toutes les compétences mentionnées.",
-    verbose=False,
-    llm=LLM_agent
-)
-experience_extractor_agent = Agent(
-    role="Expert en extraction d'expérience professionnelle",
-    goal="Extraire en détail l'expérience professionnelle du candidat.",
-    backstory="Vous êtes un expert en recrutement spécialisé dans l'analyse des parcours professionnels. Vous devez extraire chaque expérience de manière précise, en notant les rôles, les entreprises, les dates et les responsabilités.",
-    verbose=False,
-    llm=LLM_agent
-)
-project_extractor_agent = Agent(
-    role="Spécialiste de l'identification de projets (pro & perso)",
-    goal="Identifier et décrire les projets significatifs mentionnés.",
-    backstory="Vous êtes passionné par l'innovation et les réalisations. Votre rôle est de repérer et de décrire les projets professionnels et personnels qui mettent en lumière les compétences et l'initiative des candidats.",
-    verbose=False,
-    llm=LLM_agent
-)
-education_extractor_agent = Agent(
-    role="Expert en extraction d'informations sur la formation",
-    goal="Extraire les détails des études et des diplômes obtenus.",
-    backstory="Vous êtes un spécialiste des parcours académiques. Votre tâche est d'extraire avec précision les informations relatives aux études, aux diplômes et aux établissements fréquentés par les candidats.",
-    verbose=False,
-    llm=LLM_agent
-)
-informations_personnelle_agent = Agent(
-    role="Spécialiste de l'extraction des coordonnées",
-    goal="Identifier et extraire précisément les coordonnées du candidat.",
-    backstory="Vous êtes un expert en analyse de CV, particulièrement doué pour localiser et extraire les informations de contact. Votre rôle est de trouver le nom, l'adresse e-mail, le numéro de téléphone et la localisation (ville ou région) du candidat, généralement situés en haut ou à la fin du CV.",
-    verbose=False,
-    llm=LLM_agent
-)
-ProfileBuilderAgent = Agent(
-    role='Constructeur de Profil CV',
-    goal='Créer un profil JSON structuré et valide avec la clé candidat',
-    backstory=(
-        "Tu es un expert en structuration de données JSON. "
-        "Ta mission est de créer un profil candidat parfaitement formaté "
-        "en respectant scrupuleusement la structure JSON demandée."
+    # CV Parsing Agents
+    "skills_extractor_agent": dict(
+        role="Spécialiste de l'extraction de compétences (hard & soft skills)",
+        goal="Identifier et extraire toutes les compétences pertinentes du CV.",
+        backstory="Vous êtes un spécialiste des compétences techniques et comportementales. Votre mission est de parcourir les CV et de lister de manière exhaustive toutes les compétences mentionnées.",
+        verbose=False
+    ),
+    "experience_extractor_agent": dict(
+        role="Expert en extraction d'expérience professionnelle",
+        goal="Extraire en détail l'expérience professionnelle du candidat.",
+        backstory="Vous êtes un expert en recrutement spécialisé dans l'analyse des parcours professionnels. Vous devez extraire chaque expérience de manière précise, en notant les rôles, les entreprises, les dates et les responsabilités.",
+        verbose=False
+    ),
+    "project_extractor_agent": dict(
+        role="Spécialiste de l'identification de projets (pro & perso)",
+        goal="Identifier et décrire les projets significatifs mentionnés.",
+        backstory="Vous êtes passionné par l'innovation et les réalisations. Votre rôle est de repérer et de décrire les projets professionnels et personnels qui mettent en lumière les compétences et l'initiative des candidats.",
+        verbose=False
+    ),
+    "education_extractor_agent": dict(
+        role="Expert en extraction d'informations sur la formation",
+        goal="Extraire les détails des études et des diplômes obtenus.",
+        backstory="Vous êtes un spécialiste des parcours académiques. Votre tâche est d'extraire avec précision les informations relatives aux études, aux diplômes et aux établissements fréquentés par les candidats.",
+        verbose=False
     ),
-    verbose=True,
-    llm=LLM_agent
-)
+    "informations_personnelle_agent": dict(
+        role="Spécialiste de l'extraction des coordonnées",
+        goal="Identifier et extraire précisément les coordonnées du candidat.",
+        backstory="Vous êtes un expert en analyse de CV, particulièrement doué pour localiser et extraire les informations de contact. Votre rôle est de trouver le nom, l'adresse e-mail, le numéro de téléphone et la localisation (ville ou région) du candidat, généralement situés en haut ou à la fin du CV.",
+        verbose=False
+    ),
+    "ProfileBuilderAgent": dict(
+        role='Constructeur de Profil CV',
+        goal='Créer un profil JSON structuré et valide avec la clé candidat',
+        backstory=(
+            "Tu es un expert en structuration de données JSON. "
+            "Ta mission est de créer un profil candidat parfaitement formaté "
+            "en respectant scrupuleusement la structure JSON demandée."
+        ),
+        verbose=True
+    ),
+    "reconversion_detector_agent": dict(
+        role="Détecteur de Reconversion Professionnelle",
+        goal="Analyser la chronologie des expériences pour identifier les changements de carrière significatifs.",
+        backstory="Vous êtes un conseiller d'orientation expert, capable de repérer les transitions de carrière, d'identifier les compétences transférables et de valoriser les parcours non linéaires. Votre analyse doit mettre en lumière les changements de secteur, de type de poste ou de niveau de responsabilité.",
+        verbose=False
+    ),
+}
+
+
+def create_agent(name: str, llm=None):
+    """
+    Construit l'agent `name` à partir de AGENT_SPECS. Un agent neuf est créé à chaque
+    crew (crewai y attache l'état d'exécution) ; seul le client LLM est partagé.
+    `llm` permet d'injecter un autre modèle (ex. un LLM factice pour les tests).
+    """
+    from crewai import Agent
 
-reconversion_detector_agent = Agent(
-    role="Détecteur de Reconversion Professionnelle",
-    goal="Analyser la chronologie des expériences pour identifier les changements de carrière significatifs.",
-    backstory="Vous êtes un conseiller d'orientation expert, capable de repérer les transitions de carrière, d'identifier les compétences transférables et de valoriser les parcours non linéaires. Votre analyse doit mettre en lumière les changements de secteur, de type de poste ou de niveau de responsabilité.",
-    verbose=False,
-    llm=LLM_agent
-)
+    return Agent(**AGENT_SPECS[name], llm=llm or get_agent_llm(name))
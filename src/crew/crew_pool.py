@@ -1,55 +1,179 @@
-from crewai import Crew, Process
 from langchain_core.tools import tool
+import os
 import json
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pydantic import BaseModel, Field
 from typing import Dict, List, Any, Type
-from .agents import report_generator_agent, skills_extractor_agent, experience_extractor_agent, project_extractor_agent, education_extractor_agent, ProfileBuilderAgent, informations_personnelle_agent, reconversion_detector_agent
-from .tasks import generate_report_task, task_extract_skills, task_extract_experience, task_extract_projects, task_extract_education, task_build_profile, task_extract_informations, task_detect_reconversion
+from .agents import create_agent
+from .tasks import TASK_SPECS, create_task
 from src.deep_learning_analyzer import MultiModelInterviewAnalyzer
-from src.rag_handler import RAGHandler 
+from src.rag_handler import get_rag_handler
 from langchain_core.tools import BaseTool
+from src.deep_learning_analyzer import CANDIDATE_LABELS
+from src.utils.request_context import get_current_interview_ids
+from src.utils.tracing import stage, record_crew_usage
 
-@tool
-def interview_analyser(conversation_history: list, job_description_text: list) -> str:
-    """
-    Appelle cet outil à la toute fin d'un entretien d'embauche pour analyser
-    l'intégralité de la conversation et générer un rapport de feedback.
-    Ne l'utilise PAS pour répondre à une question normale, mais seulement pour conclure et analyser l'entretien.
-    """
-    # 1. Analyse DL de la conversation
-    analyzer = MultiModelInterviewAnalyzer()
-    structured_analysis = analyzer.run_full_analysis(conversation_history, job_description_text)
+# Requêtes RAG construites par l'analyse : ensemble fermé, pré-calculable au démarrage
+INTENT_FEEDBACK_QUERY_TEMPLATE = "Conseils pour un candidat qui cherche à {}"
+STRESS_FEEDBACK_QUERY = "gestion du stress en entretien"
+ANALYSIS_PENDING_MESSAGE = (
+    "Merci pour cet entretien ! Votre rapport de feedback est en cours de génération "
+    "(analyse {task_id}) et sera disponible dans quelques instants."
+)
+
+
+REPORT_TASKS = ["generate_report_task"]
+# Rapports rédigés en parallèle dans un lot d'analyses (appels LLM, donc I/O)
+REPORT_MAX_WORKERS = int(os.getenv("REPORT_MAX_WORKERS", "4"))
+# Exécution du pipeline CV en graphe de dépendances (tâches indépendantes en parallèle)
+CV_PIPELINE_PARALLEL = os.getenv("CV_PIPELINE_PARALLEL", "1") == "1"
+CV_PIPELINE_MAX_WORKERS = int(os.getenv("CV_PIPELINE_MAX_WORKERS", "5"))
+
+CV_TASKS = [
+    "task_extract_informations",
+    "task_extract_skills",
+    "task_extract_experience",
+    "task_extract_projects",
+    "task_extract_education",
+    "task_detect_reconversion",
+    "task_build_profile",
+]
+
+
+def known_feedback_queries() -> list[str]:
+    return [INTENT_FEEDBACK_QUERY_TEMPLATE.format(label) for label in CANDIDATE_LABELS] + [STRESS_FEEDBACK_QUERY]
 
-    # 2. Enrichissement avec RAG
-    rag_handler = RAGHandler()
-    rag_feedback = []
+
+def _create_tasks(task_names: list[str], llm=None) -> dict:
+    """Agents et tâches neufs pour `task_names` ; le contexte est résolu parmi les tâches précédentes."""
+    tasks = {}
+    for name in task_names:
+        spec = TASK_SPECS[name]
+        agent = create_agent(spec["agent"], llm=llm)
+        context = [tasks[context_name] for context_name in spec.get("context", [])]
+        tasks[name] = create_task(name, agent, context=context)
+    return tasks
+
+
+def build_crew(task_names: list[str], llm=None):
+    """Construit un crew séquentiel avec des agents et des tâches neufs, dans l'ordre de `task_names`."""
+    from crewai import Crew, Process
+
+    tasks = _create_tasks(task_names, llm=llm)
+    return Crew(
+        agents=[task.agent for task in tasks.values()],
+        tasks=list(tasks.values()),
+        process=Process.sequential,
+        verbose=False,
+        telemetry=False
+    )
+
+
+def _feedback_queries(structured_analysis: dict) -> list[str]:
+    """Requêtes RAG déduites de l'analyse : intentions détectées et stress marqué."""
+    rag_queries = []
     # Extraire les intentions et sentiments pour trouver des conseils pertinents
     if structured_analysis.get("intent_analysis"):
         for intent in structured_analysis["intent_analysis"]:
             # Exemple de requête basée sur l'intention
-            query = f"Conseils pour un candidat qui cherche à {intent['labels'][0]}"
-            rag_feedback.extend(rag_handler.get_relevant_feedback(query))
+            rag_queries.append(INTENT_FEEDBACK_QUERY_TEMPLATE.format(intent['labels'][0]))
     
     if structured_analysis.get("sentiment_analysis"):
         for sentiment_group in structured_analysis["sentiment_analysis"]:
             for sentiment in sentiment_group:
-                if sentiment['label'] == 'stress' and sentiment['score'].item() > 0.6:
-                    rag_feedback.extend(rag_handler.get_relevant_feedback("gestion du stress en entretien"))
-    unique_feedback = list(set(rag_feedback))
-    interview_crew = Crew(
-        agents=[report_generator_agent],
-        tasks=[generate_report_task],
-        process=Process.sequential,
-        verbose=False,
-        telemetry=False
+                if sentiment['label'] == 'stress' and float(sentiment['score']) > 0.6:
+                    rag_queries.append(STRESS_FEEDBACK_QUERY)
+    return rag_queries
+
+
+def _llm_model_name(task) -> str:
+    llm = getattr(task.agent, "llm", None)
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None)
+
+
+def _write_feedback_report(structured_analysis: dict, rag_results: list) -> str:
+    """Rédaction du rapport par le crew, à partir de l'analyse et des conseils RAG trouvés."""
+    rag_feedback = [feedback for results in rag_results for feedback in results]
+    unique_feedback = list(dict.fromkeys(rag_feedback))
+    interview_crew = build_crew(REPORT_TASKS)
+
+    with stage("report_generation"):
+        final_report = interview_crew.kickoff(inputs={
+            'structured_analysis_data': json.dumps(structured_analysis, indent=2),
+            'rag_contextual_feedback': "\n".join(unique_feedback)
+        })
+    record_crew_usage("report_generation", final_report, _llm_model_name(interview_crew.tasks[0]))
+    return final_report.raw
+
+
+def run_interview_analysis(conversation_history: list, job_description_text: list) -> str:
+    """
+    Analyse DL + enrichissement RAG + rédaction du rapport de feedback.
+    Partagé par la tâche Celery et `/trigger-analysis/`.
+    """
+    # 1. Analyse DL de la conversation (modèles résidents via le registre)
+    analyzer = MultiModelInterviewAnalyzer()
+    with stage("dl_analysis"):
+        structured_analysis = analyzer.run_full_analysis(conversation_history, job_description_text)
+
+    # 2. Enrichissement avec RAG (handler partagé, une seule recherche batchée)
+    rag_handler = get_rag_handler()
+    rag_results = rag_handler.get_relevant_feedback_batch(_feedback_queries(structured_analysis))
+    return _write_feedback_report(structured_analysis, rag_results)
+
+
+def run_interview_analysis_batch(items: list, max_workers: int = REPORT_MAX_WORKERS) -> list:
+    """
+    Analyse plusieurs entretiens `(conversation_history, job_description_text)` d'un coup :
+    une passe par modèle DL pour tout le lot, une recherche RAG pour toutes les requêtes
+    distinctes, puis les rapports rédigés en parallèle.
+
+    Returns:
+        Pour chaque entretien, le rapport ou l'exception levée par sa rédaction.
+    """
+    if not items:
+        return []
+    analyzer = MultiModelInterviewAnalyzer()
+    analyses = analyzer.run_batch_analysis(
+        [conversation for conversation, _ in items], [job for _, job in items]
     )
 
-    final_report = interview_crew.kickoff(inputs={
-        'structured_analysis_data': json.dumps(structured_analysis, indent=2),
-        'rag_contextual_feedback': "\n".join(unique_feedback)
-    })
-    return final_report
+    queries_per_item = [_feedback_queries(analysis) for analysis in analyses]
+    distinct_queries = list(dict.fromkeys(query for queries in queries_per_item for query in queries))
+    results_by_query = dict(zip(distinct_queries, get_rag_handler().get_relevant_feedback_batch(distinct_queries)))
+
+    def write(index):
+        return _write_feedback_report(analyses[index], [results_by_query[q] for q in queries_per_item[index]])
 
+    reports = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        # Chaque rédaction reprend le contexte courant (trace de la tâche Celery)
+        futures = [executor.submit(contextvars.copy_context().run, write, i) for i in range(len(items))]
+        for future in futures:
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                reports.append(e)
+    return reports
+
+
+@tool(response_format="content_and_artifact")
+def interview_analyser(conversation_history: list, job_description_text: list) -> tuple:
+    """
+    Appelle cet outil à la toute fin d'un entretien d'embauche pour analyser
+    l'intégralité de la conversation et générer un rapport de feedback.
+    Ne l'utilise PAS pour répondre à une question normale, mais seulement pour conclure et analyser l'entretien.
+    """
+    # L'analyse (DL + RAG + rapport) part dans la file Celery : le tour de chat n'attend pas
+    from tasks.worker_celery import run_interview_analysis_task
+
+    user_id, job_offer_id = get_current_interview_ids()
+    task = run_interview_analysis_task.delay(
+        conversation_history, job_description_text, user_id=user_id, job_offer_id=job_offer_id
+    )
+    return ANALYSIS_PENDING_MESSAGE.format(task_id=task.id), {"task_id": task.id, "status": "PENDING"}
 
 '''
 class EmptyInput(BaseModel):
@@ -88,32 +212,126 @@ class InterviewAnalysisTool(BaseTool):
         })
         return final_report
 '''
-def analyse_cv(cv_content: str) -> json:
-    crew = Crew(
-        agents=[            
-            informations_personnelle_agent,
-            skills_extractor_agent,
-            experience_extractor_agent,
-            project_extractor_agent,
-            education_extractor_agent,
-            reconversion_detector_agent,
-
-            ProfileBuilderAgent       
-        ],
-        tasks=[
-            task_extract_informations,
-            task_extract_skills,
-            task_extract_experience,
-            task_extract_projects,
-            task_extract_education,
-            task_detect_reconversion,
-            task_build_profile     
-        ],
-        process=Process.sequential,
-        verbose=False,
-        telemetry=False
-    )
+def _task_dependencies(task_names: list[str]) -> dict:
+    """Dépendances de chaque tâche (`context` de TASK_SPECS), dans l'ordre de `task_names`."""
+    return {name: set(TASK_SPECS[name].get("context", [])) for name in task_names}
+
+
+def _run_dag(dependencies: dict, execute, max_workers: int = CV_PIPELINE_MAX_WORKERS) -> dict:
+    """
+    Lance `execute(name)` dans un pool dès que les dépendances de `name` sont terminées.
+    Au premier échec, les tâches pas encore démarrées sont annulées, celles qui en
+    dépendent ne sont jamais lancées, et l'erreur est relevée.
+
+    Returns:
+        Les sorties par nom de tâche.
+    """
+    outputs = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        pending = list(dependencies)
+        while pending or running:
+            for name in [name for name in pending if dependencies[name] <= outputs.keys()]:
+                pending.remove(name)
+                running[executor.submit(contextvars.copy_context().run, execute, name)] = name
+            if not running:
+                raise ValueError(f"Dépendances circulaires ou inconnues : {pending}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    outputs[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+    return outputs
+
+
+async def _arun_dag(dependencies: dict, execute) -> dict:
+    """Variante asynchrone de `_run_dag` : `execute(name)` est une coroutine."""
+    runs = {}
+
+    async def run(name):
+        await asyncio.gather(*(runs[dependency] for dependency in dependencies[name]))
+        return await execute(name)
+
+    # Les dépendances d'une tâche sont toujours planifiées avant elle
+    for name in dependencies:
+        unknown = dependencies[name] - runs.keys()
+        if unknown:
+            raise ValueError(f"Dépendances circulaires ou inconnues : {sorted(unknown)}")
+        runs[name] = asyncio.ensure_future(run(name))
+    try:
+        await asyncio.gather(*runs.values())
+    except BaseException:
+        for pending in runs.values():
+            pending.cancel()
+        raise
+    return {name: future.result() for name, future in runs.items()}
+
+
+def run_task_dag(task_names: list[str], inputs: dict, llm=None, max_workers: int = CV_PIPELINE_MAX_WORKERS):
+    """
+    Exécute les tâches selon leurs dépendances (`context` de TASK_SPECS) : chaque tâche
+    démarre, dans son propre crew, dès que les tâches dont elle dépend sont terminées.
+    La durée totale suit donc le chemin critique plutôt que la somme des appels LLM.
+
+    Returns:
+        La sortie du crew de la dernière tâche de `task_names`.
+    """
+    from crewai import Crew, Process
+
+    tasks = _create_tasks(task_names, llm=llm)
+
+    def execute(name):
+        task = tasks[name]
+        # Le contexte est lu sur `task.context[i].output`, renseigné par les crews précédents
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=False, telemetry=False)
+        with stage(f"crew_task:{name}"):
+            output = crew.kickoff(inputs=inputs)
+        record_crew_usage(f"crew_task:{name}", output, _llm_model_name(task))
+        return output
+
+    return _run_dag(_task_dependencies(task_names), execute, max_workers=max_workers)[task_names[-1]]
+
+
+async def arun_task_dag(task_names: list[str], inputs: dict, llm=None):
+    """
+    Variante asynchrone de `run_task_dag` : chaque tâche est lancée par `kickoff_async`
+    dès que ses dépendances sont terminées, sans occuper de thread en attendant.
+    """
+    from crewai import Crew, Process
+
+    tasks = _create_tasks(task_names, llm=llm)
+
+    async def execute(name):
+        task = tasks[name]
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=False, telemetry=False)
+        with stage(f"crew_task:{name}"):
+            output = await crew.kickoff_async(inputs=inputs)
+        record_crew_usage(f"crew_task:{name}", output, _llm_model_name(task))
+        return output
+
+    outputs = await _arun_dag(_task_dependencies(task_names), execute)
+    return outputs[task_names[-1]]
+
+
+async def aanalyse_cv(cv_content: str, llm=None):
+    """Version asynchrone de `analyse_cv`, pour les endpoints FastAPI."""
+    if CV_PIPELINE_PARALLEL:
+        return await arun_task_dag(CV_TASKS, inputs={"cv_content": cv_content}, llm=llm)
+    crew = build_crew(CV_TASKS, llm=llm)
+    return await crew.kickoff_async(inputs={"cv_content": cv_content})
+
+
+def analyse_cv(cv_content: str, llm=None) -> json:
+    """
+    Lance le pipeline d'extraction du CV. `llm` permet d'injecter un modèle
+    (ex. un LLM factice) à la place du client OpenAI partagé.
+    """
+    if CV_PIPELINE_PARALLEL:
+        return run_task_dag(CV_TASKS, inputs={"cv_content": cv_content}, llm=llm)
+    crew = build_crew(CV_TASKS, llm=llm)
     result = crew.kickoff(inputs={"cv_content": cv_content})
     return result
- 
-    
\ No newline at end of file
@@ -0,0 +1,205 @@
+import os
+import copy
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# memory | redis | mongo | none
+CV_PARSE_CACHE_BACKEND = os.getenv("CV_PARSE_CACHE_BACKEND", "memory").lower()
+CV_PARSE_CACHE_TTL_SECONDS = int(os.getenv("CV_PARSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CV_PARSE_CACHE_MAX_ENTRIES = int(os.getenv("CV_PARSE_CACHE_MAX_ENTRIES", "512"))
+CV_PARSE_CACHE_REDIS_URL = os.getenv("CV_PARSE_CACHE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/1"))
+# Permet d'invalider tout le cache à la main (le modèle des agents est déjà pris en compte)
+CV_PARSE_CACHE_SALT = os.getenv("CV_PARSE_CACHE_SALT", "")
+
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_SHARED = "SHARED"  # requête identique déjà en cours : résultat partagé
+CACHE_BYPASS = "BYPASS"
+
+
+@lru_cache(maxsize=None)
+def pipeline_version() -> str:
+    """
+    Empreinte des définitions qui déterminent la réponse de /parse-cv/ : prompts
+    des agents et des tâches, ordre du pipeline, modèle et température des agents
+    et paramètres du scoring.
+    """
+    from src.config import CREW_LLM_MODEL, CREW_LLM_TEMPERATURE
+    from src.crew.agents import AGENT_SPECS
+    from src.crew.tasks import TASK_SPECS
+    from src.crew.crew_pool import CV_TASKS
+    from src import scoring_engine
+
+    definitions = {
+        "agents": AGENT_SPECS,
+        "tasks": {name: TASK_SPECS[name] for name in CV_TASKS},
+        "pipeline": CV_TASKS,
+        "llm": {"model": CREW_LLM_MODEL, "temperature": CREW_LLM_TEMPERATURE},
+        "scoring": [scoring_engine.CONTEXT_WEIGHTS, scoring_engine.ALPHA, scoring_engine.BETA, scoring_engine.GAMMA],
+        "salt": CV_PARSE_CACHE_SALT,
+    }
+    serialized = json.dumps(definitions, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key_for(pdf_bytes: bytes) -> str:
+    return f"cv-parse:{pipeline_version()}:{hashlib.sha256(pdf_bytes).hexdigest()}"
+
+
+class InMemoryParseCacheBackend:
+    """Cache LRU local au processus, avec expiration."""
+
+    def __init__(self, max_entries: int = CV_PARSE_CACHE_MAX_ENTRIES, ttl_seconds: int = CV_PARSE_CACHE_TTL_SECONDS):
+        self._cache = LRUCache(max_entries)
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._cache.pop(key)
+            return None
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._cache.set(key, (time.monotonic() + self.ttl_seconds, copy.deepcopy(value)))
+
+
+class RedisParseCacheBackend:
+    """Cache partagé entre workers, sur le Redis déjà présent dans docker-compose."""
+
+    def __init__(self, url: str = CV_PARSE_CACHE_REDIS_URL, ttl_seconds: int = CV_PARSE_CACHE_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self._client.set(key, json.dumps(value, ensure_ascii=False), ex=self.ttl_seconds)
+
+
+class MongoParseCacheBackend:
+    """Cache persistant dans MongoDB (motor), expiré par un index TTL."""
+
+    def __init__(self, ttl_seconds: int = CV_PARSE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._collection = None
+
+    async def _get_collection(self):
+        # Création différée : pas d'aller-retour MongoDB à l'import de l'API
+        if self._collection is None:
+            from src.db import get_async_database
+
+            collection = get_async_database().cv_parse_cache
+            await collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            self._collection = collection
+        return self._collection
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        collection = await self._get_collection()
+        # L'index TTL n'est purgé que toutes les 60 s environ
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        document = await collection.find_one({"_id": key, "created_at": {"$gte": expired_before}})
+        if not document:
+            return None
+        return document["result"]
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        collection = await self._get_collection()
+        await collection.replace_one(
+            {"_id": key}, {"_id": key, "result": value, "created_at": datetime.now(timezone.utc)}, upsert=True
+        )
+
+
+def _cancelling() -> bool:
+    """La tâche courante a-t-elle elle-même reçu une demande d'annulation ?"""
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
+
+
+class ParseResultCache:
+    """
+    Cache des CV analysés, indexé par le hash du PDF et la version du pipeline.
+    Les requêtes concurrentes sur un même PDF partagent un seul calcul en cours.
+    Une panne du backend est traitée comme un cache vide, jamais comme une erreur.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(
+        self, pdf_bytes: bytes, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """Retourne (résultat, statut de cache) pour le PDF donné."""
+        if self.backend is None:
+            return await compute(), CACHE_BYPASS
+
+        key = cache_key_for(pdf_bytes)
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache CV indisponible en lecture : {e}")
+            cached = None
+        if cached is not None:
+            return cached, CACHE_HIT
+
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                result = await asyncio.shield(inflight)
+                return copy.deepcopy(result), CACHE_SHARED
+            except asyncio.CancelledError:
+                # Calcul partagé annulé (client du premier appelant déconnecté) : ce client-ci
+                # est toujours là, il reprend le calcul ou rejoint celui qui l'a repris
+                if not inflight.cancelled() or _cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            # Écriture avant de libérer la clé : pas de fenêtre où ni le cache ni le calcul en cours ne répondent
+            try:
+                await self.backend.set(key, result)
+            except Exception as e:
+                logger.warning(f"Cache CV indisponible en écriture : {e}")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # évite l'avertissement si aucune requête n'attendait
+            raise
+        else:
+            future.set_result(copy.deepcopy(result))
+        finally:
+            del self._inflight[key]
+        return result, CACHE_MISS
+
+
+def create_parse_cache_backend(name: str = CV_PARSE_CACHE_BACKEND):
+    if name == "memory":
+        return InMemoryParseCacheBackend()
+    if name == "redis":
+        return RedisParseCacheBackend()
+    if name == "mongo":
+        return MongoParseCacheBackend()
+    if name == "none":
+        return None
+    raise ValueError(f"Backend de cache CV inconnu : {name}")
@@ -1,8 +1,12 @@
 import os
 import json
 
-from src.crew.crew_pool import analyse_cv
+from src.crew.crew_pool import analyse_cv, aanalyse_cv
 from src.config import load_pdf
+from src.pdf_ingestion import extract_pdf_text, PdfIngestionError
+from src.llm_clients import LLMUnavailableError
+from src.utils.executors import run_cpu_bound
+from src.utils.tracing import traced
 
 def clean_dict_keys(data):
     if isinstance(data, dict):
@@ -13,8 +17,39 @@ def clean_dict_keys(data):
         return data
 
 class CvParserAgent:
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str = None, pdf_bytes: bytes = None):
+        """
+        Args:
+            pdf_path (str): Chemin d'un PDF sur disque.
+            pdf_bytes (bytes): Contenu du PDF déjà en mémoire (upload), lu sans fichier temporaire.
+        """
+        if pdf_path is None and pdf_bytes is None:
+            raise ValueError("pdf_path ou pdf_bytes doit être fourni.")
         self.pdf_path = pdf_path
+        self.pdf_bytes = pdf_bytes
+
+    @traced("pdf_extraction")
+    def _read_text(self) -> str:
+        if self.pdf_bytes is not None:
+            return extract_pdf_text(self.pdf_bytes)
+        return load_pdf(self.pdf_path)
+
+    def _parse_crew_output(self, crew_output) -> dict:
+        if not crew_output or not hasattr(crew_output, 'raw') or not crew_output.raw.strip():
+            print("Erreur : L'analyse par le crew n'a pas retourné de résultat.")
+            return None
+        raw_string = crew_output.raw
+        json_string_cleaned = raw_string
+        if '```' in raw_string:
+            json_part = raw_string.split('```json')[1].split('```')[0]
+            json_string_cleaned = json_part.strip()
+        try:
+            profile_data = json.loads(json_string_cleaned)
+        except json.JSONDecodeError as e:
+            print(f"Erreur de décodage JSON : {e}")
+            print(f"Données brutes reçues : {crew_output.raw}")
+            return None
+        return clean_dict_keys(profile_data)
 
     def process(self) -> dict:
         """
@@ -23,28 +58,33 @@ class CvParserAgent:
         
         Retourne :
             Un dictionnaire contenant les données extraites du CV, ou None en cas d'erreur.
+        Lève :
+            PdfIngestionError si le PDF est illisible ou dépasse les limites de taille/pages.
+            LLMUnavailableError si le fournisseur LLM reste saturé malgré les réessais.
         """
-        print(f"Début du traitement du CV : {self.pdf_path}")
+        print(f"Début du traitement du CV : {self.pdf_path or 'upload en mémoire'}")
         
         try:
-            cv_text_content = load_pdf(self.pdf_path)
-            crew_output = analyse_cv(cv_text_content)
-
-            if not crew_output or not hasattr(crew_output, 'raw') or not crew_output.raw.strip():
-                print("Erreur : L'analyse par le crew n'a pas retourné de résultat.")
-                return None
-            raw_string = crew_output.raw
-            json_string_cleaned = raw_string
-            if '```' in raw_string:
-                json_part = raw_string.split('```json')[1].split('```')[0]
-                json_string_cleaned = json_part.strip()
-            profile_data = json.loads(json_string_cleaned)
-            return clean_dict_keys(profile_data)
-
-        except json.JSONDecodeError as e:
-            print(f"Erreur de décodage JSON : {e}")
-            print(f"Données brutes reçues : {crew_output.raw}")
+            cv_text_content = self._read_text()
+            return self._parse_crew_output(analyse_cv(cv_text_content))
+        except (PdfIngestionError, LLMUnavailableError):
+            raise
+        except Exception as e:
+            print(f"Une erreur inattendue est survenue dans CvParserAgent : {e}")
             return None
+
+    async def aprocess(self) -> dict:
+        """
+        Version asynchrone de `process` : l'extraction du PDF passe par le pool CPU borné
+        et le pipeline d'agents par `kickoff_async`, sans bloquer la boucle d'événements.
+        """
+        print(f"Début du traitement du CV : {self.pdf_path or 'upload en mémoire'}")
+
+        try:
+            cv_text_content = await run_cpu_bound(self._read_text)
+            return self._parse_crew_output(await aanalyse_cv(cv_text_content))
+        except (PdfIngestionError, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"Une erreur inattendue est survenue dans CvParserAgent : {e}")
             return None
\ No newline at end of file
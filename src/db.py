@@ -0,0 +1,35 @@
+import os
+from functools import lru_cache
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "hr_ai_system")
+
+
+@lru_cache(maxsize=None)
+def get_mongo_client():
+    """Client MongoDB partagé par le processus (pool de connexions interne à pymongo)."""
+    from pymongo import MongoClient
+    return MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+
+
+def get_database():
+    return get_mongo_client()[MONGO_DB_NAME]
+
+
+def get_feedback_collection():
+    return get_database().interview_feedbacks
+
+
+@lru_cache(maxsize=None)
+def get_async_mongo_client():
+    """Client motor partagé, pour les accès MongoDB depuis la boucle asyncio de l'API."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+
+
+def get_async_database():
+    return get_async_mongo_client()[MONGO_DB_NAME]
+
+
+def get_async_feedback_collection():
+    return get_async_database().interview_feedbacks
@@ -1,21 +1,116 @@
-import torch
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
+import os
+
+# torch, transformers et sentence_transformers ne sont importés qu'au chargement
+# des modèles ou à l'inférence : importer ce module reste quasi gratuit.
+from src.model_registry import model_registry
+from src.onnx_backend import use_onnx, load_onnx_pipeline, load_onnx_sentence_transformer
+from src.utils.tracing import stage
+
+SENTIMENT_MODEL_NAME = "astrosbd/french_emotion_camembert"
+SIMILARITY_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+INTENT_MODEL_NAME = "joeddav/xlm-roberta-large-xnli"
+
+# Tailles de lot pour le chemin batché (run_batch_analysis)
+SENTIMENT_BATCH_SIZE = int(os.getenv("ANALYZER_SENTIMENT_BATCH_SIZE", "32"))
+SIMILARITY_BATCH_SIZE = int(os.getenv("ANALYZER_SIMILARITY_BATCH_SIZE", "64"))
+INTENT_BATCH_SIZE = int(os.getenv("ANALYZER_INTENT_BATCH_SIZE", "8"))
+
+# "nli" : zero-shot xlm-roberta (précis, lent) ; "embedding" : similarité cosinus avec MiniLM (rapide)
+INTENT_CLASSIFIER_MODE = os.getenv("INTENT_CLASSIFIER_MODE", "nli").lower()
+# Température du softmax appliqué aux similarités cosinus en mode "embedding"
+INTENT_EMBEDDING_TEMPERATURE = float(os.getenv("INTENT_EMBEDDING_TEMPERATURE", "0.05"))
+INTENT_LABEL_TEMPLATE = "Le candidat {}."
+
+CANDIDATE_LABELS = [
+    "parle de son expérience technique",
+    "exprime sa motivation",
+    "pose une question",
+    "exprime de l’incertitude ou du stress"
+]
+
+
+def _load_sentiment_analyzer():
+    if use_onnx():
+        onnx_pipeline = load_onnx_pipeline("text-classification", SENTIMENT_MODEL_NAME, return_all_scores=True)
+        if onnx_pipeline is not None:
+            return onnx_pipeline
+    import torch
+    from transformers import pipeline
+    return pipeline(
+        "text-classification",
+        model=SENTIMENT_MODEL_NAME,
+        return_all_scores=True,
+        device=0 if torch.cuda.is_available() else -1,
+    )
+
+def _load_similarity_model():
+    if use_onnx():
+        onnx_model = load_onnx_sentence_transformer(SIMILARITY_MODEL_NAME)
+        if onnx_model is not None:
+            return onnx_model
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SIMILARITY_MODEL_NAME)
+
+def _load_intent_classifier():
+    if use_onnx():
+        onnx_pipeline = load_onnx_pipeline("zero-shot-classification", INTENT_MODEL_NAME)
+        if onnx_pipeline is not None:
+            return onnx_pipeline
+    from transformers import pipeline
+    return pipeline(
+        "zero-shot-classification",
+        model=INTENT_MODEL_NAME
+        #device=0 if torch.cuda.is_available() else -1,
+    )
+
+def _load_intent_label_embeddings():
+    """Encode une seule fois les libellés d'intention (normalisés) avec MiniLM."""
+    similarity_model = model_registry.get("similarity_model")
+    hypotheses = [INTENT_LABEL_TEMPLATE.format(label) for label in CANDIDATE_LABELS]
+    return similarity_model.encode(hypotheses, convert_to_tensor=True, normalize_embeddings=True)
+
+model_registry.register("sentiment_analyzer", _load_sentiment_analyzer)
+model_registry.register("similarity_model", _load_similarity_model)
+model_registry.register("intent_classifier", _load_intent_classifier, warmup=INTENT_CLASSIFIER_MODE == "nli")
+model_registry.register("intent_label_embeddings", _load_intent_label_embeddings, pinned=True)
+
+
+def _user_turns(messages):
+    return [msg['content'] for msg in messages if msg['role'] == 'user']
+
+def _length_sorted_unique(texts):
+    """
+    Dédoublonne les textes puis les trie par longueur décroissante : les lots
+    découpés ensuite regroupent des séquences de tailles proches (peu de padding).
+    """
+    return sorted(set(texts), key=len, reverse=True)
+
 
 class MultiModelInterviewAnalyzer:
-    def __init__(self):
-        self.sentiment_analyzer = pipeline(
-            "text-classification",
-            model="astrosbd/french_emotion_camembert",
-            return_all_scores=True,
-            device=0 if torch.cuda.is_available() else -1,
-        )
-        self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.intent_classifier = pipeline(
-            "zero-shot-classification",
-            model="joeddav/xlm-roberta-large-xnli"
-            #device=0 if torch.cuda.is_available() else -1,
-        )
+    """
+    Analyse d'entretien multi-modèles. Les modèles sont résolus via le registre
+    partagé du processus : instancier l'analyseur ne charge rien.
+
+    Args:
+        intent_mode (str | None): "nli" ou "embedding" ; par défaut INTENT_CLASSIFIER_MODE.
+    """
+
+    def __init__(self, intent_mode: str = None):
+        self.intent_mode = (intent_mode or INTENT_CLASSIFIER_MODE).lower()
+        if self.intent_mode not in ("nli", "embedding"):
+            raise ValueError(f"Mode de classification d'intention inconnu : {self.intent_mode}")
+
+    @property
+    def sentiment_analyzer(self):
+        return model_registry.get("sentiment_analyzer")
+
+    @property
+    def similarity_model(self):
+        return model_registry.get("similarity_model")
+
+    @property
+    def intent_classifier(self):
+        return model_registry.get("intent_classifier")
 
     def analyze_sentiment(self, messages):
         user_messages = [msg['content'] for msg in messages if msg['role'] == 'user']
@@ -25,9 +120,13 @@ class MultiModelInterviewAnalyzer:
         return sentiments
 
     def compute_semantic_similarity(self, messages, job_requirements):
+        if not job_requirements:
+            return 0.0
         user_answers = " ".join([msg['content'] for msg in messages if msg['role'] == 'user'])
-        embedding_answers = self.similarity_model.encode(user_answers, convert_to_tensor=True)
-        embedding_requirements = self.similarity_model.encode(job_requirements, convert_to_tensor=True)
+        similarity_model = self.similarity_model
+        embedding_answers = similarity_model.encode(user_answers, convert_to_tensor=True)
+        embedding_requirements = similarity_model.encode(job_requirements, convert_to_tensor=True)
+        from sentence_transformers import util
         cosine_score = util.cos_sim(embedding_answers, embedding_requirements)
         
         return cosine_score.max().item()
@@ -36,15 +135,37 @@ class MultiModelInterviewAnalyzer:
         user_answers = [msg['content'] for msg in messages if msg['role'] == 'user']
         if not user_answers:
             return []
-        candidate_labels = [
-            "parle de son expérience technique",
-            "exprime sa motivation",
-            "pose une question",
-            "exprime de l’incertitude ou du stress"
-        ]
-        classifications = self.intent_classifier(user_answers, candidate_labels, multi_label=False)
+        classifications = self._classify_intents(user_answers)
         return classifications
 
+    def _classify_intents(self, texts, batch_size=None):
+        if self.intent_mode == "embedding":
+            return self._classify_intents_by_embedding(texts, batch_size)
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        return self.intent_classifier(texts, CANDIDATE_LABELS, multi_label=False, **kwargs)
+
+    def _classify_intents_by_embedding(self, texts, batch_size=None):
+        """
+        Classification d'intention par similarité cosinus avec les libellés pré-encodés.
+        Retourne la même forme que le pipeline zero-shot : sequence, labels et scores triés.
+        """
+        label_embeddings = model_registry.get("intent_label_embeddings")
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        text_embeddings = self.similarity_model.encode(
+            texts, convert_to_tensor=True, normalize_embeddings=True, **kwargs
+        )
+        import torch
+        probabilities = torch.softmax(text_embeddings @ label_embeddings.T / INTENT_EMBEDDING_TEMPERATURE, dim=1)
+        scores, indices = probabilities.sort(dim=1, descending=True)
+        return [
+            {
+                "sequence": text,
+                "labels": [CANDIDATE_LABELS[i] for i in row_indices.tolist()],
+                "scores": row_scores.tolist(),
+            }
+            for text, row_scores, row_indices in zip(texts, scores, indices)
+        ]
+
     def run_full_analysis(self, conversation_history, job_requirements):
         sentiment_results = self.analyze_sentiment(conversation_history)
         similarity_score = self.compute_semantic_similarity(conversation_history, job_requirements)
@@ -55,4 +176,83 @@ class MultiModelInterviewAnalyzer:
             "intent_analysis": intent_results,
             "raw_transcript": conversation_history 
         }
-        return analysis_output
\ No newline at end of file
+        return analysis_output
+
+    def run_batch_analysis(self, conversations, job_requirements_list):
+        """
+        Analyse plusieurs entretiens en une passe par modèle.
+
+        Les tours utilisateur de tous les entretiens sont aplatis, dédoublonnés et
+        triés par longueur, puis envoyés par lots à chaque modèle ; les résultats
+        sont redistribués par entretien. La sortie est identique à un appel de
+        `run_full_analysis` par entretien.
+        """
+        if len(conversations) != len(job_requirements_list):
+            raise ValueError("conversations et job_requirements_list doivent avoir la même longueur.")
+        if not conversations:
+            return []
+
+        turns_per_interview = [_user_turns(conversation) for conversation in conversations]
+        all_turns = _length_sorted_unique(turn for turns in turns_per_interview for turn in turns)
+
+        # 1. Sentiment : un appel batché sur l'ensemble des tours distincts
+        sentiment_by_turn = {}
+        if all_turns:
+            with stage("dl_sentiment"):
+                sentiments = self.sentiment_analyzer(all_turns, batch_size=SENTIMENT_BATCH_SIZE)
+            sentiment_by_turn = dict(zip(all_turns, sentiments))
+
+        # 2. Intention : idem, avec le classifieur du mode configuré
+        intent_by_turn = {}
+        if all_turns:
+            with stage("dl_intent"):
+                intents = self._classify_intents(all_turns, batch_size=INTENT_BATCH_SIZE)
+            intent_by_turn = dict(zip(all_turns, intents))
+
+        # 3. Similarité : un encodage pour toutes les réponses, un pour toutes les exigences
+        with stage("dl_similarity"):
+            similarity_scores = self._batch_semantic_similarity(turns_per_interview, job_requirements_list)
+
+        results = []
+        for conversation, turns, similarity_score in zip(conversations, turns_per_interview, similarity_scores):
+            results.append({
+                "overall_similarity_score": round(similarity_score, 2),
+                "sentiment_analysis": [sentiment_by_turn[turn] for turn in turns],
+                "intent_analysis": [intent_by_turn[turn] for turn in turns],
+                "raw_transcript": conversation
+            })
+        return results
+
+    def _batch_semantic_similarity(self, turns_per_interview, job_requirements_list):
+        from sentence_transformers import util
+        similarity_model = self.similarity_model
+        joined_answers = [" ".join(turns) for turns in turns_per_interview]
+        requirements_per_interview = [
+            [requirements] if isinstance(requirements, str) else list(requirements)
+            for requirements in job_requirements_list
+        ]
+        unique_answers = _length_sorted_unique(joined_answers)
+        unique_requirements = _length_sorted_unique(
+            requirement for requirements in requirements_per_interview for requirement in requirements
+        )
+        # Sans exigence, aucune similarité à calculer : score 0.0, comme `compute_semantic_similarity`
+        if not unique_requirements:
+            return [0.0] * len(joined_answers)
+        answer_embeddings = similarity_model.encode(
+            unique_answers, batch_size=SIMILARITY_BATCH_SIZE, convert_to_tensor=True
+        )
+        requirement_embeddings = similarity_model.encode(
+            unique_requirements, batch_size=SIMILARITY_BATCH_SIZE, convert_to_tensor=True
+        )
+        answer_index = {text: i for i, text in enumerate(unique_answers)}
+        requirement_index = {text: i for i, text in enumerate(unique_requirements)}
+
+        scores = []
+        for answers, requirements in zip(joined_answers, requirements_per_interview):
+            rows = [requirement_index[requirement] for requirement in requirements]
+            if not rows:
+                scores.append(0.0)
+                continue
+            cosine_score = util.cos_sim(answer_embeddings[answer_index[answers]], requirement_embeddings[rows])
+            scores.append(cosine_score.max().item())
+        return scores
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.db import get_feedback_collection, get_async_feedback_collection
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_PAGE_SIZE_MAX = int(os.getenv("FEEDBACK_PAGE_SIZE_MAX", "100"))
+
+# Listes de rapports : jamais la transcription brute, le rapport complet seulement sur demande
+LIST_PROJECTION = {"conversation_history": 0, "job_description": 0, "feedback": 0}
+DETAIL_PROJECTION = {"conversation_history": 0}
+
+
+def feedback_index_models() -> list:
+    """Index de `interview_feedbacks` ; le task_id Celery est l'`_id`, donc déjà indexé."""
+    from pymongo import ASCENDING, DESCENDING, IndexModel
+
+    return [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at"),
+        IndexModel([("job_offer_id", ASCENDING), ("created_at", DESCENDING)], name="job_offer_id_created_at"),
+    ]
+
+
+def ensure_feedback_indexes() -> None:
+    get_feedback_collection().create_indexes(feedback_index_models())
+
+
+async def aensure_feedback_indexes() -> None:
+    await get_async_feedback_collection().create_indexes(feedback_index_models())
+
+
+def feedback_document(task_id: str, report: str, conversation_history: list, job_description: Any,
+                      user_id: Optional[str] = None, job_offer_id: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "_id": task_id,
+        "user_id": user_id,
+        "job_offer_id": job_offer_id,
+        "status": "SUCCESS",
+        "feedback": report,
+        "conversation_history": conversation_history,
+        "job_description": job_description,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def save_feedbacks(documents: List[Dict[str, Any]]) -> int:
+    """Enregistre un lot de rapports en un seul bulk_write (idempotent sur le task_id)."""
+    from pymongo import ReplaceOne
+
+    if not documents:
+        return 0
+    result = get_feedback_collection().bulk_write(
+        [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents],
+        ordered=False,
+    )
+    return result.upserted_count + result.modified_count
+
+
+def _serialize(document: Dict[str, Any]) -> Dict[str, Any]:
+    document["task_id"] = document.pop("_id")
+    created_at = document.get("created_at")
+    if isinstance(created_at, datetime):
+        # pymongo rend des dates UTC sans fuseau (client non tz_aware)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        document["created_at"] = created_at.isoformat()
+    return document
+
+
+async def get_feedback(task_id: str, include_transcript: bool = False) -> Optional[Dict[str, Any]]:
+    projection = None if include_transcript else DETAIL_PROJECTION
+    document = await get_async_feedback_collection().find_one({"_id": task_id}, projection)
+    return _serialize(document) if document else None
+
+
+async def list_feedbacks(user_id: Optional[str] = None, job_offer_id: Optional[str] = None,
+                         page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """Page de rapports, du plus récent au plus ancien, servie par les index (user_id|job_offer_id, created_at)."""
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if job_offer_id:
+        query["job_offer_id"] = job_offer_id
+    page_size = max(1, min(page_size, FEEDBACK_PAGE_SIZE_MAX))
+    cursor = (
+        get_async_feedback_collection()
+        .find(query, LIST_PROJECTION)
+        .sort("created_at", -1)
+        .skip((page - 1) * page_size)
+        .limit(page_size + 1)  # un document de plus pour savoir s'il reste une page
+    )
+    documents = await cursor.to_list(length=page_size + 1)
+    return {
+        "page": page,
+        "page_size": page_size,
+        "has_more": len(documents) > page_size,
+        "items": [_serialize(document) for document in documents[:page_size]],
+    }
@@ -1,25 +1,167 @@
 import os
 import sys
 import json
-from typing import Dict, List, Any, Annotated
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Any, Annotated, TYPE_CHECKING
 from typing_extensions import TypedDict
 
 from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage
-from langchain_groq import ChatGroq
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode 
-from langchain_openai import ChatOpenAI
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 from src.config import read_system_prompt, format_cv
 from src.crew.crew_pool import interview_analyser 
+from src.utils.lru_cache import LRUCache
+from src.utils.tracing import stage, record_llm_usage
+from src.prompt_layout import assemble, check_static
+
+# Consignes (identiques pour toutes les sessions) puis contexte de la session (offre, CV)
+INSTRUCTIONS_PATH = 'prompts/interview_instructions.txt'
+CONTEXT_TEMPLATE_PATH = 'prompts/interview_context.txt'
+# Nombre de couples (CV, offre) dont le prompt système rendu reste en mémoire
+INTERVIEW_PROMPT_CACHE_SIZE = int(os.getenv("INTERVIEW_PROMPT_CACHE_SIZE", "256"))
+
+TOOLS = [interview_analyser]
+
+_rendered_prompts = LRUCache(INTERVIEW_PROMPT_CACHE_SIZE)
 
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    # Prompt déjà rendu pour le couple (CV, offre) de la session
+    system_prompt: str
+
+
+@lru_cache(maxsize=1)
+def get_llm() -> "ChatOpenAI":
+    # Pool HTTP et limites du modèle partagés avec les autres appels gpt-4o-mini (agents crewai)
+    from src.llm_clients import create_chat_llm
+    return create_chat_llm("gpt-4o-mini", temperature=0.6)
+
+
+@lru_cache(maxsize=1)
+def get_llm_with_tools():
+    return get_llm().bind_tools(TOOLS)
+
+
+@lru_cache(maxsize=1)
+def load_instructions() -> str:
+    return check_static(read_system_prompt(INSTRUCTIONS_PATH), INSTRUCTIONS_PATH)
+
+
+@lru_cache(maxsize=1)
+def load_context_template() -> str:
+    return read_system_prompt(CONTEXT_TEMPLATE_PATH)
+
+
+def render_system_prompt(cv_data: Dict[str, Any], job_offer: Dict[str, Any]) -> str:
+    """
+    Rend le prompt système une seule fois par couple (CV, offre), identifié par son hash.
+    Les consignes statiques viennent en tête pour profiter du cache de préfixe du fournisseur.
+    """
+    payload = json.dumps([cv_data, job_offer], sort_keys=True, ensure_ascii=False, default=str)
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    system_prompt = _rendered_prompts.get(key)
+    if system_prompt is not None:
+        return system_prompt
+
+    with stage("prompt_render"):
+        formatted_cv_str = format_cv(cv_data)
+        mission = job_offer.get('mission', 'Non spécifiée')
+        profil_recherche = job_offer.get('profil_recherche', 'Non spécifié')
+        competences = job_offer.get('competences', 'Non spécifiées')
+        pole = job_offer.get('pole', 'Non spécifié')
+        context = load_context_template().format(
+            entreprise=job_offer.get('entreprise', 'notre entreprise'),
+            poste=job_offer.get('poste', 'ce poste'),
+            mission=mission,
+            profil_recherche=profil_recherche,
+            competences=competences,
+            pole=pole,
+            cv=formatted_cv_str
+        )
+        system_prompt = assemble(load_instructions(), context)
+    _rendered_prompts.set(key, system_prompt)
+    return system_prompt
+
+
+def prompt_cache_stats() -> Dict[str, Any]:
+    return _rendered_prompts.stats()
+
+
+def _resolve_llm(config: RunnableConfig):
+    # Un modèle injecté (ex. modèle factice de test) est utilisé tel quel, sans bind_tools
+    llm = (config or {}).get("configurable", {}).get("llm")
+    return llm if llm is not None else get_llm_with_tools()
+
+
+def _build_llm_messages(state: State):
+    if state["messages"] and isinstance(state["messages"][-1], ToolMessage):
+        tool_message = state["messages"][-1]
+        return None, {"messages": [AIMessage(content=tool_message.content)]}
+    return [SystemMessage(content=state["system_prompt"])] + state["messages"], None
+
+
+def _chatbot_node(state: State, config: RunnableConfig) -> dict:
+    llm_messages, passthrough = _build_llm_messages(state)
+    if passthrough:
+        return passthrough
+    with stage("llm_call"):
+        response = _resolve_llm(config).invoke(llm_messages, config)
+    record_llm_usage("llm_call", response)
+    return {"messages": [response]}
+
+
+async def _achatbot_node(state: State, config: RunnableConfig) -> dict:
+    # Variante asynchrone : utilisée par ainvoke/astream_events, elle permet le streaming des tokens
+    llm_messages, passthrough = _build_llm_messages(state)
+    if passthrough:
+        return passthrough
+    with stage("llm_call"):
+        response = await _resolve_llm(config).ainvoke(llm_messages, config)
+    record_llm_usage("llm_call", response)
+    return {"messages": [response]}
+
+
+def _route_after_chatbot(state: State) -> str:
+    last_message = state["messages"][-1]
+    if last_message.tool_calls:
+        return "call_tool"
+    return END
+
+
+@lru_cache(maxsize=1)
+def get_interview_graph() -> any:
+    """Graphe compilé une fois par processus ; le CV et l'offre arrivent par l'état."""
+    graph_builder = StateGraph(State)
+    
+    graph_builder.add_node("chatbot", RunnableLambda(_chatbot_node, afunc=_achatbot_node))
+    graph_builder.add_node("call_tool", ToolNode(TOOLS))        
+    graph_builder.add_edge(START, "chatbot")        
+    graph_builder.add_conditional_edges(
+        "chatbot",
+        _route_after_chatbot,
+        {
+            "call_tool": "call_tool", 
+            END: END                  
+        }
+    )
+    graph_builder.add_edge("call_tool", "chatbot")
+    return graph_builder.compile()
+
 
 class InterviewProcessor:
-    def __init__(self, cv_document: Dict[str, Any], job_offer: Dict[str, Any], conversation_history: List[Dict[str, Any]]):
+    def __init__(self, cv_document: Dict[str, Any], job_offer: Dict[str, Any], conversation_history: List[Dict[str, Any]], system_prompt: str = None, llm=None):
+        """
+        `llm` remplace le modèle par défaut (gpt-4o-mini lié aux outils) pour ce
+        processeur uniquement, par exemple un modèle de chat factice en test.
+        """
         if not cv_document or 'candidat' not in cv_document:
             raise ValueError("Document CV invalide fourni.")
         if not job_offer:
@@ -28,71 +170,25 @@ class InterviewProcessor:
         self.job_offer = job_offer
         self.cv_data = cv_document['candidat']
         self.conversation_history = conversation_history
-        self.tools = [interview_analyser]
-        self.llm = self._get_llm()
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
-
-        self.system_prompt_template = self._load_prompt_template()
-        self.graph = self._build_graph()
-
-    def _get_llm(self) -> ChatOpenAI:
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        return ChatOpenAI(
-        temperature=0.6, 
-        model_name="gpt-4o-mini", 
-        api_key=openai_api_key
-    )
+        self.tools = TOOLS
+        self.llm = llm
+        # Une session d'entretien fournit le prompt rendu à son ouverture
+        self.system_prompt = system_prompt or render_system_prompt(self.cv_data, self.job_offer)
+        self.graph = get_interview_graph()
 
-    def _load_prompt_template(self) -> str:
-        return read_system_prompt('prompts/rag_prompt_old.txt')
-
-    def _chatbot_node(self, state: State) -> dict:
-        if state["messages"] and isinstance(state["messages"][-1], ToolMessage):
-            tool_message = state["messages"][-1]
-            return {"messages": [AIMessage(content=tool_message.content)]}
-        messages = state["messages"]
-        formatted_cv_str = format_cv(self.cv_data)
-
-        mission = self.job_offer.get('mission', 'Non spécifiée')
-        profil_recherche = self.job_offer.get('profil_recherche', 'Non spécifié')
-        competences = self.job_offer.get('competences', 'Non spécifiées')
-        pole = self.job_offer.get('pole', 'Non spécifié')
-        system_prompt = self.system_prompt_template.format(
-            entreprise=self.job_offer.get('entreprise', 'notre entreprise'),
-            poste=self.job_offer.get('poste', 'ce poste'),
-            mission=mission,
-            profil_recherche=profil_recherche,
-            competences=competences,
-            pole=pole,
-            cv=formatted_cv_str
-        )
-        llm_messages = [SystemMessage(content=system_prompt)] + messages
-        response = self.llm_with_tools.invoke(llm_messages)
-        return {"messages": [response]}
-
-    def _route_after_chatbot(self, state: State) -> str:
-        last_message = state["messages"][-1]
-        if last_message.tool_calls:
-            return "call_tool"
-        return END
-
-    def _build_graph(self) -> any:
-        graph_builder = StateGraph(State)
-        
-        graph_builder.add_node("chatbot", self._chatbot_node)
-        graph_builder.add_node("call_tool", ToolNode(self.tools))        
-        graph_builder.add_edge(START, "chatbot")        
-        graph_builder.add_conditional_edges(
-            "chatbot",
-            self._route_after_chatbot,
-            {
-                "call_tool": "call_tool", 
-                END: END                  
-            }
-        )
-        graph_builder.add_edge("call_tool", "chatbot")
-        return graph_builder.compile()
+    def _inputs(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"messages": self.conversation_history + messages, "system_prompt": self.system_prompt}
+
+    def _config(self) -> RunnableConfig:
+        return {"configurable": {"llm": self.llm}} if self.llm is not None else {}
 
     def run(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
-        initial_state = self.conversation_history + messages
-        return self.graph.invoke({"messages": initial_state})
\ No newline at end of file
+        return self.graph.invoke(self._inputs(messages), self._config())
+
+    async def arun(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tour d'entretien sans thread bloqué pendant l'appel au LLM."""
+        return await self.graph.ainvoke(self._inputs(messages), self._config())
+
+    def astream_events(self, messages: List[Dict[str, Any]]):
+        """Flux d'événements LangGraph (v2) d'un tour : tokens du LLM, appels d'outils, état final."""
+        return self.graph.astream_events(self._inputs(messages), self._config(), version="v2")
\ No newline at end of file
@@ -0,0 +1,247 @@
+import os
+import sys
+import copy
+import json
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# memory | redis | mongo
+INTERVIEW_SESSION_BACKEND = os.getenv("INTERVIEW_SESSION_BACKEND", "memory").lower()
+# Expiration glissante : chaque tour repousse l'échéance
+INTERVIEW_SESSION_TTL_SECONDS = int(os.getenv("INTERVIEW_SESSION_TTL_SECONDS", str(2 * 3600)))
+INTERVIEW_SESSION_MAX_SESSIONS = int(os.getenv("INTERVIEW_SESSION_MAX_SESSIONS", "1000"))
+INTERVIEW_SESSION_REDIS_URL = os.getenv("INTERVIEW_SESSION_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/2"))
+
+
+# Types des messages langchain sérialisés -> rôles des corps de requête de l'API
+API_ROLES = {"human": "user", "ai": "assistant"}
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def messages_to_transcript(messages: List[dict]) -> List[Dict[str, Any]]:
+    """Historique au format de l'API (`user` / `assistant`), sans les messages d'outils ni les appels d'outils vides."""
+    return [
+        {"role": API_ROLES[m["type"]], "content": m["data"]["content"]}
+        for m in messages
+        if m["type"] in API_ROLES and m["data"].get("content")
+    ]
+
+
+class InMemorySessionStore:
+    """
+    Sessions locales au processus (un seul worker uvicorn), expirées et bornées en nombre.
+    L'historique est en ajout seul : chaque message est copié une fois à l'écriture,
+    `get` rend une liste neuve qui référence ces messages : session et messages
+    rendus sont partagés avec le store, à ne pas modifier.
+    """
+
+    def __init__(self, max_sessions: int = INTERVIEW_SESSION_MAX_SESSIONS, ttl_seconds: int = INTERVIEW_SESSION_TTL_SECONDS):
+        self._sessions = LRUCache(max_sessions)
+        self.ttl_seconds = ttl_seconds
+
+    def _live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry["expires_at"] < time.monotonic():
+            self._sessions.pop(session_id)
+            return None
+        entry["expires_at"] = time.monotonic() + self.ttl_seconds
+        return entry
+
+    async def create(self, session_id: str, session: Dict[str, Any], messages: List[dict]) -> None:
+        self._sessions.set(session_id, {
+            "session": copy.deepcopy(session),
+            "messages": copy.deepcopy(messages),
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        })
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._live(session_id)
+        if entry is None:
+            return None
+        # Copie de surface : un tour ajouté ensuite n'apparaît pas dans l'historique déjà lu
+        return {**entry["session"], "messages": list(entry["messages"])}
+
+    async def append_messages(self, session_id: str, messages: List[dict]) -> bool:
+        entry = self._live(session_id)
+        if entry is None:
+            return False
+        entry["messages"].extend(copy.deepcopy(messages))
+        return True
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id) is not None
+
+
+class RedisSessionStore:
+    """
+    Sessions partagées entre workers : les données fixes (CV, offre, prompt) sont
+    écrites une fois, l'historique est une liste Redis à laquelle chaque tour ajoute.
+    """
+
+    def __init__(self, url: str = INTERVIEW_SESSION_REDIS_URL, ttl_seconds: int = INTERVIEW_SESSION_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _keys(session_id: str):
+        return f"interview-session:{session_id}", f"interview-session:{session_id}:messages"
+
+    async def create(self, session_id: str, session: Dict[str, Any], messages: List[dict]) -> None:
+        session_key, messages_key = self._keys(session_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(session_key, json.dumps(session, ensure_ascii=False), ex=self.ttl_seconds)
+            pipe.delete(messages_key)
+            if messages:
+                pipe.rpush(messages_key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+                pipe.expire(messages_key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session_key, messages_key = self._keys(session_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.get(session_key)
+            pipe.lrange(messages_key, 0, -1)
+            pipe.expire(session_key, self.ttl_seconds)
+            pipe.expire(messages_key, self.ttl_seconds)
+            raw_session, raw_messages, _, _ = await pipe.execute()
+        if not raw_session:
+            return None
+        return {**json.loads(raw_session), "messages": [json.loads(m) for m in raw_messages]}
+
+    async def append_messages(self, session_id: str, messages: List[dict]) -> bool:
+        session_key, messages_key = self._keys(session_id)
+        if not messages:
+            return bool(await self._client.expire(session_key, self.ttl_seconds))
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.expire(session_key, self.ttl_seconds)
+            pipe.rpush(messages_key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+            pipe.expire(messages_key, self.ttl_seconds)
+            alive, _, _ = await pipe.execute()
+        if not alive:
+            await self._client.delete(messages_key)
+        return bool(alive)
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self._client.delete(*self._keys(session_id)))
+
+
+class MongoSessionStore:
+    """Sessions persistantes dans MongoDB (motor), expirées par un index TTL sur `updated_at`."""
+
+    def __init__(self, ttl_seconds: int = INTERVIEW_SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._collection = None
+
+    async def _get_collection(self):
+        if self._collection is None:
+            from src.db import get_async_database
+
+            collection = get_async_database().interview_sessions
+            await collection.create_index("updated_at", expireAfterSeconds=self.ttl_seconds)
+            self._collection = collection
+        return self._collection
+
+    def _expired_before(self) -> datetime:
+        # L'index TTL n'est purgé que toutes les 60 s environ
+        return datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+
+    async def create(self, session_id: str, session: Dict[str, Any], messages: List[dict]) -> None:
+        collection = await self._get_collection()
+        await collection.replace_one(
+            {"_id": session_id},
+            {"_id": session_id, "session": session, "messages": messages, "updated_at": datetime.now(timezone.utc)},
+            upsert=True,
+        )
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        collection = await self._get_collection()
+        document = await collection.find_one_and_update(
+            {"_id": session_id, "updated_at": {"$gte": self._expired_before()}},
+            {"$set": {"updated_at": datetime.now(timezone.utc)}},
+        )
+        if not document:
+            return None
+        return {**document["session"], "messages": document["messages"]}
+
+    async def append_messages(self, session_id: str, messages: List[dict]) -> bool:
+        collection = await self._get_collection()
+        result = await collection.update_one(
+            {"_id": session_id, "updated_at": {"$gte": self._expired_before()}},
+            {"$push": {"messages": {"$each": messages}}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        )
+        return result.matched_count > 0
+
+    async def delete(self, session_id: str) -> bool:
+        collection = await self._get_collection()
+        result = await collection.delete_one({"_id": session_id})
+        return result.deleted_count > 0
+
+
+class SessionLocks:
+    """Sérialise les tours d'une même session dans ce processus (double envoi côté client)."""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[session_id] -= 1
+            if not self._waiters[session_id]:
+                del self._waiters[session_id]
+                del self._locks[session_id]
+
+
+def configured_workers(argv: List[str] = None) -> int:
+    """Workers demandés au serveur : `--workers` d'uvicorn, sinon WEB_CONCURRENCY (lu par uvicorn et gunicorn)."""
+    argv = sys.argv if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == "--workers" and i + 1 < len(argv):
+            return int(argv[i + 1])
+        if arg.startswith("--workers="):
+            return int(arg.split("=", 1)[1])
+    return int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+def warn_if_process_local(store, workers: int = None) -> bool:
+    """Avertit quand des sessions locales au processus sont servies par plusieurs workers."""
+    workers = configured_workers() if workers is None else workers
+    if isinstance(store, InMemorySessionStore) and workers > 1:
+        logger.warning(
+            f"Sessions d'entretien en mémoire avec {workers} workers : une session n'est visible que du worker "
+            f"qui l'a ouverte. Utiliser INTERVIEW_SESSION_BACKEND=redis ou mongo."
+        )
+        return True
+    return False
+
+
+def create_session_store(name: str = INTERVIEW_SESSION_BACKEND):
+    if name == "memory":
+        return InMemorySessionStore()
+    if name == "redis":
+        return RedisSessionStore()
+    if name == "mongo":
+        return MongoSessionStore()
+    raise ValueError(f"Backend de sessions d'entretien inconnu : {name}")
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre de mesures de time-to-first-token conservées pour les percentiles
+INTERVIEW_TTFT_WINDOW = int(os.getenv("INTERVIEW_TTFT_WINDOW", "500"))
+
+
+class LatencyRecorder:
+    """Dernières mesures d'une latence (en ms), résumées en médiane et p95."""
+
+    def __init__(self, window: int = INTERVIEW_TTFT_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, milliseconds: float) -> None:
+        with self._lock:
+            self._samples.append(milliseconds)
+            self.count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        if not samples:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "last_ms": None}
+        return {
+            "count": count,
+            "p50_ms": round(samples[len(samples) // 2], 1),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            "last_ms": round(self._samples[-1], 1),
+        }
+
+
+ttft_recorder = LatencyRecorder()
+
+
+def _analysis_task_id(message) -> Optional[str]:
+    artifact = getattr(message, "artifact", None)
+    if isinstance(artifact, dict):
+        return artifact.get("task_id")
+    return None
+
+
+def find_analysis_task_id(messages: List[Any]) -> Optional[str]:
+    """Identifiant de la tâche Celery lancée par `interview_analyser` pendant ce tour, s'il y en a une."""
+    for message in reversed(messages):
+        task_id = _analysis_task_id(message)
+        if task_id:
+            return task_id
+    return None
+
+
+async def stream_interview_turn(processor, messages: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Exécute un tour d'entretien et produit des événements au fil de l'eau :
+    `token` (fragment de réponse), `tool_start` / `tool_end` (analyse mise en file,
+    avec son `task_id`), puis `done` avec la réponse complète, le TTFT et l'état final du graphe
+    (clé `state`, réservée au serveur).
+    """
+    start = time.perf_counter()
+    first_token_at = None
+    streamed = []
+    root_run_id = None
+    final_state = None
+    analysis_task_id = None
+
+    def _token(content: str) -> Dict[str, Any]:
+        nonlocal first_token_at
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+            ttft_recorder.record((first_token_at - start) * 1000)
+        streamed.append(content)
+        return {"event": "token", "data": {"content": content}}
+
+    async for event in processor.astream_events(messages):
+        kind = event["event"]
+        if root_run_id is None:
+            root_run_id = event["run_id"]
+        if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "chatbot":
+            content = event["data"]["chunk"].content
+            if isinstance(content, str) and content:
+                yield _token(content)
+        elif kind == "on_tool_start":
+            streamed.clear()
+            yield {"event": "tool_start", "data": {"tool": event["name"]}}
+        elif kind == "on_tool_end":
+            task_id = _analysis_task_id(event["data"].get("output"))
+            analysis_task_id = task_id or analysis_task_id
+            yield {"event": "tool_end", "data": {"tool": event["name"], "task_id": task_id}}
+        elif kind == "on_chain_end" and event["run_id"] == root_run_id:
+            final_state = event["data"].get("output")
+
+    if not final_state:
+        raise RuntimeError("Le graphe d'entretien n'a pas produit d'état final.")
+    response = final_state["messages"][-1].content
+    # Après un appel d'outil, la réponse est le message de l'outil : elle n'a pas été streamée
+    if response and not streamed:
+        yield _token(response)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    ttft_ms = (first_token_at - start) * 1000 if first_token_at else None
+    logger.info(f"Tour d'entretien streamé : TTFT {ttft_ms or 0:.0f} ms, total {total_ms:.0f} ms.")
+    yield {
+        "event": "done",
+        "data": {
+            "response": response,
+            "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+            "total_ms": round(total_ms, 1),
+            "analysis_task_id": analysis_task_id,
+        },
+        "state": final_state,
+    }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
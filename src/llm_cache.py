@@ -0,0 +1,383 @@
+"""
+Cache des réponses LLM des agents crewai (prompts quasi identiques à température basse).
+
+Branché comme cache langchain (`BaseChatModel.cache`) : la clé couvre le modèle,
+ses paramètres (`llm_string`) et le prompt complet. En option, une recherche
+sémantique (MiniLM du registre) retrouve une réponse pour un prompt proche : seule
+la partie propre au candidat du dernier message est comparée (src/prompt_layout.py),
+les messages précédents et les consignes qui la précèdent devant être strictement
+identiques. Un texte plus long que ce que l'encodeur lit (`max_seq_length`) n'est
+jamais comparé : sa fin tronquée rendrait deux candidats indiscernables.
+
+Backends : SQLite local (`disk`) ou Redis (`redis`), avec expiration (TTL) et
+nombre d'entrées borné (éviction des moins récemment lues).
+
+Désactivé par défaut : les prompts contiennent le texte des CV (données personnelles).
+À activer explicitement, par exemple LLM_CACHE_BACKEND=disk,
+LLM_CACHE_DIR=/app/.cache/llm (chemin absolu, sur un volume dédié en production) et
+LLM_CACHE_AGENTS=all. L'agent de rapport n'est jamais mis en cache via "all" :
+il faut le nommer.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from prometheus_client import Counter
+
+from src.prompt_layout import split_session_part
+from src.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# disk | redis | none (défaut : aucun cache)
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "none").lower()
+# Relatif au répertoire courant si non absolu : préférer un chemin absolu en production
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+LLM_CACHE_REDIS_URL = os.getenv("LLM_CACHE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/2"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+# Agents dont les appels sont mis en cache : "" (aucun, défaut), "all" ou une liste séparée par des virgules
+LLM_CACHE_AGENTS = os.getenv("LLM_CACHE_AGENTS", "")
+# Exclus de "all" (rapport d'évaluation d'un candidat) : à nommer explicitement pour les mettre en cache
+LLM_CACHE_EXCLUDED_FROM_ALL = {"report_generator_agent"}
+LLM_CACHE_SEMANTIC = os.getenv("LLM_CACHE_SEMANTIC", "0") == "1"
+LLM_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.97"))
+
+EXACT_HIT = "exact"
+SEMANTIC_HIT = "semantic"
+MISS = "miss"
+
+LLM_CACHE_LOOKUPS = Counter("llm_cache_lookups_total", "Recherches dans le cache LLM", ["agent", "result"])
+LLM_CACHE_SAVED_TOKENS = Counter("llm_cache_saved_tokens_total", "Tokens évités par le cache LLM", ["agent"])
+LLM_CACHE_SAVED_SECONDS = Counter("llm_cache_saved_seconds_total", "Latence LLM évitée par le cache", ["agent"])
+
+
+class SqliteLLMCacheBackend:
+    """Cache sur disque local (SQLite), partagé par les processus d'une même machine."""
+
+    def __init__(self, directory: str = LLM_CACHE_DIR, ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "llm_cache.sqlite3"), check_same_thread=False, timeout=30)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, namespace TEXT, value TEXT, "
+                "embedding BLOB, tokens INTEGER, latency REAL, created REAL, accessed REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_namespace ON entries (namespace)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT value, tokens, latency FROM entries WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return {"value": row[0], "tokens": row[1], "latency": row[2]}
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        now = time.time()
+        embedding = entry.get("embedding")
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry["namespace"], entry["value"], embedding.tobytes() if embedding is not None else None,
+                 entry["tokens"], entry["latency"], now, now),
+            )
+            self._db.execute("DELETE FROM entries WHERE created <= ?", (now - self.ttl_seconds,))
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def vectors(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, embedding FROM entries WHERE namespace = ? AND embedding IS NOT NULL AND created > ?",
+                (namespace, time.time() - self.ttl_seconds),
+            ).fetchall()
+        return [(key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+
+
+class RedisLLMCacheBackend:
+    """Cache partagé entre machines : une entrée par clé (TTL Redis) et un index LRU borné."""
+
+    PREFIX = "llm-cache:"
+
+    def __init__(self, url: str = LLM_CACHE_REDIS_URL, ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lru = f"{self.PREFIX}lru"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.PREFIX}entry:{key}"
+
+    def _vectors_key(self, namespace: str) -> str:
+        return f"{self.PREFIX}vectors:{namespace}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.hmget(self._entry_key(key), "value", "tokens", "latency")
+        if raw[0] is None:
+            return None
+        self._client.zadd(self._lru, {key: time.time()})
+        return {"value": raw[0].decode("utf-8"), "tokens": int(raw[1]), "latency": float(raw[2])}
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        embedding = entry.get("embedding")
+        pipe = self._client.pipeline()
+        pipe.hset(self._entry_key(key), mapping={
+            "value": entry["value"], "tokens": entry["tokens"], "latency": entry["latency"], "namespace": entry["namespace"],
+        })
+        pipe.expire(self._entry_key(key), self.ttl_seconds)
+        if embedding is not None:
+            pipe.hset(self._vectors_key(entry["namespace"]), key, embedding.tobytes())
+            pipe.expire(self._vectors_key(entry["namespace"]), self.ttl_seconds)
+        pipe.zadd(self._lru, {key: time.time()})
+        pipe.execute()
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = self._client.zcard(self._lru) - self.max_entries
+        if excess <= 0:
+            return
+        for raw_key, _ in self._client.zpopmin(self._lru, excess):
+            key = raw_key.decode("utf-8")
+            namespace = self._client.hget(self._entry_key(key), "namespace")
+            pipe = self._client.pipeline()
+            pipe.delete(self._entry_key(key))
+            if namespace:
+                pipe.hdel(self._vectors_key(namespace.decode("utf-8")), key)
+            pipe.execute()
+
+    def vectors(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+        # Les entrées expirées gardent leur vecteur : `get` renverra None et la recherche passera à côté
+        raw = self._client.hgetall(self._vectors_key(namespace))
+        return [(key.decode("utf-8"), np.frombuffer(blob, dtype=np.float32)) for key, blob in raw.items()]
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(f"{self.PREFIX}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache_backend(name: str = LLM_CACHE_BACKEND):
+    if name == "disk":
+        return SqliteLLMCacheBackend()
+    if name == "redis":
+        return RedisLLMCacheBackend()
+    if name == "none":
+        return None
+    raise ValueError(f"Backend de cache LLM inconnu : {name}")
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _semantic_parts(prompt: str, llm_string: str) -> Optional[Tuple[str, str]]:
+    """
+    (espace de noms, texte à encoder) : la partie propre à la session du dernier message.
+    Les messages précédents et les consignes statiques qui la précèdent font partie de l'espace de noms.
+    """
+    try:
+        messages = json.loads(prompt)
+        text = messages[-1]["kwargs"]["content"]
+    except (ValueError, LookupError, TypeError):
+        return None
+    if not isinstance(text, str) or not text:
+        return None
+    static_part, session_part = split_session_part(text)
+    return _hash(llm_string, json.dumps(messages[:-1], sort_keys=True), static_part), session_part
+
+
+def _pending_key(prompt: str, llm_string: str) -> Tuple[str, str]:
+    return _hash(prompt), _hash(llm_string)
+
+
+def _fits_encoder(model, text: str) -> bool:
+    """Le texte tient-il entièrement dans la fenêtre de l'encodeur (sans troncature) ?"""
+    max_length = getattr(model, "max_seq_length", None)
+    tokenizer = getattr(model, "tokenizer", None)
+    if not max_length or tokenizer is None:
+        return False
+    return len(tokenizer(text, add_special_tokens=True)["input_ids"]) <= max_length
+
+
+def _embed(text: str) -> Optional[np.ndarray]:
+    """Embedding normalisé, ou None si l'encodeur tronquerait le texte (recherche sémantique refusée)."""
+    from src.model_registry import model_registry
+    import src.deep_learning_analyzer  # noqa: F401 -- enregistre "similarity_model" (MiniLM)
+
+    model = model_registry.get("similarity_model")
+    if not _fits_encoder(model, text):
+        return None
+    vector = model.encode(text, normalize_embeddings=True)
+    return np.asarray(vector, dtype=np.float32)
+
+
+def _used_tokens(generations: Sequence[Any]) -> int:
+    total = 0
+    for generation in generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        total += usage.get("total_tokens", 0)
+    return total
+
+
+class LLMResponseCache(BaseCache):
+    """Cache langchain d'un agent : recherche exacte, puis sémantique si activée ; compteurs par agent."""
+
+    def __init__(self, agent: str, backend, semantic: bool = LLM_CACHE_SEMANTIC,
+                 threshold: float = LLM_CACHE_SIMILARITY_THRESHOLD):
+        self.agent = agent
+        self.backend = backend
+        self.semantic = semantic
+        self.threshold = threshold
+        # Appels manqués en cours, par (prompt, llm_string) : début de l'appel et embedding, repris par `update`
+        self._pending = LRUCache(1024)
+        self._lock = threading.Lock()
+        self.counts = {EXACT_HIT: 0, SEMANTIC_HIT: 0, MISS: 0}
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+
+    def _record(self, result: str, entry: Dict[str, Any] = None) -> None:
+        LLM_CACHE_LOOKUPS.labels(self.agent, result).inc()
+        with self._lock:
+            self.counts[result] += 1
+            if entry is not None:
+                self.saved_tokens += entry["tokens"]
+                self.saved_seconds += entry["latency"]
+        if entry is not None:
+            LLM_CACHE_SAVED_TOKENS.labels(self.agent).inc(entry["tokens"])
+            LLM_CACHE_SAVED_SECONDS.labels(self.agent).inc(entry["latency"])
+
+    def _semantic_lookup(self, namespace: str, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        candidates = self.backend.vectors(namespace)
+        if not candidates:
+            return None
+        keys = [key for key, _ in candidates]
+        similarities = np.stack([candidate for _, candidate in candidates]) @ vector
+        for index in np.argsort(-similarities):
+            if similarities[index] < self.threshold:
+                return None
+            entry = self.backend.get(keys[index])
+            if entry is not None:
+                return entry
+        return None
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        key = _hash(llm_string, prompt)
+        vector = None
+        try:
+            entry = self.backend.get(key)
+            result = EXACT_HIT
+            if entry is None and self.semantic:
+                parts = _semantic_parts(prompt, llm_string)
+                vector = _embed(parts[1]) if parts is not None else None
+                if vector is not None:
+                    entry = self._semantic_lookup(parts[0], vector)
+                    result = SEMANTIC_HIT
+        except Exception as e:
+            # Un cache en panne se comporte comme un cache vide
+            logger.warning(f"Cache LLM indisponible en lecture : {e}")
+            entry = None
+        if entry is not None:
+            self._record(result, entry)
+            return loads(entry["value"])
+        self._record(MISS)
+        self._pending.set(_pending_key(prompt, llm_string), (time.perf_counter(), vector))
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key = _hash(llm_string, prompt)
+        started, vector = self._pending.pop(_pending_key(prompt, llm_string)) or (None, None)
+        parts = _semantic_parts(prompt, llm_string) if self.semantic else None
+        try:
+            if parts is not None and vector is None:
+                vector = _embed(parts[1])
+            # Sans embedding (texte trop long pour l'encodeur), l'entrée ne sert qu'en recherche exacte
+            semantic = parts is not None and vector is not None
+            self.backend.set(key, {
+                "value": dumps(list(return_val)),
+                "namespace": parts[0] if semantic else "",
+                "embedding": vector if semantic else None,
+                "tokens": _used_tokens(return_val),
+                "latency": time.perf_counter() - started if started else 0.0,
+            })
+        except Exception as e:
+            logger.warning(f"Cache LLM indisponible en écriture : {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = sum(self.counts.values())
+            hits = self.counts[EXACT_HIT] + self.counts[SEMANTIC_HIT]
+            return {
+                "exact_hits": self.counts[EXACT_HIT],
+                "semantic_hits": self.counts[SEMANTIC_HIT],
+                "misses": self.counts[MISS],
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "saved_tokens": self.saved_tokens,
+                "saved_seconds": round(self.saved_seconds, 2),
+            }
+
+
+_agent_caches: Dict[str, LLMResponseCache] = {}
+_agent_caches_lock = threading.Lock()
+
+
+def cache_enabled_for(agent: str) -> bool:
+    agents = {name.strip() for name in LLM_CACHE_AGENTS.split(",") if name.strip()}
+    if agent in agents:
+        return True
+    return "all" in agents and agent not in LLM_CACHE_EXCLUDED_FROM_ALL
+
+
+def get_agent_cache(agent: str) -> Optional[LLMResponseCache]:
+    """Cache de l'agent `agent`, ou None si le cache est désactivé pour lui."""
+    if not cache_enabled_for(agent):
+        return None
+    backend = get_llm_cache_backend()
+    if backend is None:
+        return None
+    with _agent_caches_lock:
+        if agent not in _agent_caches:
+            _agent_caches[agent] = LLMResponseCache(agent, backend)
+        return _agent_caches[agent]
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    with _agent_caches_lock:
+        caches = dict(_agent_caches)
+    return {
+        "backend": LLM_CACHE_BACKEND,
+        "semantic": LLM_CACHE_SEMANTIC,
+        "agents": {agent: cache.stats() for agent, cache in caches.items()},
+    }
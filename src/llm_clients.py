@@ -0,0 +1,606 @@
+"""
+Fabrique centrale des clients LLM : pools de connexions HTTP partagés, limite de
+requêtes simultanées et budget de tokens par minute par modèle, réessais avec
+backoff exponentiel et jitter, métriques Prometheus (file d'attente, en cours, réessais,
+latence et part du prompt lue depuis le cache du fournisseur, par appel).
+
+Tous les appels (graphe d'entretien, agents crewai) passent par le même
+`ModelGovernor` pour un modèle donné, quel que soit le thread ou la boucle asyncio.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Serveur compatible OpenAI (ex. mock local : http://localhost:8001/v1) ; None = api.openai.com
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") == "1"
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+# Limites par défaut d'un modèle ; LLM_MODEL_LIMITS les surcharge, ex. {"gpt-4o": {"concurrency": 8, "tpm": 30000}}
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # 0 = pas de budget
+LLM_MODEL_LIMITS = json.loads(os.getenv("LLM_MODEL_LIMITS", "{}"))
+# Attente maximale d'une place (concurrence ou budget) avant d'abandonner en 503
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "20"))
+# Tokens de complétion réservés a priori quand max_tokens n'est pas fixé (ajusté après la réponse)
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "500"))
+# Usage (dont tokens en cache) dans le dernier fragment des réponses streamées (stream_options.include_usage)
+LLM_STREAM_USAGE = os.getenv("LLM_STREAM_USAGE", "1") == "1"
+
+LLM_QUEUE_DEPTH = Gauge("llm_queue_depth", "Appels LLM en attente d'une place", ["model"], multiprocess_mode="livesum")
+LLM_IN_FLIGHT = Gauge("llm_in_flight", "Appels LLM en cours", ["model"], multiprocess_mode="livesum")
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_queue_wait_seconds", "Attente avant l'envoi d'un appel LLM (concurrence et budget)", ["model"]
+)
+LLM_REQUESTS = Counter("llm_requests_total", "Appels LLM par issue", ["model", "outcome"])
+LLM_RETRIES = Counter("llm_retries_total", "Réessais d'appels LLM", ["model", "reason"])
+# Cache de préfixe du fournisseur : prompt_cache = hit | miss | unknown (usage non renvoyé)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_seconds", "Durée d'un appel LLM, hors attente d'une place", ["model", "prompt_cache"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0),
+)
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Tokens de prompt envoyés (kind=cached : lus depuis le cache)", ["model", "kind"])
+LLM_PROMPT_CACHE_RATIO = Histogram(
+    "llm_prompt_cache_ratio", "Part des tokens de prompt lus depuis le cache, par appel", ["model"],
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """Le fournisseur LLM est saturé (file pleine, limite de débit persistante) : à renvoyer en 503."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """Appelant en attente d'une place : un Event (thread) ou un Future (coroutine)."""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+class ConcurrencyLimiter:
+    """
+    Sémaphore FIFO partagé entre threads et boucles asyncio : une place libérée est
+    donnée directement au plus ancien appelant en attente.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        Retire un appelant qui n'attend plus. Renvoie True si une place lui a été donnée
+        entre l'expiration et le verrou : elle est alors à lui, à garder ou à rendre une fois.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def _release_locked(self) -> None:
+        if self._waiters:
+            self._waiters.popleft().wake()
+        else:
+            self.in_flight -= 1
+
+    def acquire(self, timeout: float) -> bool:
+        waiter = _Waiter()
+        if self._try_acquire(waiter):
+            return True
+        if waiter.event.wait(timeout):
+            return True
+        return self._abandon(waiter)
+
+    async def acquire_async(self, timeout: float) -> bool:
+        waiter = _Waiter(asyncio.get_running_loop())
+        if self._try_acquire(waiter):
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self._abandon(waiter)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._release_locked()
+
+
+class TokenBucket:
+    """Budget de tokens par minute : seau de capacité `tokens_per_minute`, rempli en continu."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: int) -> float:
+        """Prélève `tokens` si possible et renvoie 0, sinon le délai (s) avant de réessayer."""
+        # Un appel plus gros que le budget entier passe dès que le seau est plein
+        tokens = min(float(tokens), self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def adjust(self, delta: int) -> None:
+        """Corrige une réservation avec l'usage réel (delta > 0 : tokens rendus au budget)."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+
+def _is_retryable(error: Exception) -> Optional[str]:
+    """Motif de réessai (label Prometheus), ou None si l'erreur est définitive."""
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    if isinstance(error, openai.InternalServerError):
+        return "server_error"
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Backoff exponentiel avec jitter complet ; respecte Retry-After s'il est plus long."""
+    delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+class ModelGovernor:
+    """Limites d'un modèle : places simultanées, budget de tokens, réessais et métriques."""
+
+    def __init__(self, model: str, concurrency: int, tokens_per_minute: int = 0,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS, max_retries: int = LLM_MAX_RETRIES):
+        self.model = model
+        self.limiter = ConcurrencyLimiter(concurrency)
+        self.budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self._usage_lock = threading.Lock()
+
+    def _unavailable(self, reason: str, retry_after: float = None) -> LLMUnavailableError:
+        LLM_REQUESTS.labels(self.model, "rejected").inc()
+        return LLMUnavailableError(f"Modèle {self.model} indisponible : {reason}", retry_after=retry_after)
+
+    def _budget_wait(self, tokens: int, deadline: float) -> Optional[float]:
+        """Délai avant de réessayer la réservation ; lève si le budget ne sera pas disponible à temps."""
+        if self.budget is None:
+            return None
+        wait = self.budget.reserve(tokens)
+        if not wait:
+            return None
+        if time.monotonic() + wait > deadline:
+            raise self._unavailable("budget de tokens par minute épuisé", retry_after=wait)
+        return wait
+
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """Place réservée (concurrence puis budget) pour un appel synchrone."""
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        LLM_QUEUE_DEPTH.labels(self.model).inc()
+        try:
+            if not self.limiter.acquire(self.queue_timeout):
+                raise self._unavailable("trop d'appels en attente", retry_after=self.queue_timeout)
+            try:
+                while (wait := self._budget_wait(estimated_tokens, deadline)) is not None:
+                    time.sleep(wait)
+            except BaseException:
+                self.limiter.release()
+                raise
+        finally:
+            LLM_QUEUE_DEPTH.labels(self.model).dec()
+        LLM_QUEUE_WAIT_SECONDS.labels(self.model).observe(time.monotonic() - start)
+        LLM_IN_FLIGHT.labels(self.model).inc()
+        try:
+            yield
+        finally:
+            LLM_IN_FLIGHT.labels(self.model).dec()
+            self.limiter.release()
+
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens: int):
+        """Variante asynchrone de `slot` : l'attente ne bloque pas la boucle."""
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        LLM_QUEUE_DEPTH.labels(self.model).inc()
+        try:
+            if not await self.limiter.acquire_async(self.queue_timeout):
+                raise self._unavailable("trop d'appels en attente", retry_after=self.queue_timeout)
+            try:
+                while (wait := self._budget_wait(estimated_tokens, deadline)) is not None:
+                    await asyncio.sleep(wait)
+            except BaseException:
+                self.limiter.release()
+                raise
+        finally:
+            LLM_QUEUE_DEPTH.labels(self.model).dec()
+        LLM_QUEUE_WAIT_SECONDS.labels(self.model).observe(time.monotonic() - start)
+        LLM_IN_FLIGHT.labels(self.model).inc()
+        try:
+            yield
+        finally:
+            LLM_IN_FLIGHT.labels(self.model).dec()
+            self.limiter.release()
+
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        """Rend au budget la part non consommée de la réservation (ou prélève le dépassement)."""
+        if self.budget is not None and used_tokens is not None:
+            self.budget.adjust(estimated_tokens - used_tokens)
+
+    def observe(self, elapsed: float, result=None) -> None:
+        """Latence d'un appel et part de son prompt servie par le cache de préfixe du fournisseur."""
+        usage = _prompt_usage(result) if result is not None else None
+        if usage is None:
+            LLM_CALL_SECONDS.labels(self.model, "unknown").observe(elapsed)
+            return
+        prompt_tokens, cached_tokens = usage
+        LLM_CALL_SECONDS.labels(self.model, "hit" if cached_tokens else "miss").observe(elapsed)
+        LLM_PROMPT_TOKENS.labels(self.model, "prompt").inc(prompt_tokens)
+        LLM_PROMPT_TOKENS.labels(self.model, "cached").inc(cached_tokens)
+        if prompt_tokens:
+            LLM_PROMPT_CACHE_RATIO.labels(self.model).observe(cached_tokens / prompt_tokens)
+        with self._usage_lock:
+            self.prompt_tokens += prompt_tokens
+            self.cached_prompt_tokens += cached_tokens
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Délai avant réessai, ou relance l'erreur (convertie en 503 si c'est une saturation)."""
+        reason = _is_retryable(error)
+        if reason is None:
+            LLM_REQUESTS.labels(self.model, "error").inc()
+            raise error
+        retry_after = _retry_after(error)
+        if attempt >= self.max_retries:
+            LLM_REQUESTS.labels(self.model, "exhausted").inc()
+            raise LLMUnavailableError(
+                f"Modèle {self.model} indisponible après {attempt + 1} tentatives : {error}",
+                retry_after=retry_after,
+            ) from error
+        LLM_RETRIES.labels(self.model, reason).inc()
+        delay = backoff_delay(attempt, retry_after)
+        logger.warning(f"Appel {self.model} en échec ({reason}), nouvel essai dans {delay:.2f}s.")
+        return delay
+
+    def call(self, fn, estimated_tokens: int, usage=lambda result: None):
+        """Exécute `fn()` dans une place réservée, avec réessais ; `usage(result)` donne les tokens consommés."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot(estimated_tokens):
+                    start = time.perf_counter()
+                    result = fn()
+                    elapsed = time.perf_counter() - start
+            except LLMUnavailableError:
+                raise
+            except Exception as e:
+                time.sleep(self._on_error(e, attempt))
+                continue
+            self.settle(estimated_tokens, usage(result))
+            self.observe(elapsed, result)
+            LLM_REQUESTS.labels(self.model, "success").inc()
+            return result
+
+    async def acall(self, fn, estimated_tokens: int, usage=lambda result: None):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.aslot(estimated_tokens):
+                    start = time.perf_counter()
+                    result = await fn()
+                    elapsed = time.perf_counter() - start
+            except LLMUnavailableError:
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt))
+                continue
+            self.settle(estimated_tokens, usage(result))
+            self.observe(elapsed, result)
+            LLM_REQUESTS.labels(self.model, "success").inc()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "queued": self.limiter.queued,
+            "tokens_per_minute": int(self.budget.capacity) if self.budget else None,
+            "tokens_available": int(self.budget.tokens) if self.budget else None,
+            "prompt_tokens": self.prompt_tokens,
+            "prompt_cache_ratio": round(self.cached_prompt_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None,
+        }
+
+
+_governors: Dict[str, ModelGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(model: str) -> ModelGovernor:
+    with _governors_lock:
+        if model not in _governors:
+            limits = LLM_MODEL_LIMITS.get(model, {})
+            _governors[model] = ModelGovernor(
+                model,
+                concurrency=int(limits.get("concurrency", LLM_MAX_CONCURRENCY)),
+                tokens_per_minute=int(limits.get("tpm", LLM_TOKENS_PER_MINUTE)),
+            )
+        return _governors[model]
+
+
+def governor_stats() -> Dict[str, Dict[str, Any]]:
+    with _governors_lock:
+        governors = dict(_governors)
+    return {model: governor.stats() for model, governor in governors.items()}
+
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+@lru_cache(maxsize=1)
+def get_http_client():
+    """Client HTTP synchrone partagé (pool de connexions, HTTP/2 si disponible)."""
+    import httpx
+
+    return httpx.Client(http2=LLM_HTTP2, limits=_http_limits(), timeout=LLM_REQUEST_TIMEOUT_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client():
+    """
+    Client HTTP asynchrone partagé. Un client httpx async est lié à la boucle qui
+    l'utilise : il est créé dans le processus serveur, au premier appel.
+    """
+    import httpx
+
+    return httpx.AsyncClient(http2=LLM_HTTP2, limits=_http_limits(), timeout=LLM_REQUEST_TIMEOUT_SECONDS)
+
+
+async def aclose_http_clients() -> None:
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+
+
+def _estimate_prompt_tokens(messages) -> int:
+    return sum(len(str(getattr(message, "content", message))) for message in messages) // 4
+
+
+def _used_tokens(result) -> Optional[int]:
+    """Tokens consommés d'après la réponse (ChatResult, AIMessage ou dict d'usage OpenAI)."""
+    generations = getattr(result, "generations", None)
+    message = generations[0].message if generations else result
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    token_usage = (getattr(result, "llm_output", None) or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens")
+
+
+def _prompt_usage(result) -> Optional[tuple]:
+    """(tokens de prompt, dont lus depuis le cache), ou None si le fournisseur ne renvoie pas le détail."""
+    generations = getattr(result, "generations", None)
+    message = generations[0].message if generations else getattr(result, "message", result)
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    if "cache_read" in details:
+        return usage.get("input_tokens", 0), details["cache_read"] or 0
+    # Versions de langchain-openai qui ne remontent pas encore le détail dans usage_metadata
+    token_usage = ((getattr(result, "llm_output", None) or {}).get("token_usage")
+                   or (getattr(message, "response_metadata", None) or {}).get("token_usage") or {})
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    if cached is None:
+        return None
+    return token_usage.get("prompt_tokens", 0), cached
+
+
+@lru_cache(maxsize=1)
+def _governed_chat_class():
+    from langchain_openai import ChatOpenAI
+
+    class GovernedChatOpenAI(ChatOpenAI):
+        """ChatOpenAI dont chaque appel passe par le `ModelGovernor` de son modèle."""
+
+        def _estimate(self, messages) -> int:
+            return _estimate_prompt_tokens(messages) + (self.max_tokens or LLM_COMPLETION_TOKENS_ESTIMATE)
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            return get_governor(self.model_name).call(
+                lambda: super(GovernedChatOpenAI, self)._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages), usage=_used_tokens,
+            )
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            return await get_governor(self.model_name).acall(
+                lambda: super(GovernedChatOpenAI, self)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages), usage=_used_tokens,
+            )
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            # Place tenue pendant tout le flux. Ouverture et premier fragment réessayés comme
+            # `ModelGovernor.call` ; plus de réessai une fois le premier fragment émis
+            governor = get_governor(self.model_name)
+            estimate = self._estimate(messages)
+            for attempt in range(governor.max_retries + 1):
+                opened = False
+                try:
+                    with governor.slot(estimate):
+                        start = time.perf_counter()
+                        chunks = super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                        last = next(chunks, None)
+                        opened = True
+                        if last is not None:
+                            yield last
+                            for chunk in chunks:
+                                last = chunk
+                                yield chunk
+                        # L'usage n'est porté que par le dernier fragment
+                        governor.observe(time.perf_counter() - start, last)
+                except LLMUnavailableError:
+                    raise
+                except Exception as e:
+                    if opened:
+                        LLM_REQUESTS.labels(self.model_name, "error").inc()
+                        raise
+                    time.sleep(governor._on_error(e, attempt))
+                    continue
+                LLM_REQUESTS.labels(self.model_name, "success").inc()
+                return
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            governor = get_governor(self.model_name)
+            estimate = self._estimate(messages)
+            for attempt in range(governor.max_retries + 1):
+                opened = False
+                try:
+                    async with governor.aslot(estimate):
+                        start = time.perf_counter()
+                        chunks = super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                        last = await anext(chunks, None)
+                        opened = True
+                        if last is not None:
+                            yield last
+                            async for chunk in chunks:
+                                last = chunk
+                                yield chunk
+                        governor.observe(time.perf_counter() - start, last)
+                except LLMUnavailableError:
+                    raise
+                except Exception as e:
+                    if opened:
+                        LLM_REQUESTS.labels(self.model_name, "error").inc()
+                        raise
+                    await asyncio.sleep(governor._on_error(e, attempt))
+                    continue
+                LLM_REQUESTS.labels(self.model_name, "success").inc()
+                return
+
+    return GovernedChatOpenAI
+
+
+def create_chat_llm(model: str, temperature: float, **kwargs):
+    """
+    Client de chat langchain partagé : pools HTTP communs, réessais gérés ici
+    (ceux du SDK OpenAI sont désactivés pour ne pas se cumuler).
+    """
+    return _governed_chat_class()(
+        model=model,
+        temperature=temperature,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=LLM_BASE_URL,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=0,
+        **{"stream_usage": LLM_STREAM_USAGE, **kwargs},
+    )
+
+
+@lru_cache(maxsize=1)
+def _governed_crew_llm_class():
+    """Adaptateur `crewai.BaseLLM` (crewai >= 0.100, qui ne réutilise plus les modèles langchain)."""
+    try:
+        from crewai import BaseLLM
+    except ImportError:
+        return None
+    from langchain_core.messages import convert_to_messages
+
+    class GovernedCrewLLM(BaseLLM):
+        def __init__(self, chat_llm):
+            super().__init__(model=chat_llm.model_name, temperature=chat_llm.temperature)
+            self.chat_llm = chat_llm
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            return self.chat_llm.invoke(convert_to_messages(messages), stop=self.stop or None).content
+
+        def supports_function_calling(self) -> bool:
+            return False
+
+    return GovernedCrewLLM
+
+
+def create_crew_llm(model: str, temperature: float, cache=None):
+    """LLM des agents crewai, gouverné comme les autres appels du modèle ; `cache` : cache langchain de réponses."""
+    chat_llm = create_chat_llm(model, temperature, cache=cache)
+    crew_llm_class = _governed_crew_llm_class()
+    # crewai < 0.100 : les agents utilisent directement le modèle de chat langchain
+    return chat_llm if crew_llm_class is None else crew_llm_class(chat_llm)
@@ -0,0 +1,183 @@
+import gc
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 0 = aucun plafond, tous les modèles chargés restent résidents
+MAX_RESIDENT_MODELS = int(os.getenv("MODEL_REGISTRY_MAX_MODELS", "0"))
+# "" = pas de préchargement, "all" = tous les modèles, sinon liste séparée par des virgules
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "")
+
+
+def estimate_model_memory(model: Any) -> int:
+    """Estime l'empreinte mémoire (en octets) d'un modèle chargé."""
+    footprint = getattr(model, "memory_footprint", None)
+    if callable(footprint):
+        return int(footprint())
+    # Les pipelines transformers exposent le nn.Module sous `.model`,
+    # les embeddings langchain le SentenceTransformer sous `.client`
+    module = getattr(model, "model", None) or getattr(model, "client", None) or model
+    # Modèles ONNX Runtime (optimum) : la taille du fichier .onnx fait foi
+    model_path = getattr(module, "model_path", None)
+    if model_path and os.path.isfile(model_path):
+        return os.path.getsize(model_path)
+    parameters = getattr(module, "parameters", None)
+    if not callable(parameters):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    total += sum(b.numel() * b.element_size() for b in module.buffers())
+    return total
+
+
+class ModelRegistry:
+    """
+    Registre de modèles partagé par tout le processus.
+
+    Chaque modèle est déclaré avec un loader et n'est chargé qu'au premier `get`.
+    Les appels concurrents sur un modèle en cours de chargement attendent ce
+    chargement au lieu de le dupliquer. Au-delà de `max_models` modèles résidents,
+    le moins récemment utilisé (et non épinglé) est déchargé.
+    """
+
+    def __init__(self, max_models: int = 0):
+        self.max_models = max_models
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._pinned: set = set()
+        self._no_warmup: set = set()
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], pinned: bool = False, warmup: bool = True) -> None:
+        """
+        Déclare un modèle sans le charger. `pinned` l'exclut de la politique LRU,
+        `warmup=False` l'exclut du préchargement global (il reste chargeable à la demande).
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+            if pinned:
+                self._pinned.add(name)
+            if not warmup:
+                self._no_warmup.add(name)
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Retourne le modèle, en le chargeant une seule fois si nécessaire."""
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            if name not in self._loaders:
+                raise KeyError(f"Modèle non enregistré : {name}")
+            load_lock = self._load_locks[name]
+
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name]
+                loader = self._loaders[name]
+
+            logger.info(f"Chargement du modèle '{name}'...")
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            memory_bytes = estimate_model_memory(model)
+            logger.info(f"Modèle '{name}' chargé en {load_seconds:.1f}s ({memory_bytes / 1024 ** 2:.0f} Mo).")
+
+            with self._lock:
+                self._models[name] = model
+                self._stats[name] = {"load_seconds": load_seconds, "memory_bytes": memory_bytes}
+                evicted = self._evict_lru(keep=name)
+        self._release(evicted)
+        return model
+
+    def unload(self, name: str) -> bool:
+        """Décharge explicitement un modèle. Retourne False s'il n'était pas chargé."""
+        with self._lock:
+            if name not in self._models:
+                return False
+            evicted = [(name, self._models.pop(name))]
+            self._stats.pop(name, None)
+        self._release(evicted)
+        return True
+
+    def unload_all(self) -> None:
+        with self._lock:
+            evicted = list(self._models.items())
+            self._models.clear()
+            self._stats.clear()
+        self._release(evicted)
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """Charge à l'avance les modèles demandés (par défaut tous ceux éligibles au préchargement)."""
+        with self._lock:
+            if names is not None:
+                targets = list(names)
+            else:
+                targets = [name for name in self._loaders if name not in self._no_warmup]
+        for name in targets:
+            self.get(name)
+
+    def warmup_from_env(self, default: str = "") -> None:
+        """Préchargement piloté par MODEL_WARMUP, pour les démarrages FastAPI/Celery."""
+        setting = (MODEL_WARMUP or default).strip()
+        if not setting:
+            return
+        if setting.lower() == "all":
+            self.warmup()
+        else:
+            self.warmup(name.strip() for name in setting.split(",") if name.strip())
+
+    def memory_report(self) -> Dict[str, Dict[str, Any]]:
+        """État de chaque modèle enregistré : chargé ou non, mémoire et temps de chargement."""
+        with self._lock:
+            report = {}
+            for name in self._loaders:
+                stats = self._stats.get(name)
+                report[name] = {
+                    "loaded": name in self._models,
+                    "pinned": name in self._pinned,
+                    "memory_mb": round(stats["memory_bytes"] / 1024 ** 2, 1) if stats else 0.0,
+                    "load_seconds": round(stats["load_seconds"], 2) if stats else None,
+                }
+            return report
+
+    def _evict_lru(self, keep: str) -> list:
+        """Retire les modèles les moins récemment utilisés au-delà du plafond (sous verrou)."""
+        evicted = []
+        if self.max_models <= 0:
+            return evicted
+        for name in list(self._models):
+            if len(self._models) <= self.max_models:
+                break
+            if name == keep or name in self._pinned:
+                continue
+            evicted.append((name, self._models.pop(name)))
+            self._stats.pop(name, None)
+        return evicted
+
+    def _release(self, evicted: list) -> None:
+        if not evicted:
+            return
+        names = [name for name, _ in evicted]
+        evicted.clear()
+        logger.info(f"Modèles déchargés : {', '.join(names)}")
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+model_registry = ModelRegistry(max_models=MAX_RESIDENT_MODELS)
@@ -0,0 +1,165 @@
+import os
+import time
+import shutil
+import logging
+import argparse
+
+logger = logging.getLogger(__name__)
+
+# "torch" (par défaut) ou "onnx" : modèles exportés et quantifiés en int8 pour CPU
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+HF_HOME = os.getenv("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(HF_HOME, "onnx"))
+# Jeu d'instructions ciblé par la quantification dynamique : avx2, avx512, avx512_vnni ou arm64
+ONNX_QUANTIZATION_ARCH = os.getenv("ONNX_QUANTIZATION_ARCH", "avx2")
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def use_onnx() -> bool:
+    return INFERENCE_BACKEND == "onnx"
+
+
+def onnx_model_dir(model_name: str) -> str:
+    """Dossier de cache des artefacts ONNX d'un modèle du Hub."""
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+
+
+def _sentence_encoder_file_name() -> str:
+    return f"onnx/model_qint8_{ONNX_QUANTIZATION_ARCH}.onnx"
+
+
+def _quantization_config():
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    factory = getattr(AutoQuantizationConfig, ONNX_QUANTIZATION_ARCH)
+    if ONNX_QUANTIZATION_ARCH == "arm64":
+        return factory(is_static=False)
+    return factory(is_static=False, per_channel=False)
+
+
+def _publish(tmp_dir: str, target_dir: str) -> None:
+    """
+    Publie un export : le dossier devient une version `<modèle>.v<horodatage>` et le lien
+    `target_dir` bascule dessus d'un seul rename, comme le lien `current` du vector store.
+    La version précédente est gardée pour les processus qui sont en train de la charger.
+    """
+    parent, name = os.path.split(target_dir)
+    version_dir = f"{target_dir}.v{time.time_ns()}"
+    os.rename(tmp_dir, version_dir)
+    previous = os.path.realpath(target_dir) if os.path.islink(target_dir) else None
+    if os.path.isdir(target_dir) and not os.path.islink(target_dir):
+        # Ancien format (dossier réel) : mis de côté, un lien ne peut pas le remplacer
+        previous = f"{target_dir}.v0"
+        os.rename(target_dir, previous)
+    tmp_link = f"{target_dir}.link"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.basename(version_dir), tmp_link)
+    os.replace(tmp_link, target_dir)
+
+    keep = {version_dir, previous}
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if entry.startswith(f"{name}.v") and path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def export_sequence_classifier(model_name: str) -> str:
+    """Exporte un classifieur (émotions, NLI) en ONNX puis le quantifie dynamiquement en int8."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from transformers import AutoTokenizer
+
+    target_dir = onnx_model_dir(model_name)
+    tmp_dir = f"{target_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(f"Export ONNX de {model_name}...")
+    ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(tmp_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_dir)
+    ORTQuantizer.from_pretrained(tmp_dir).quantize(save_dir=tmp_dir, quantization_config=_quantization_config())
+    _publish(tmp_dir, target_dir)
+    logger.info(f"Artefacts ONNX sauvegardés dans : {target_dir}")
+    return target_dir
+
+
+def export_sentence_encoder(model_name: str) -> str:
+    """Exporte un encodeur sentence-transformers en ONNX avec quantification dynamique int8."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    target_dir = onnx_model_dir(model_name)
+    tmp_dir = f"{target_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(f"Export ONNX de {model_name}...")
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save_pretrained(tmp_dir)
+    export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION_ARCH, tmp_dir)
+    _publish(tmp_dir, target_dir)
+    logger.info(f"Artefacts ONNX sauvegardés dans : {target_dir}")
+    return target_dir
+
+
+def load_onnx_pipeline(task: str, model_name: str, **pipeline_kwargs):
+    """
+    Construit un pipeline transformers sur le modèle ONNX quantifié.
+    Retourne None si les artefacts sont absents ou si optimum n'est pas installé,
+    l'appelant retombe alors sur PyTorch.
+    """
+    # Lien résolu une fois : tous les fichiers viennent de la même version, même si un export la remplace
+    model_dir = os.path.realpath(onnx_model_dir(model_name))
+    if not os.path.exists(os.path.join(model_dir, QUANTIZED_FILE_NAME)):
+        logger.warning(f"Pas d'artefact ONNX pour {model_name} dans {model_dir}, repli sur PyTorch.")
+        return None
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer, pipeline
+    except ImportError:
+        logger.warning("optimum[onnxruntime] n'est pas installé (requirements-onnx.txt), repli sur PyTorch.")
+        return None
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=QUANTIZED_FILE_NAME)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer, **pipeline_kwargs)
+
+
+def onnx_sentence_encoder_args(model_name: str):
+    """
+    Arguments (chemin, model_kwargs) pour instancier l'encodeur ONNX quantifié via
+    SentenceTransformer ou HuggingFaceEmbeddings. None si les artefacts sont absents.
+    """
+    model_dir = os.path.realpath(onnx_model_dir(model_name))
+    file_name = _sentence_encoder_file_name()
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        logger.warning(f"Pas d'artefact ONNX pour {model_name} dans {model_dir}, repli sur PyTorch.")
+        return None
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        logger.warning("onnxruntime n'est pas installé (requirements-onnx.txt), repli sur PyTorch.")
+        return None
+    return model_dir, {"backend": "onnx", "model_kwargs": {"file_name": file_name}}
+
+
+def load_onnx_sentence_transformer(model_name: str):
+    args = onnx_sentence_encoder_args(model_name)
+    if args is None:
+        return None
+    from sentence_transformers import SentenceTransformer
+
+    model_dir, model_kwargs = args
+    return SentenceTransformer(model_dir, **model_kwargs)
+
+
+def export_all() -> None:
+    """Exporte tous les modèles de l'analyseur (l'encodeur MiniLM sert aussi au RAG)."""
+    from src.deep_learning_analyzer import SENTIMENT_MODEL_NAME, SIMILARITY_MODEL_NAME, INTENT_MODEL_NAME
+
+    export_sequence_classifier(SENTIMENT_MODEL_NAME)
+    export_sequence_classifier(INTENT_MODEL_NAME)
+    export_sentence_encoder(SIMILARITY_MODEL_NAME)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export ONNX int8 des modèles d'analyse.")
+    parser.add_argument("command", choices=["export"])
+    parser.parse_args()
+    export_all()
@@ -0,0 +1,69 @@
+import io
+import os
+from typing import BinaryIO, Iterator, Union
+
+# Limites appliquées avant toute extraction de texte
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+
+PdfSource = Union[bytes, bytearray, BinaryIO]
+
+
+class PdfIngestionError(ValueError):
+    """PDF illisible ou refusé ; `status_code` est le code HTTP à renvoyer."""
+    status_code = 400
+
+
+class PdfTooLargeError(PdfIngestionError):
+    status_code = 413
+
+
+def _as_stream(source: PdfSource, max_bytes: int) -> BinaryIO:
+    if isinstance(source, (bytes, bytearray)):
+        size = len(source)
+        stream = io.BytesIO(source)
+    else:
+        stream = source
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(0)
+    if size > max_bytes:
+        raise PdfTooLargeError(f"Le PDF dépasse la taille maximale autorisée ({max_bytes // (1024 * 1024)} Mo).")
+    return stream
+
+
+def _invalid_pdf_errors() -> tuple:
+    """
+    Erreurs d'un PDF malformé : la famille pypdf, plus ValueError et KeyError que
+    pypdf laisse passer sur une structure incohérente (xref, dictionnaires, flux).
+    """
+    from pypdf.errors import PyPdfError
+    return (PyPdfError, ValueError, KeyError)
+
+
+def iter_pdf_pages(source: PdfSource, max_pages: int = PDF_MAX_PAGES, max_bytes: int = PDF_MAX_BYTES) -> Iterator[str]:
+    """
+    Extrait le texte page par page, à la demande, directement depuis la mémoire.
+    Les limites de taille et de nombre de pages sont vérifiées avant la première page.
+    """
+    from pypdf import PdfReader
+
+    stream = _as_stream(source, max_bytes)
+    invalid_pdf = _invalid_pdf_errors()
+    try:
+        reader = PdfReader(stream)
+        page_count = len(reader.pages)
+    except invalid_pdf as e:
+        raise PdfIngestionError(f"PDF illisible : {e}") from e
+    if page_count > max_pages:
+        raise PdfTooLargeError(f"Le PDF contient {page_count} pages (maximum {max_pages}).")
+    for number in range(page_count):
+        try:
+            page_text = reader.pages[number].extract_text() or ""
+        except invalid_pdf as e:
+            raise PdfIngestionError(f"PDF illisible (page {number + 1}) : {e}") from e
+        yield page_text
+
+
+def extract_pdf_text(source: PdfSource, max_pages: int = PDF_MAX_PAGES, max_bytes: int = PDF_MAX_BYTES) -> str:
+    """Texte complet du PDF, pages séparées par une ligne vide, construit en une seule jointure."""
+    return "".join(f"{page_text}\n\n" for page_text in iter_pdf_pages(source, max_pages, max_bytes))
@@ -0,0 +1,73 @@
+"""
+Assemblage des prompts pour le cache de préfixe des fournisseurs (OpenAI met en
+cache les préfixes identiques d'au moins 1024 tokens) : consignes statiques
+d'abord, données propres à l'offre et au candidat ensuite.
+
+La partie statique ne doit contenir aucun champ à remplir : elle est alors
+identique octet pour octet d'une session à l'autre, ce que vérifient
+`benchmarks/check_prompt_prefix.py` et `tests/test_prompt_prefix.py`. Aucune partie
+statique n'atteint seule le seuil de 1024 tokens, même avec les schémas des outils.
+"""
+import os
+import hashlib
+import string
+from typing import Iterable
+
+# Entre la partie statique et la partie propre à la session
+DYNAMIC_SEPARATOR = "\n\n"
+CV_CONTENT_BLOCK = "Voici le contenu du CV :\n\n{cv_content}"
+# Débuts des blocs propres à la session, une fois le prompt rendu
+SESSION_MARKERS = (CV_CONTENT_BLOCK.split("{")[0],)
+
+
+def placeholders(template: str) -> list:
+    """Champs `{nom}` d'un gabarit str.format (les accolades doublées sont ignorées)."""
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+
+
+def check_static(static_part: str, name: str = "prompt") -> str:
+    """Refuse une partie statique qui dépend de la session (champ à remplir)."""
+    fields = placeholders(static_part)
+    if fields:
+        raise ValueError(f"La partie statique de {name} contient des champs dynamiques : {fields}")
+    return static_part
+
+
+def assemble(static_part: str, dynamic_part: str) -> str:
+    """Prompt final : partie statique inchangée, puis partie propre à la session."""
+    return static_part.rstrip() + DYNAMIC_SEPARATOR + dynamic_part.strip()
+
+
+def cv_task_description(instructions: str) -> str:
+    """Description d'une tâche d'extraction : consignes d'abord, contenu du CV en dernier."""
+    return assemble(check_static(instructions.strip(), "la tâche"), CV_CONTENT_BLOCK)
+
+
+def split_session_part(text: str) -> tuple:
+    """
+    (partie statique, partie propre à la session) d'un prompt rendu, coupé au début
+    du bloc de session connu ; sans bloc reconnu, tout le texte est propre à la session.
+    """
+    for marker in SESSION_MARKERS:
+        index = text.find(marker)
+        if index >= 0:
+            return text[:index], text[index:]
+    return "", text
+
+
+def static_prefix(template: str) -> str:
+    """Texte rendu qui précède le premier champ d'un gabarit : commun à toutes les sessions."""
+    prefix = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        prefix.append(literal)
+        if field is not None:
+            break
+    return "".join(prefix)
+
+
+def common_prefix_length(prompts: Iterable[str]) -> int:
+    return len(os.path.commonprefix(list(prompts)))
+
+
+def prefix_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
@@ -1,73 +1,376 @@
+from __future__ import annotations
+
 import os
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import json
+import fcntl
+import shutil
+import hashlib
+import argparse
+from typing import TYPE_CHECKING
+import numpy as np
+from src.onnx_backend import use_onnx, onnx_sentence_encoder_args
+from src.model_registry import model_registry
+from src.utils.lru_cache import LRUCache
+from src.utils.tracing import traced
+
+EMBEDDINGS_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+RAG_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024"))
+RAG_RESULTS_CACHE_SIZE = int(os.getenv("RAG_RESULTS_CACHE_SIZE", "1024"))
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+
+def _build_embeddings_model() -> HuggingFaceEmbeddings:
+    """Encodeur MiniLM, en ONNX int8 si INFERENCE_BACKEND=onnx et que l'export existe."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if use_onnx():
+        onnx_args = onnx_sentence_encoder_args(EMBEDDINGS_MODEL_NAME)
+        if onnx_args is not None:
+            model_dir, model_kwargs = onnx_args
+            return HuggingFaceEmbeddings(model_name=model_dir, model_kwargs=model_kwargs)
+    return HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME)
+
+
+model_registry.register("rag_embeddings", _build_embeddings_model, pinned=True)
+
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "/app/vector_store")
+# Lien symbolique vers la version courante du store (bascule atomique via os.replace)
+CURRENT_STORE_LINK = "current"
+MANIFEST_FILE = "manifest.json"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 100
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _in_progress(name: str) -> bool:
+    """Répertoire `store-<version>.<pid>.tmp` d'une sauvegarde encore en cours dans un autre processus."""
+    parts = name.split(".")
+    if len(parts) != 3 or parts[2] != "tmp" or not parts[1].isdigit():
+        return False
+    try:
+        os.kill(int(parts[1]), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _ensure_dir(path: str) -> str:
+    os.makedirs(path, exist_ok=True)
+    return path
 
-embeddings_model = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
-VECTOR_STORE_PATH = "/app/vector_store" 
 
 class RAGHandler:
-    def __init__(self, knowledge_base_path: str = "/app/knowledge_base"):
+    def __init__(self, knowledge_base_path: str = "/app/knowledge_base", full_rebuild: bool = False):
         """
         Initialise le RAG Handler.
         
         Args:
             knowledge_base_path (str): Le chemin vers le dossier contenant les documents de connaissances (.md).
+            full_rebuild (bool): Ignore le store existant et ré-encode tout le corpus.
         """
-        self.embeddings = embeddings_model
-        self.vector_store = self._load_or_create_vector_store(knowledge_base_path)
+        self.knowledge_base_path = knowledge_base_path
+        self.embeddings = model_registry.get("rag_embeddings")
+        self.vector_store = self._load_or_create_vector_store(knowledge_base_path, full=full_rebuild)
+        self.store_version = self._compute_store_version()
+        # Embeddings des requêtes (dépendent du seul modèle) et résultats top-k (dépendent de l'index)
+        self._embedding_cache = LRUCache(RAG_EMBEDDING_CACHE_SIZE)
+        self._results_cache = LRUCache(RAG_RESULTS_CACHE_SIZE)
 
     def _load_documents(self, path: str) -> list:
-        """Charge les documents depuis un chemin de répertoire spécifié."""
-        loader = DirectoryLoader(
-            path,
-            glob="**/*.md", 
-            loader_cls=TextLoader,
-            loader_kwargs={"encoding": "utf-8"}
+        """Charge un document de la base de connaissances."""
+        from langchain_community.document_loaders import TextLoader
+        return TextLoader(path, encoding="utf-8").load()
+
+    def _list_knowledge_files(self, knowledge_base_path: str) -> dict:
+        """Retourne {chemin relatif: sha256 du contenu} pour chaque fichier .md."""
+        files = {}
+        for root, _, names in os.walk(knowledge_base_path):
+            for name in sorted(names):
+                if not name.endswith(".md"):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, knowledge_base_path)] = _sha256(f.read())
+        return files
+
+    def _split_file(self, knowledge_base_path: str, relative_path: str) -> list:
+        """Découpe un fichier en chunks identifiés par le hash de leur contenu."""
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        documents = self._load_documents(os.path.join(knowledge_base_path, relative_path))
+        text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        chunks = []
+        seen = {}
+        for chunk in text_splitter.split_documents(documents):
+            chunk_id = _sha256(f"{relative_path}\0{chunk.page_content}".encode("utf-8"))
+            # Deux chunks identiques dans un même fichier gardent des ids distincts
+            seen[chunk_id] = seen.get(chunk_id, 0) + 1
+            if seen[chunk_id] > 1:
+                chunk_id = f"{chunk_id}-{seen[chunk_id]}"
+            chunks.append((chunk_id, chunk))
+        return chunks
+
+    def _read_current_store(self) -> tuple[FAISS | None, dict]:
+        """Charge la version courante du store et son manifeste, s'ils sont compatibles."""
+        store_dir = os.path.join(VECTOR_STORE_PATH, CURRENT_STORE_LINK)
+        manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            if os.path.exists(os.path.join(VECTOR_STORE_PATH, "index.faiss")):
+                print("Vector store sans manifeste (ancien format) : reconstruction complète.")
+            return None, {}
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        expected = {"embeddings_model": EMBEDDINGS_MODEL_NAME, "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+        if any(manifest.get(key) != value for key, value in expected.items()):
+            print("Paramètres d'indexation modifiés : reconstruction complète.")
+            return None, {}
+        print(f"Chargement du vector store existant depuis : {store_dir}")
+        from langchain_community.vectorstores import FAISS
+        vector_store = FAISS.load_local(
+            store_dir, 
+            embeddings=self.embeddings, 
+            allow_dangerous_deserialization=True 
         )
-        print(f"Chargement des documents depuis : {path}")
-        return loader.load()
+        return vector_store, manifest
+
+    def _save_store(self, vector_store: FAISS, manifest: dict) -> None:
+        """
+        Sauvegarde une nouvelle version du store puis bascule le lien `current` dessus.
+        L'écriture se fait dans un répertoire temporaire renommé ensuite : une version
+        en service n'est jamais réécrite sous les lecteurs.
+        """
+        version = _sha256("".join(sorted(vector_store.index_to_docstore_id.values())).encode())[:16]
+        version_dir = f"store-{version}"
+        target_dir = os.path.join(VECTOR_STORE_PATH, version_dir)
+        link_path = os.path.join(VECTOR_STORE_PATH, CURRENT_STORE_LINK)
+        if os.path.islink(link_path) and os.readlink(link_path) == version_dir and os.path.isdir(target_dir):
+            # Mêmes chunks (ids dérivés du chemin et du contenu) que la version en service
+            print(f"Vector store inchangé : {target_dir}")
+            return
+
+        tmp_dir = f"{target_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        vector_store.save_local(tmp_dir)
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        # Reste d'une sauvegarde antérieure qui n'est pas en service : personne ne le lit
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.rename(tmp_dir, target_dir)
+
+        tmp_link = f"{link_path}.tmp"
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(version_dir, tmp_link)
+        os.replace(tmp_link, link_path)
+        for name in os.listdir(VECTOR_STORE_PATH):
+            if name.startswith("store-") and name != version_dir and not _in_progress(name):
+                shutil.rmtree(os.path.join(VECTOR_STORE_PATH, name), ignore_errors=True)
+        print(f"Vector store sauvegardé dans : {target_dir}")
+
+    def _sync_vector_store(self, knowledge_base_path: str, full: bool = False) -> FAISS | None:
+        """
+        Met le store en phase avec la base de connaissances : seuls les chunks des
+        fichiers modifiés ou ajoutés sont ré-encodés, ceux des fichiers supprimés
+        ou modifiés sont retirés de l'index.
+        """
+        os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+        vector_store, manifest = (None, {}) if full else self._read_current_store()
+        known_files = manifest.get("files", {})
+        current_files = self._list_knowledge_files(knowledge_base_path)
 
-    def _create_vector_store(self, knowledge_base_path: str) -> FAISS | None:
-        """Crée et sauvegarde la base de données vectorielle à partir des documents."""
-        documents = self._load_documents(knowledge_base_path)
-        if not documents:
+        files_manifest = {}
+        new_chunks = []
+        for relative_path, file_hash in current_files.items():
+            previous = known_files.get(relative_path)
+            if vector_store is not None and previous and previous["sha256"] == file_hash:
+                files_manifest[relative_path] = previous
+                continue
+            chunks = self._split_file(knowledge_base_path, relative_path)
+            files_manifest[relative_path] = {"sha256": file_hash, "chunks": [chunk_id for chunk_id, _ in chunks]}
+            new_chunks.extend(chunks)
+
+        wanted_ids = {chunk_id for entry in files_manifest.values() for chunk_id in entry["chunks"]}
+        existing_ids = set(vector_store.index_to_docstore_id.values()) if vector_store is not None else set()
+        to_delete = existing_ids - wanted_ids
+        to_add = [(chunk_id, chunk) for chunk_id, chunk in new_chunks if chunk_id not in existing_ids]
+
+        if not to_delete and not to_add:
+            if vector_store is None:
+                print("Aucun document trouvé pour créer le vector store.")
+            return vector_store
+
+        print(f"Mise à jour du vector store : {len(to_add)} chunks à encoder, {len(to_delete)} à retirer.")
+        if to_delete and len(to_delete) == len(existing_ids):
+            vector_store = None
+        elif to_delete:
+            vector_store.delete(list(to_delete))
+        if to_add:
+            texts = [chunk.page_content for _, chunk in to_add]
+            metadatas = [chunk.metadata for _, chunk in to_add]
+            ids = [chunk_id for chunk_id, _ in to_add]
+            if vector_store is None:
+                from langchain_community.vectorstores import FAISS
+                vector_store = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas, ids=ids)
+            else:
+                vector_store.add_texts(texts, metadatas=metadatas, ids=ids)
+        if vector_store is None:
             print("Aucun document trouvé pour créer le vector store.")
             return None
-        
-        print(f"{len(documents)} documents chargés. Création des vecteurs...")
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        texts = text_splitter.split_documents(documents)
-        vector_store = FAISS.from_documents(texts, self.embeddings)
-        os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
-        vector_store.save_local(VECTOR_STORE_PATH)
-        print(f"Vector store créé et sauvegardé dans : {VECTOR_STORE_PATH}")
+
+        self._save_store(vector_store, {
+            "embeddings_model": EMBEDDINGS_MODEL_NAME,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "files": files_manifest,
+        })
         return vector_store
 
-    def _load_or_create_vector_store(self, knowledge_base_path: str) -> FAISS | None:
-        """Charge le vector store s'il existe, sinon le crée."""
-        if os.path.exists(os.path.join(VECTOR_STORE_PATH, "index.faiss")):
-            print(f"Chargement du vector store existant depuis : {VECTOR_STORE_PATH}")
-            return FAISS.load_local(
-                VECTOR_STORE_PATH, 
-                embeddings=self.embeddings, 
-                allow_dangerous_deserialization=True 
-            )
-        else:
-            print("Aucun vector store trouvé. Création d'un nouveau...")
-            return self._create_vector_store(knowledge_base_path)
+    def _load_or_create_vector_store(self, knowledge_base_path: str, full: bool = False) -> FAISS | None:
+        """Charge le vector store et applique les modifications de la base de connaissances."""
+        # Verrou inter-processus : plusieurs workers uvicorn démarrent en même temps
+        with open(os.path.join(_ensure_dir(VECTOR_STORE_PATH), ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._sync_vector_store(knowledge_base_path, full=full)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def rebuild(self, full: bool = False) -> None:
+        """Resynchronise le store avec la base de connaissances et invalide les résultats en cache."""
+        self.vector_store = self._load_or_create_vector_store(self.knowledge_base_path, full=full)
+        self.store_version = self._compute_store_version()
+        self._results_cache.clear()
+
+    def _compute_store_version(self) -> str | None:
+        """Empreinte du vector store chargé : change à chaque reconstruction de l'index."""
+        if not self.vector_store:
+            return None
+        digest = hashlib.sha256(str(self.vector_store.index.ntotal).encode())
+        for docstore_id in self.vector_store.index_to_docstore_id.values():
+            digest.update(str(docstore_id).encode())
+        return digest.hexdigest()[:16]
 
     def get_relevant_feedback(self, query: str, k: int = 1) -> list[str]:
         """Recherche les k conseils les plus pertinents pour une requête."""
+        return self.get_relevant_feedback_batch([query], k=k)[0]
+
+    def get_relevant_feedback_batch(self, queries: list[str], k: int = 1) -> list[list[str]]:
+        """
+        Recherche les k conseils les plus pertinents pour plusieurs requêtes à la fois :
+        un seul appel à l'encodeur et une seule recherche FAISS sur la matrice empilée.
+        Les requêtes en double ne sont traitées qu'une fois, et les requêtes déjà
+        vues sont servies depuis les caches LRU.
+
+        Returns:
+            Une liste de résultats par requête, dans l'ordre de `queries`.
+        """
+        if not self.vector_store or not queries:
+            return [[] for _ in queries]
+        results_by_query = {}
+        to_search = []
+        for query in dict.fromkeys(queries):
+            cached = self._results_cache.get((self.store_version, query, k))
+            if cached is not None:
+                results_by_query[query] = cached
+            else:
+                to_search.append(query)
+
+        if to_search:
+            query_vectors = self._embed_queries(to_search)
+            for query, results in zip(to_search, self._search_vectors(query_vectors, k)):
+                self._results_cache.set((self.store_version, query, k), results)
+                results_by_query[query] = results
+        return [list(results_by_query[query]) for query in queries]
+
+    @traced("rag_embedding")
+    def _embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Embeddings des requêtes, en n'encodant (en un seul appel) que celles absentes du cache."""
+        vectors = {}
+        missing = []
+        for query in queries:
+            cached = self._embedding_cache.get((EMBEDDINGS_MODEL_NAME, query))
+            if cached is not None:
+                vectors[query] = cached
+            else:
+                missing.append(query)
+        if missing:
+            for query, vector in zip(missing, self.embeddings.embed_documents(missing)):
+                vector = np.asarray(vector, dtype=np.float32)
+                self._embedding_cache.set((EMBEDDINGS_MODEL_NAME, query), vector)
+                vectors[query] = vector
+        return np.stack([vectors[query] for query in queries])
+
+    def precompute_queries(self, queries: list[str], k: int = 1) -> None:
+        """Remplit les caches pour un ensemble de requêtes connues (appelé au démarrage)."""
+        self.get_relevant_feedback_batch(list(queries), k=k)
+        print(f"{len(set(queries))} requêtes RAG pré-calculées.")
+
+    def cache_stats(self) -> dict:
+        """Compteurs hits/misses des caches d'embeddings et de résultats."""
+        return {
+            "store_version": self.store_version,
+            "query_embeddings": self._embedding_cache.stats(),
+            "results": self._results_cache.stats(),
+        }
+
+    @traced("faiss_search")
+    def _search_vectors(self, query_vectors: np.ndarray, k: int) -> list[list[str]]:
+        """Recherche FAISS brute sur une matrice de requêtes (une ligne par requête)."""
+        store = self.vector_store
+        if getattr(store, "_normalize_L2", False):
+            import faiss
+            query_vectors = query_vectors.copy()
+            faiss.normalize_L2(query_vectors)
+        _, indices = store.index.search(query_vectors, k)
+        results = []
+        for row in indices:
+            contents = []
+            for i in row:
+                if i == -1:
+                    continue
+                doc = store.docstore.search(store.index_to_docstore_id[i])
+                contents.append(doc.page_content)
+            results.append(contents)
+        return results
+
+    def memory_footprint(self) -> int:
+        """Taille approximative de l'index FAISS en mémoire (octets)."""
         if not self.vector_store:
-            return []
-        results = self.vector_store.similarity_search(query, k=k)
-        return [doc.page_content for doc in results]
+            return 0
+        index = self.vector_store.index
+        return index.ntotal * index.d * 4
+
+
+model_registry.register("rag_handler", RAGHandler, pinned=True)
+
+
+def get_rag_handler() -> RAGHandler:
+    """RAGHandler partagé par le processus, créé au premier appel."""
+    return model_registry.get("rag_handler")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gestion du vector store du RAG.")
+    parser.add_argument("command", nargs="?", choices=["rebuild", "search"], default="search",
+                        help="rebuild : met à jour l'index avant un déploiement ; search : requête de test.")
+    parser.add_argument("--knowledge-base", default="/app/knowledge_base")
+    parser.add_argument("--full", action="store_true", help="Ré-encode tout le corpus au lieu des seuls changements.")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        handler = RAGHandler(knowledge_base_path=args.knowledge_base, full_rebuild=args.full)
+        ntotal = handler.vector_store.index.ntotal if handler.vector_store else 0
+        print(f"Vector store à jour ({ntotal} vecteurs, version {handler.store_version}).")
+        raise SystemExit(0)
+
     print("Initialisation du RAG Handler en mode test...")
-    handler = RAGHandler(knowledge_base_path="/app/knowledge_base") 
+    handler = RAGHandler(knowledge_base_path=args.knowledge_base) 
     if handler.vector_store and hasattr(handler.vector_store, 'index'):
         print(f"Vector store chargé avec {handler.vector_store.index.ntotal} vecteurs.")
         
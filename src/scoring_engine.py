@@ -1,4 +1,5 @@
 import json
+from collections import deque
 from datetime import datetime
 
 # Pondérations basées sur la fiche projet
@@ -14,10 +15,76 @@ ALPHA = 0.5  # Poids du contexte
 BETA = 0.3   # Poids de la fréquence
 GAMMA = 0.2  # Poids de la profondeur (durée)
 
+# Sections du CV qui déterminent le score de contexte, dans l'ordre d'évaluation
+CONTEXT_SECTIONS = ("formations", "projets", "expériences")
+
+
+class SkillMatcher:
+    """
+    Automate d'Aho-Corasick sur les compétences (déjà en minuscules) : un seul
+    parcours d'un texte donne le nombre d'occurrences de chaque compétence,
+    avec la même sémantique que `str.count` (occurrences sans chevauchement).
+    """
+
+    def __init__(self, patterns):
+        patterns = list(dict.fromkeys(patterns))
+        self.has_empty = "" in patterns
+        self.patterns = [p for p in patterns if p]
+        self._lengths = [len(p) for p in self.patterns]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for pattern_id, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[node][char] = child
+                node = child
+            self._out[node] += (pattern_id,)
+
+        # Liens d'échec calculés en largeur ; chaque nœud hérite des sorties de son suffixe
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def count(self, text: str) -> dict:
+        """Nombre d'occurrences non chevauchantes de chaque compétence présente dans `text`."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        counts = {}
+        last_end = {}
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern_id in out[node]:
+                # Les occurrences d'un même motif arrivent dans l'ordre : on garde la première de chaque chevauchement
+                if end - lengths[pattern_id] >= last_end.get(pattern_id, 0):
+                    counts[pattern_id] = counts.get(pattern_id, 0) + 1
+                    last_end[pattern_id] = end
+        result = {self.patterns[pattern_id]: n for pattern_id, n in counts.items()}
+        if self.has_empty:
+            result[""] = len(text) + 1
+        return result
+
+
 class ContextualScoringEngine:
     def __init__(self, cv_data: dict):
         self.cv_data = cv_data.get("candidat", {})
         self.full_text = self._get_full_text_from_cv()
+        self._durations = {}
 
     def _get_full_text_from_cv(self) -> str:
         """Concatène tout le contenu textuel du CV pour le comptage de fréquence."""
@@ -42,23 +109,50 @@ class ContextualScoringEngine:
             return abs((end_date - start_date).days / 365.25)
         return 0.5 
 
-    def calculate_scores(self) -> dict:
-        """Calcule les scores pondérés pour toutes les hard skills."""
-        skills = self.cv_data.get("compétences", {}).get("hard_skills", [])
-        if not skills:
-            return {}
+    def _experience_duration(self, index: int, exp: dict) -> float:
+        """Durée d'une expérience, calculée une seule fois quel que soit le nombre de compétences."""
+        if index not in self._durations:
+            self._durations[index] = self._calculate_duration_in_years(exp.get("start_date"), exp.get("end_date"))
+        return self._durations[index]
 
-        scored_skills = []
+    def _build_skill_index(self, skills: list, matcher: SkillMatcher = None) -> dict:
+        """
+        Sérialise chaque section une seule fois et la parcourt avec un unique automate.
+        Retourne, par compétence (en minuscules) : sections où elle apparaît,
+        fréquence dans tout le CV et indices des expériences qui la mentionnent.
+        """
+        matcher = matcher or SkillMatcher(skill.lower() for skill in skills)
+        section_hits = {
+            section: matcher.count(json.dumps(self.cv_data.get(section, []), ensure_ascii=False).lower())
+            for section in CONTEXT_SECTIONS
+        }
+        frequencies = matcher.count(self.full_text)
+        experience_hits = [
+            matcher.count(json.dumps(exp, ensure_ascii=False).lower())
+            for exp in self.cv_data.get("expériences", [])
+        ]
+
+        index = {}
+        for skill_lower in dict.fromkeys(skill.lower() for skill in skills):
+            index[skill_lower] = {
+                "sections": [section for section in CONTEXT_SECTIONS if skill_lower in section_hits[section]],
+                "frequency": frequencies.get(skill_lower, 0),
+                "experiences": [i for i, hits in enumerate(experience_hits) if skill_lower in hits],
+            }
+        return index
+
+    def skill_features(self, skills: list, matcher: SkillMatcher = None) -> list:
+        """
+        Caractéristiques brutes de chaque compétence : (score de contexte, fréquence,
+        durée max en années). `matcher` permet de réutiliser un automate entre plusieurs CV.
+        """
+        skill_index = self._build_skill_index(skills, matcher)
+        experiences = self.cv_data.get("expériences", [])
+        features = []
         for skill in skills:
-            skill_lower = skill.lower()
-            contexts = []
-            if skill_lower in json.dumps(self.cv_data.get("formations", []), ensure_ascii=False).lower():
-                contexts.append(CONTEXT_WEIGHTS["formations"])
-            if skill_lower in json.dumps(self.cv_data.get("projets", []), ensure_ascii=False).lower():
-                contexts.append(CONTEXT_WEIGHTS["projets"])
-            if skill_lower in json.dumps(self.cv_data.get("expériences", []), ensure_ascii=False).lower():
-                contexts.append(CONTEXT_WEIGHTS["expériences"])
-            
+            entry = skill_index[skill.lower()]
+            contexts = [CONTEXT_WEIGHTS[section] for section in entry["sections"]]
+
             if len(contexts) > 1:
                 context_score = CONTEXT_WEIGHTS["multiple"]
             elif contexts:
@@ -67,17 +161,25 @@ class ContextualScoringEngine:
                 context_score = 0.1 
 
             # 2. Fréquence de mention
-            frequency_score = self.full_text.count(skill_lower)
+            frequency_score = entry["frequency"]
 
             # 3. Profondeur d'utilisation (durée max en années)
             max_duration = 0
-            for exp in self.cv_data.get("expériences", []):
-                if skill_lower in json.dumps(exp, ensure_ascii=False).lower():
-                    duration = self._calculate_duration_in_years(exp.get("start_date"), exp.get("end_date"))
-                    if duration > max_duration:
-                        max_duration = duration
-            depth_score = max_duration
+            for i in entry["experiences"]:
+                duration = self._experience_duration(i, experiences[i])
+                if duration > max_duration:
+                    max_duration = duration
+            features.append((context_score, frequency_score, max_duration))
+        return features
 
+    def calculate_scores(self) -> dict:
+        """Calcule les scores pondérés pour toutes les hard skills."""
+        skills = self.cv_data.get("compétences", {}).get("hard_skills", [])
+        if not skills:
+            return {}
+
+        scored_skills = []
+        for skill, (context_score, frequency_score, depth_score) in zip(skills, self.skill_features(skills)):
             # Normalisation simple (peut être affinée)
             normalized_frequency = 1 - (1 / (1 + frequency_score))
             normalized_depth = 1 - (1 / (1 + depth_score))
@@ -100,3 +202,88 @@ class ContextualScoringEngine:
         # Trier par score décroissant
         scored_skills.sort(key=lambda x: x["score"], reverse=True)
         return {"analyse_competences": scored_skills}
+
+
+def unique_skills(skills: list) -> list:
+    """
+    Compétences sans doublons, comparées sans tenir compte de la casse comme dans
+    `ContextualScoringEngine` ; la première graphie rencontrée est conservée.
+    """
+    unique = {}
+    for skill in skills:
+        unique.setdefault(skill.lower(), skill)
+    return list(unique.values())
+
+
+def combine_scores(context, frequency, depth):
+    """Formule ALPHA/BETA/GAMMA appliquée terme à terme sur des tableaux NumPy."""
+    normalized_frequency = 1 - (1 / (1 + frequency))
+    normalized_depth = 1 - (1 / (1 + depth))
+    return (ALPHA * context) + (BETA * normalized_frequency) + (GAMMA * normalized_depth)
+
+
+class BatchScoringEngine:
+    """
+    Scoring d'un grand nombre de CV déjà parsés. Les caractéristiques (contexte,
+    fréquence, profondeur) restent extraites CV par CV en Python, avec un automate
+    partagé par offre ; seuls la formule, les moyennes et le classement sont
+    calculés en bloc sur des tableaux NumPy.
+    """
+
+    def __init__(self, cv_list: list):
+        self.engines = [ContextualScoringEngine(cv_data) for cv_data in cv_list]
+
+    def feature_matrix(self, skills: list):
+        """Tableaux (n_cv, n_compétences) de contexte, fréquence et durée pour une liste cible."""
+        import numpy as np
+
+        matcher = SkillMatcher(skill.lower() for skill in skills)
+        features = np.array(
+            [engine.skill_features(skills, matcher) for engine in self.engines], dtype=np.float64
+        ).reshape(len(self.engines), len(skills), 3)
+        return features[:, :, 0], features[:, :, 1], features[:, :, 2]
+
+    def rank(self, skills: list = None, top_n: int = 10) -> list:
+        """
+        Classe les candidats par score moyen. Avec `skills` (compétences d'une offre),
+        une compétence jamais mentionnée dans le CV compte pour 0 ; sans, chaque CV est
+        noté sur ses propres hard skills, comme `ContextualScoringEngine`. Une compétence
+        répétée (à la casse près) ne compte qu'une fois dans la moyenne.
+        """
+        import numpy as np
+
+        if not self.engines:
+            return []
+        if skills:
+            skills = unique_skills(skills)
+            context, frequency, depth = self.feature_matrix(skills)
+            scores = np.where(frequency > 0, combine_scores(context, frequency, depth), 0.0)
+            candidate_scores = scores.mean(axis=1)
+            skill_names = [list(skills)] * len(self.engines)
+        else:
+            # Listes de compétences de tailles différentes : on aplatit puis on agrège par CV
+            skill_names = [
+                unique_skills(engine.cv_data.get("compétences", {}).get("hard_skills", [])) for engine in self.engines
+            ]
+            flat = [f for engine, names in zip(self.engines, skill_names) for f in engine.skill_features(names)]
+            owners = np.repeat(np.arange(len(self.engines)), [len(names) for names in skill_names])
+            features = np.array(flat, dtype=np.float64).reshape(-1, 3)
+            flat_scores = combine_scores(features[:, 0], features[:, 1], features[:, 2])
+            counts = np.bincount(owners, minlength=len(self.engines))
+            totals = np.bincount(owners, weights=flat_scores, minlength=len(self.engines))
+            candidate_scores = np.divide(totals, counts, out=np.zeros(len(self.engines)), where=counts > 0)
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            scores = [flat_scores[offsets[i]:offsets[i + 1]] for i in range(len(self.engines))]
+
+        top_n = min(top_n, len(self.engines))
+        # Tri stable : à score égal, l'ordre d'entrée des candidats est conservé
+        order = np.argsort(-candidate_scores, kind="stable")[:top_n]
+        ranking = []
+        for rank, i in enumerate(order, start=1):
+            ranking.append({
+                "rank": rank,
+                "index": int(i),
+                "score": round(float(candidate_scores[i]), 3),
+                "skills": {name: round(float(score), 2) for name, score in zip(skill_names[i], scores[i])},
+            })
+        return ranking
@@ -0,0 +1,37 @@
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable
+
+# Travail CPU bloquant (extraction PDF, scoring) : pool borné, distinct du threadpool Starlette
+CPU_EXECUTOR_MAX_WORKERS = int(os.getenv("CPU_EXECUTOR_MAX_WORKERS", str(os.cpu_count() or 2)))
+# Appels bloquants restants côté LLM (kickoff_async de crewai, outils synchrones de LangGraph)
+# qui passent par l'exécuteur par défaut de la boucle asyncio
+BLOCKING_IO_MAX_WORKERS = int(os.getenv("BLOCKING_IO_MAX_WORKERS", "128"))
+
+
+@lru_cache(maxsize=1)
+def get_cpu_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=CPU_EXECUTOR_MAX_WORKERS, thread_name_prefix="cpu")
+
+
+async def run_cpu_bound(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Exécute `fn` dans le pool CPU borné, en propageant les contextvars de la requête."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_cpu_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+
+def configure_default_executor(loop: asyncio.AbstractEventLoop = None) -> None:
+    """Dimensionne l'exécuteur par défaut de la boucle (asyncio.to_thread, run_in_executor(None, ...))."""
+    loop = loop or asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=BLOCKING_IO_MAX_WORKERS, thread_name_prefix="blocking-io"))
+
+
+def shutdown_cpu_executor() -> None:
+    if get_cpu_executor.cache_info().currsize:
+        get_cpu_executor().shutdown(wait=False, cancel_futures=True)
+        get_cpu_executor.cache_clear()
@@ -1,12 +1,33 @@
 from contextvars import ContextVar
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 _cv_document_context = ContextVar('cv_document_context', default=None)
 _job_offer_context = ContextVar('job_offer_context', default=None)
+_user_id_context = ContextVar('user_id_context', default=None)
+_job_offer_id_context = ContextVar('job_offer_id_context', default=None)
+_trace_context = ContextVar('trace_context', default=None)
 
 def set_current_interview_context(cv_document: Dict[str, Any], job_offer: Dict[str, Any]):
     _cv_document_context.set(cv_document)
     _job_offer_context.set(job_offer)
 
 def get_current_interview_context():
-    return _cv_document_context.get(), _job_offer_context.get()
\ No newline at end of file
+    return _cv_document_context.get(), _job_offer_context.get()
+
+def set_current_interview_ids(user_id: Optional[str], job_offer_id: Optional[str]):
+    """Identifiants de l'entretien en cours, lus par les outils (ex. pour rattacher le feedback)."""
+    _user_id_context.set(user_id)
+    _job_offer_id_context.set(job_offer_id)
+
+def get_current_interview_ids() -> Tuple[Optional[str], Optional[str]]:
+    return _user_id_context.get(), _job_offer_id_context.get()
+
+def set_current_trace(trace):
+    """Trace (étapes mesurées) de la requête ou de la tâche en cours ; retourne le jeton de reset."""
+    return _trace_context.set(trace)
+
+def reset_current_trace(token):
+    _trace_context.reset(token)
+
+def get_current_trace():
+    return _trace_context.get()
\ No newline at end of file
@@ -0,0 +1,267 @@
+import os
+import time
+import uuid
+import pstats
+import cProfile
+import inspect
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Histogram, CollectorRegistry, REGISTRY, generate_latest, start_http_server, CONTENT_TYPE_LATEST
+
+from src.utils.request_context import get_current_trace, set_current_trace, reset_current_trace
+
+logger = logging.getLogger(__name__)
+
+# Profilage par requête (en-tête X-Profile: 1) : désactivé par défaut, coûteux
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    # Le mode multiprocessus de prometheus_client écrit ses compteurs dans ce répertoire
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_WALL_SECONDS = Histogram(
+    "pipeline_stage_wall_seconds", "Durée réelle de chaque étape d'un pipeline", ["pipeline", "stage"], buckets=STAGE_BUCKETS
+)
+STAGE_CPU_SECONDS = Histogram(
+    "pipeline_stage_cpu_seconds", "Temps CPU (thread courant) de chaque étape d'un pipeline", ["pipeline", "stage"], buckets=STAGE_BUCKETS
+)
+PIPELINE_SECONDS = Histogram(
+    "pipeline_request_seconds", "Durée totale d'une requête ou d'une tâche par pipeline", ["pipeline"], buckets=STAGE_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens consommés par les appels LLM", ["pipeline", "stage", "model", "kind"]
+)
+
+NO_PIPELINE = "none"
+
+
+class Trace:
+    """Étapes mesurées pendant une requête ou une tâche ; partagée entre threads via les contextvars."""
+
+    def __init__(self, pipeline: str, request_id: str = None, profile: bool = False):
+        self.pipeline = pipeline
+        self.request_id = request_id or uuid.uuid4().hex
+        self.spans = []
+        self.tokens = {"prompt": 0, "completion": 0}
+        self.profiles = [] if profile else None
+        self.profile_path = None
+        self.started = time.perf_counter()
+        # Réponse streamée : la trace reste ouverte jusqu'à la fin du corps (finish_after_body)
+        self.keep_open = False
+        self._lock = threading.Lock()
+
+    def add_span(self, stage: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            self.spans.append({"stage": stage, "wall_ms": round(wall * 1000, 2), "cpu_ms": round(cpu * 1000, 2)})
+
+    def add_tokens(self, prompt: int, completion: int) -> None:
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+
+    def add_profile(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.profiles.append(profiler)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Durée cumulée (ms) par étape, dans l'ordre de première apparition."""
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["wall_ms"]
+        return totals
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (visible dans les devtools des navigateurs)."""
+        return ", ".join(
+            f"{stage.replace(':', '-').replace(' ', '_')};dur={duration:.1f}"
+            for stage, duration in self.stage_totals().items()
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "pipeline": self.pipeline,
+            "request_id": self.request_id,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "stages": self.stage_totals(),
+            "tokens": dict(self.tokens),
+        }
+
+
+_thread_state = threading.local()
+
+
+def _current_pipeline(trace: Optional[Trace]) -> str:
+    return trace.pipeline if trace is not None else NO_PIPELINE
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Mesure une étape : temps réel et temps CPU du thread courant (approximatif pour
+    une étape asynchrone, la boucle exécutant d'autres coroutines pendant les await).
+    Si la requête est profilée, l'étape est aussi profilée dans son thread.
+    """
+    trace = get_current_trace()
+    profiler = None
+    if trace is not None and trace.profiles is not None and not getattr(_thread_state, "profiling", False):
+        profiler = cProfile.Profile()
+        _thread_state.profiling = True
+        profiler.enable()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        if profiler is not None:
+            profiler.disable()
+            _thread_state.profiling = False
+            trace.add_profile(profiler)
+        pipeline = _current_pipeline(trace)
+        STAGE_WALL_SECONDS.labels(pipeline, name).observe(wall)
+        STAGE_CPU_SECONDS.labels(pipeline, name).observe(cpu)
+        if trace is not None:
+            trace.add_span(name, wall, cpu)
+
+
+def traced(name: str):
+    """Décorateur équivalent à `with stage(name)`, pour fonctions synchrones ou coroutines."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_tokens(stage_name: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    trace = get_current_trace()
+    pipeline = _current_pipeline(trace)
+    model = model or "unknown"
+    LLM_TOKENS.labels(pipeline, stage_name, model, "prompt").inc(prompt_tokens or 0)
+    LLM_TOKENS.labels(pipeline, stage_name, model, "completion").inc(completion_tokens or 0)
+    if trace is not None:
+        trace.add_tokens(prompt_tokens or 0, completion_tokens or 0)
+
+
+def record_llm_usage(stage_name: str, message) -> None:
+    """Tokens d'une réponse de chat langchain (`usage_metadata`), si le fournisseur les renvoie."""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    model = (getattr(message, "response_metadata", None) or {}).get("model_name")
+    record_tokens(stage_name, model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+def record_crew_usage(stage_name: str, crew_output, model: str = None) -> None:
+    """Tokens d'une exécution crewai (`CrewOutput.token_usage`)."""
+    usage = getattr(crew_output, "token_usage", None)
+    if usage is None:
+        return
+    record_tokens(stage_name, model, getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0))
+
+
+def dump_profile(trace: Trace) -> Optional[str]:
+    """Fusionne les profils de la trace dans un .prof (pstats), convertible en flamegraph (flameprof, snakeviz)."""
+    if not trace.profiles:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stats = pstats.Stats(trace.profiles[0])
+    for profiler in trace.profiles[1:]:
+        stats.add(profiler)
+    path = os.path.join(PROFILE_DIR, f"{trace.pipeline}-{trace.request_id}.prof")
+    stats.dump_stats(path)
+    return path
+
+
+@contextmanager
+def trace_pipeline(pipeline: str, request_id: str = None, profile: bool = False):
+    """Ouvre une trace pour une requête ou une tâche ; les étapes appelées dessous s'y rattachent."""
+    trace = Trace(pipeline, request_id=request_id, profile=profile and PROFILING_ENABLED)
+    token = set_current_trace(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.keep_open = False
+        raise
+    finally:
+        reset_current_trace(token)
+        if not trace.keep_open:
+            finish_trace(trace)
+
+
+def finish_trace(trace: Trace) -> None:
+    """Durée totale, profil éventuel et résumé de la trace dans les logs."""
+    PIPELINE_SECONDS.labels(trace.pipeline).observe(time.perf_counter() - trace.started)
+    if trace.profiles:
+        trace.profile_path = dump_profile(trace)
+    logger.info(f"Trace {trace.summary()}")
+
+
+async def finish_after_body(body_iterator, trace: Trace):
+    """Relaie un corps streamé et ne ferme la trace qu'une fois celui-ci envoyé ou abandonné par le client."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        finish_trace(trace)
+
+
+def _metrics_registry():
+    # Plusieurs processus (workers uvicorn, pool prefork de Celery) : agrégation via PROMETHEUS_MULTIPROC_DIR
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_payload():
+    """Corps et content-type de l'exposition Prometheus (endpoint /metrics de l'API)."""
+    return generate_latest(_metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def reset_multiprocess_dir() -> None:
+    """
+    Vide PROMETHEUS_MULTIPROC_DIR : les fichiers des processus d'une exécution précédente
+    (redémarrage du conteneur) fausseraient compteurs et jauges. À appeler dans le
+    processus principal, avant que les processus enfants ne soient créés.
+    """
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.remove(os.path.join(directory, name))
+
+
+def mark_process_dead(pid: int = None) -> None:
+    """Retire les jauges `live*` d'un processus enfant qui se termine."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def start_metrics_server(port: int) -> None:
+    """Expose /metrics sur un port dédié, pour les processus sans serveur HTTP (worker Celery)."""
+    start_http_server(port, registry=_metrics_registry())
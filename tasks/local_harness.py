@@ -0,0 +1,76 @@
+"""
+Harnais local du worker d'analyse : broker et backend de résultats en mémoire,
+worker démarré dans ce processus. Aucun Redis n'est nécessaire.
+
+    python -m tasks.local_harness --jobs 20 --echo    # mise en lots seule, sans modèles ni LLM
+    python -m tasks.local_harness --jobs 4            # pipeline complet (modèles + OPENAI_API_KEY)
+"""
+import argparse
+import logging
+import time
+from collections import Counter
+
+from celery.contrib.testing.worker import start_worker
+from celery.signals import worker_process_init
+
+import tasks.worker_celery as worker
+
+CONVERSATION = [
+    {"role": "assistant", "content": "Pouvez-vous présenter votre dernier projet ?"},
+    {"role": "user", "content": "J'ai conçu une API FastAPI pour scorer des CV, déployée sur Kubernetes."},
+    {"role": "assistant", "content": "Quelle difficulté avez-vous rencontrée ?"},
+    {"role": "user", "content": "La latence des modèles, que j'ai réduite en regroupant les inférences."},
+]
+JOB_REQUIREMENTS = ["Développeur Python backend, FastAPI, Docker, Kubernetes"]
+
+
+def echo_batch(items):
+    """Remplace l'analyse : renvoie la taille du lot traité, pour vérifier la mise en lots."""
+    return [{"batch_size": len(items), "turns": len(conversation)} for conversation, _ in items]
+
+
+def configure_in_memory(app):
+    app.conf.update(
+        broker_url="memory://",
+        result_backend="cache+memory://",
+        task_default_queue=worker.ANALYSIS_QUEUE,
+        broker_connection_retry_on_startup=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--echo", action="store_true", help="Ne charge aucun modèle : teste la file et les lots")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    app = worker.celery_app
+    configure_in_memory(app)
+    if args.echo:
+        # start_worker émet worker_process_init : on évite le chargement des modèles
+        worker_process_init.disconnect(worker.warmup_models)
+        worker.analysis_batch_handler = echo_batch
+        # Pas de MongoDB en local : les rapports factices ne sont pas enregistrés
+        worker.save_feedbacks = lambda *args, **kwargs: None
+
+    with start_worker(app, pool="solo", concurrency=1, perform_ping_check=False, queues=[worker.ANALYSIS_QUEUE]):
+        start = time.perf_counter()
+        results = [
+            worker.run_interview_analysis_task.delay(CONVERSATION, JOB_REQUIREMENTS, user_id=f"user-{i}", job_offer_id="offer-1")
+            for i in range(args.jobs)
+        ]
+        reports = [result.get(timeout=args.timeout) for result in results]
+        elapsed = time.perf_counter() - start
+
+    print(f"{len(reports)} analyses terminées en {elapsed:.2f}s")
+    if args.echo:
+        sizes = Counter(report["batch_size"] for report in reports)
+        print("Taille des lots (taille : nombre d'analyses) :", dict(sorted(sizes.items())))
+    else:
+        print(f"Premier rapport :\n{reports[0][:500]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import os
+import logging
+from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_ready
+from celery_batches import Batches
+
+from src.feedback_store import feedback_document
+from src.utils.tracing import trace_pipeline, stage, start_metrics_server, reset_multiprocess_dir, mark_process_dead
+
+logger = logging.getLogger(__name__)
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+
+ANALYSIS_QUEUE = os.getenv("ANALYSIS_QUEUE", "analysis")
+# Micro-lots : le worker regroupe jusqu'à N analyses en attente, ou ce qui est arrivé en T secondes
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))
+ANALYSIS_BATCH_WINDOW_SECONDS = float(os.getenv("ANALYSIS_BATCH_WINDOW_SECONDS", "2.0"))
+# Mémoire occupée par les modèles résidents d'un processus worker (analyseur + RAG)
+ANALYSIS_MODEL_MEMORY_MB = int(os.getenv("ANALYSIS_MODEL_MEMORY_MB", "3000"))
+# Port de l'exposition Prometheus du worker (0 = désactivée) ; avec le pool prefork,
+# définir aussi PROMETHEUS_MULTIPROC_DIR pour agréger les processus enfants
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
+
+def default_worker_concurrency() -> int:
+    """
+    Nombre de processus worker : chacun garde tous les modèles en mémoire, on en lance
+    donc autant que la RAM le permet (sans dépasser le nombre de CPU).
+    """
+    configured = os.getenv("ANALYSIS_WORKER_CONCURRENCY")
+    if configured:
+        return int(configured)
+    try:
+        total_mb = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 1
+    # On garde l'équivalent d'un jeu de modèles pour le système et le processus principal
+    by_memory = total_mb // ANALYSIS_MODEL_MEMORY_MB - 1
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+
+celery_app = Celery(
+    "worker_celery",
+    broker=CELERY_BROKER_URL,
+    backend=CELERY_RESULT_BACKEND,
+)
+celery_app.conf.update(
+    task_routes={"run_interview_analysis_task": {"queue": ANALYSIS_QUEUE}},
+    worker_concurrency=default_worker_concurrency(),
+    # celery-batches : chaque processus doit pouvoir réserver un lot complet de messages
+    worker_prefetch_multiplier=ANALYSIS_BATCH_SIZE,
+    # Un processus worker n'est jamais recyclé : les modèles chargés restent résidents
+    worker_max_tasks_per_child=None,
+)
+
+
+@worker_process_init.connect
+def warmup_models(**kwargs):
+    """Charge les modèles d'analyse une fois par processus worker, avant la première tâche."""
+    from src.model_registry import model_registry
+    import src.deep_learning_analyzer  # noqa: F401 -- enregistre les loaders du registre
+    import src.rag_handler  # noqa: F401
+
+    from src.feedback_store import ensure_feedback_indexes
+
+    try:
+        ensure_feedback_indexes()
+    except Exception as e:
+        logger.warning(f"Index MongoDB des feedbacks non créés : {e}")
+
+    logger.info("Préchargement des modèles du worker...")
+    model_registry.warmup_from_env(default="all")
+    if model_registry.is_loaded("rag_handler"):
+        from src.crew.crew_pool import known_feedback_queries
+        model_registry.get("rag_handler").precompute_queries(known_feedback_queries())
+
+
+@worker_init.connect
+def reset_metrics(**kwargs):
+    # Processus principal, avant le fork du pool : métriques des exécutions précédentes effacées
+    reset_multiprocess_dir()
+
+
+@worker_process_shutdown.connect
+def forget_process_metrics(pid=None, **kwargs):
+    mark_process_dead(pid)
+
+
+@worker_ready.connect
+def expose_metrics(**kwargs):
+    if WORKER_METRICS_PORT:
+        start_metrics_server(WORKER_METRICS_PORT)
+        logger.info(f"Métriques du worker exposées sur le port {WORKER_METRICS_PORT}.")
+
+
+def save_feedbacks(documents):
+    """Enregistre les rapports d'un lot dans `interview_feedbacks` ; un échec n'invalide pas les tâches."""
+    from src.feedback_store import save_feedbacks as bulk_save
+
+    try:
+        bulk_save(documents)
+    except Exception as e:
+        logger.warning(f"{len(documents)} feedback(s) non enregistré(s) dans MongoDB : {e}")
+
+
+def _analyse_batch(items):
+    from src.crew.crew_pool import run_interview_analysis_batch
+
+    return run_interview_analysis_batch(items)
+
+
+# Remplaçable par le harnais local (tasks/local_harness.py) pour tester la mise en lots sans modèles
+analysis_batch_handler = _analyse_batch
+
+
+def analyse_items(items):
+    """
+    Analyse le lot d'un coup ; si le lot entier échoue (ex. une conversation qui fait
+    planter un modèle), chaque analyse est rejouée seule pour n'échouer que celles en cause.
+
+    Returns:
+        Pour chaque analyse, le rapport ou l'exception levée.
+    """
+    try:
+        return analysis_batch_handler(items)
+    except Exception as e:
+        if len(items) == 1:
+            logger.error(f"Échec de l'analyse : {e}", exc_info=True)
+            return [e]
+        logger.warning(f"Échec du lot de {len(items)} analyses, reprise une par une : {e}", exc_info=True)
+
+    reports = []
+    for item in items:
+        try:
+            reports.extend(analysis_batch_handler([item]))
+        except Exception as e:
+            logger.error(f"Échec de l'analyse : {e}", exc_info=True)
+            reports.append(e)
+    return reports
+
+
+@celery_app.task(
+    name="run_interview_analysis_task",
+    base=Batches,
+    flush_every=ANALYSIS_BATCH_SIZE,
+    flush_interval=ANALYSIS_BATCH_WINDOW_SECONDS,
+)
+def run_interview_analysis_task(requests):
+    """
+    Analyses d'entretien regroupées en micro-lots. Chaque requête garde l'appel
+    `delay(conversation_history, job_description_text, user_id=..., job_offer_id=...)`.
+    """
+    # Une trace par lot : étapes DL, RAG, rédaction des rapports et persistance
+    with trace_pipeline("interview_analysis"):
+        logger.info(f"Lot de {len(requests)} analyse(s) d'entretien.")
+        items = [(request.args[0], request.args[1]) for request in requests]
+        reports = analyse_items(items)
+
+        documents = []
+        for request, report in zip(requests, reports):
+            if isinstance(report, Exception):
+                continue
+            documents.append(feedback_document(
+                request.id, report, request.args[0], request.args[1],
+                user_id=request.kwargs.get("user_id"), job_offer_id=request.kwargs.get("job_offer_id"),
+            ))
+        # Persistance avant publication des résultats : /analysis-status/ peut alors lire MongoDB
+        with stage("persist_feedback"):
+            save_feedbacks(documents)
+
+        for request, report in zip(requests, reports):
+            if isinstance(report, Exception):
+                # SimpleRequest (celery-batches) ne porte pas d'errbacks
+                celery_app.backend.mark_as_failure(request.id, report, request=request, call_errbacks=False)
+            else:
+                celery_app.backend.mark_as_done(request.id, report, request=request)
@@ -0,0 +1,91 @@
+"""
+`run_batch_analysis` rend, à la tolérance près, la même sortie qu'un appel à
+`run_full_analysis` par entretien. Les modèles sont remplacés par des modèles
+factices déterministes : aucun téléchargement.
+"""
+import hashlib
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from benchmarks.bench_batch_analysis import _same, make_conversations
+from src import deep_learning_analyzer as analyzer_module
+from src.deep_learning_analyzer import CANDIDATE_LABELS, MultiModelInterviewAnalyzer
+from src.model_registry import model_registry
+
+DIMENSIONS = 64
+
+
+class FakeSimilarityModel:
+    """Sac de mots haché : des textes qui partagent des mots ont des vecteurs proches."""
+
+    def _vector(self, text):
+        vector = torch.zeros(DIMENSIONS)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSIONS] += 1.0
+        return vector
+
+    def encode(self, texts, convert_to_tensor=True, normalize_embeddings=False, batch_size=None):
+        single = isinstance(texts, str)
+        vectors = torch.stack([self._vector(text) for text in ([texts] if single else texts)])
+        if normalize_embeddings:
+            vectors = torch.nn.functional.normalize(vectors, dim=1)
+        return vectors[0] if single else vectors
+
+
+def fake_sentiment(texts, batch_size=None):
+    return [[{"label": "joie", "score": (len(text) % 10) / 10}] for text in texts]
+
+
+def fake_intent(texts, labels, multi_label=False, batch_size=None):
+    return [
+        {"sequence": text, "labels": labels[len(text) % len(labels):] + labels[:len(text) % len(labels)],
+         "scores": [1.0 / len(labels)] * len(labels)}
+        for text in texts
+    ]
+
+
+@pytest.fixture
+def analyzer():
+    fakes = {
+        "sentiment_analyzer": lambda: fake_sentiment,
+        "similarity_model": FakeSimilarityModel,
+        "intent_classifier": lambda: fake_intent,
+    }
+    for name, loader in fakes.items():
+        model_registry.unload(name)
+        model_registry.register(name, loader)
+    yield MultiModelInterviewAnalyzer(intent_mode="nli")
+    model_registry.register("sentiment_analyzer", analyzer_module._load_sentiment_analyzer)
+    model_registry.register("similarity_model", analyzer_module._load_similarity_model)
+    model_registry.register("intent_classifier", analyzer_module._load_intent_classifier)
+    for name in fakes:
+        model_registry.unload(name)
+
+
+def test_batch_matches_full_analysis(analyzer):
+    conversations, requirements = make_conversations(12, 5, seed=3)
+    # Exigences partagées, multiples, ou sous forme de chaîne
+    requirements[1] = requirements[0] + ["Maîtrise de SQL et de Python."]
+    requirements[2] = requirements[2][0]
+    single = [analyzer.run_full_analysis(c, r) for c, r in zip(conversations, requirements)]
+    batched = analyzer.run_batch_analysis(conversations, requirements)
+    assert _same(single, batched)
+    assert any(result["overall_similarity_score"] > 0 for result in batched)
+    assert all(len(result["intent_analysis"][0]["labels"]) == len(CANDIDATE_LABELS) for result in batched)
+
+
+def test_empty_requirements_score_zero(analyzer):
+    conversations, requirements = make_conversations(3, 2, seed=1)
+    requirements[1] = []
+    batched = analyzer.run_batch_analysis(conversations, requirements)
+    assert batched[1]["overall_similarity_score"] == 0.0
+    assert analyzer.run_full_analysis(conversations[1], [])["overall_similarity_score"] == 0.0
+    assert _same(batched[0], analyzer.run_full_analysis(conversations[0], requirements[0]))
+
+
+def test_no_requirements_at_all(analyzer):
+    conversations, _ = make_conversations(2, 2)
+    assert [r["overall_similarity_score"] for r in analyzer.run_batch_analysis(conversations, [[], []])] == [0.0, 0.0]
@@ -0,0 +1,39 @@
+"""`BatchScoringEngine` : mêmes scores par compétence que `ContextualScoringEngine.calculate_scores`."""
+import copy
+
+import pytest
+
+from benchmarks.fixtures import make_cv_profile
+from src.scoring_engine import BatchScoringEngine, ContextualScoringEngine
+
+CVS = [make_cv_profile(seed) for seed in range(8)]
+
+
+def test_own_skills_match_calculate_scores():
+    ranking = BatchScoringEngine(CVS).rank(top_n=len(CVS))
+    assert len(ranking) == len(CVS)
+    for entry in ranking:
+        expected = {
+            item["skill"]: item["score"]
+            for item in ContextualScoringEngine(CVS[entry["index"]]).calculate_scores()["analyse_competences"]
+        }
+        assert entry["skills"] == expected
+        assert entry["score"] == pytest.approx(sum(expected.values()) / len(expected), abs=0.01)
+
+
+def test_offer_skills_ignore_case_and_duplicates():
+    skills = CVS[0]["candidat"]["compétences"]["hard_skills"][:3]
+    noisy = skills + [skill.upper() for skill in skills] + [skills[0]]
+    engine = BatchScoringEngine(CVS)
+    assert engine.rank(noisy, top_n=len(CVS)) == engine.rank(skills, top_n=len(CVS))
+    assert list(engine.rank(noisy, top_n=1)[0]["skills"]) == skills
+
+
+def test_repeated_own_skill_counts_once():
+    cv = copy.deepcopy(CVS[0])
+    hard_skills = cv["candidat"]["compétences"]["hard_skills"]
+    unique = list(hard_skills)
+    hard_skills += [hard_skills[0].lower(), hard_skills[0]]
+    entry = BatchScoringEngine([cv]).rank()[0]
+    assert list(entry["skills"]) == unique
+    assert entry["score"] == pytest.approx(sum(entry["skills"].values()) / len(unique), abs=0.01)
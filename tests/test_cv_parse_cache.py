@@ -0,0 +1,26 @@
+"""Version du cache de parsing : change avec le modèle ou la température des agents."""
+import pytest
+
+from src import config
+from src.cv_parse_cache import cache_key_for, pipeline_version
+
+
+@pytest.fixture(autouse=True)
+def fresh_version():
+    pipeline_version.cache_clear()
+    yield
+    pipeline_version.cache_clear()
+
+
+@pytest.mark.parametrize("setting, value", [("CREW_LLM_MODEL", "gpt-4o"), ("CREW_LLM_TEMPERATURE", 0.7)])
+def test_llm_settings_change_the_version(monkeypatch, setting, value):
+    before = pipeline_version()
+    key = cache_key_for(b"%PDF-1.4")
+    monkeypatch.setattr(config, setting, value)
+    pipeline_version.cache_clear()
+    assert pipeline_version() != before
+    assert cache_key_for(b"%PDF-1.4") != key
+
+
+def test_version_is_stable():
+    assert pipeline_version() == pipeline_version()
@@ -0,0 +1,110 @@
+"""
+Pipeline CV en graphe de dépendances : mêmes sorties que l'exécution séquentielle
+(`analyse_cv` avec CV_PIPELINE_PARALLEL=0), et une tâche en échec arrête ses dépendantes.
+Les tâches sont jouées par un LLM factice : crewai n'est pas nécessaire.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.crew.crew_pool import CV_TASKS, _arun_dag, _run_dag, _task_dependencies
+
+DEPENDENCIES = _task_dependencies(CV_TASKS)
+
+
+class StubLLM:
+    """Répond à une tâche à partir de son nom et des réponses des tâches dont elle dépend."""
+
+    def __init__(self, fail=None, delay=0.02):
+        self.fail = fail
+        self.delay = delay
+        self.outputs = {}
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def answer(self, name):
+        if name == self.fail:
+            raise RuntimeError(f"{name} en échec")
+        context = ", ".join(self.outputs[dependency] for dependency in sorted(DEPENDENCIES[name]))
+        self.outputs[name] = f"{name}({context})"
+        return self.outputs[name]
+
+    def execute(self, name):
+        with self._lock:
+            self.started.append(name)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return self.answer(name)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    async def aexecute(self, name):
+        self.started.append(name)
+        await asyncio.sleep(self.delay)
+        return self.answer(name)
+
+
+def sequential(llm):
+    """Ordre de `build_crew` : une tâche après l'autre, dans l'ordre de CV_TASKS."""
+    return {name: llm.answer(name) for name in CV_TASKS}
+
+
+def test_dag_matches_sequential_pipeline():
+    expected = sequential(StubLLM())
+    llm = StubLLM()
+    assert _run_dag(DEPENDENCIES, llm.execute) == expected
+    # Les extractions indépendantes tournent en parallèle
+    assert llm.peak > 1
+
+
+def test_async_dag_matches_sequential_pipeline():
+    expected = sequential(StubLLM())
+    assert asyncio.run(_arun_dag(DEPENDENCIES, StubLLM().aexecute)) == expected
+
+
+def dependents_of(failed):
+    found = {failed}
+    for name in CV_TASKS:
+        if DEPENDENCIES[name] & found:
+            found.add(name)
+    return found - {failed}
+
+
+@pytest.mark.parametrize("failed", ["task_extract_experience", "task_extract_skills"])
+def test_failed_task_skips_its_dependents(failed):
+    llm = StubLLM(fail=failed)
+    with pytest.raises(RuntimeError, match=failed):
+        _run_dag(DEPENDENCIES, llm.execute)
+    assert dependents_of(failed)
+    assert not dependents_of(failed) & set(llm.started)
+
+
+def test_failed_task_cancels_queued_tasks():
+    llm = StubLLM(fail=CV_TASKS[0])
+    with pytest.raises(RuntimeError):
+        _run_dag(DEPENDENCIES, llm.execute, max_workers=1)
+    # Le thread libéré a pu prendre une tâche de plus avant l'annulation, pas les suivantes
+    assert llm.started[0] == CV_TASKS[0]
+    assert len(llm.started) <= 2
+
+
+@pytest.mark.parametrize("failed", ["task_extract_experience", "task_extract_skills"])
+def test_async_failed_task_skips_its_dependents(failed):
+    llm = StubLLM(fail=failed)
+    with pytest.raises(RuntimeError, match=failed):
+        asyncio.run(_arun_dag(DEPENDENCIES, llm.aexecute))
+    assert not dependents_of(failed) & set(llm.started)
+
+
+def test_unknown_dependency_is_refused():
+    with pytest.raises(ValueError):
+        _run_dag({"b": {"a"}}, lambda name: name)
+    with pytest.raises(ValueError):
+        asyncio.run(_arun_dag({"b": {"a"}}, lambda name: name))
@@ -0,0 +1,27 @@
+"""Rapports de feedback : dates UTC explicites, taille de page bornée par l'API."""
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from src.feedback_store import FEEDBACK_PAGE_SIZE_MAX, _serialize, feedback_document
+
+
+def test_created_at_is_timezone_aware():
+    document = feedback_document("task-1", "rapport", [], ["Python"], user_id="u1")
+    assert document["created_at"].tzinfo is not None
+    assert document["created_at"].utcoffset().total_seconds() == 0
+
+
+def test_serialized_dates_carry_utc_offset():
+    # pymongo rend des dates naïves en UTC
+    stored = {"_id": "task-1", "created_at": datetime(2026, 1, 2, 3, 4, 5)}
+    assert _serialize(stored)["created_at"] == "2026-01-02T03:04:05+00:00"
+    stored = {"_id": "task-2", "created_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)}
+    assert _serialize(stored)["created_at"] == "2026-01-02T03:04:05+00:00"
+
+
+def test_page_size_above_maximum_is_rejected():
+    import main as api
+
+    response = TestClient(api.app).get("/feedbacks/", params={"user_id": "u1", "page_size": FEEDBACK_PAGE_SIZE_MAX + 1})
+    assert response.status_code == 422
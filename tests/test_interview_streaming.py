@@ -0,0 +1,53 @@
+"""Flux SSE d'un tour d'entretien : tokens du modèle dans l'ordre, puis `done` avec la réponse complète."""
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_interview_streaming import make_fake_llm, request_body
+
+
+@pytest.fixture
+def client():
+    import main as api
+    fake_llm = make_fake_llm(tokens=12, token_delay=0.0)
+    api.app.dependency_overrides[api.get_interview_llm] = lambda: fake_llm
+    yield TestClient(api.app)
+    api.app.dependency_overrides.pop(api.get_interview_llm, None)
+
+
+def read_events(response):
+    events, name = [], None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((name, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_stream_sends_tokens_then_done(client):
+    with client.stream("POST", "/simulate-interview/stream", json=request_body()) as response:
+        assert response.status_code == 200
+        events = read_events(response)
+
+    names = [name for name, _ in events]
+    assert names[-1] == "done"
+    assert names.count("done") == 1
+    assert names[:-1] and set(names[:-1]) == {"token"}
+
+    tokens = "".join(data["content"] for name, data in events if name == "token")
+    done = events[-1][1]
+    assert tokens == done["response"]
+    assert done["response"] == " ".join(f"mot{i}" for i in range(12))
+
+
+def test_blocking_call_waits_for_every_token():
+    fake_llm = make_fake_llm(tokens=5, token_delay=0.01)
+    start = time.perf_counter()
+    message = fake_llm.invoke([HumanMessage("Bonjour")])
+    assert message.content == "mot0 mot1 mot2 mot3 mot4"
+    # 5 mots et 4 espaces, un délai par token comme en streaming
+    assert time.perf_counter() - start >= 9 * 0.01
@@ -0,0 +1,49 @@
+"""Un PDF malformé donne toujours PdfIngestionError (400), jamais une erreur interne."""
+import io
+
+import pytest
+from pypdf import PdfWriter
+from pypdf._page import PageObject
+
+from src.pdf_ingestion import PdfIngestionError, PdfTooLargeError, extract_pdf_text
+
+
+def blank_pdf(pages=1) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("contents", [
+    b"pas un PDF",
+    b"",
+    blank_pdf()[:40],
+    blank_pdf().replace(b"/Pages", b"/Xages"),
+])
+def test_malformed_pdf_is_rejected(contents):
+    with pytest.raises(PdfIngestionError) as raised:
+        extract_pdf_text(contents)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("error", [KeyError("/Contents"), ValueError("flux invalide")])
+def test_errors_while_extracting_a_page_are_rejected(monkeypatch, error):
+    def broken(self, *args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(PageObject, "extract_text", broken)
+    with pytest.raises(PdfIngestionError, match="page 1"):
+        extract_pdf_text(blank_pdf())
+
+
+def test_limits_keep_their_status():
+    with pytest.raises(PdfTooLargeError) as raised:
+        extract_pdf_text(blank_pdf(pages=3), max_pages=2)
+    assert raised.value.status_code == 413
+
+
+def test_valid_pdf():
+    assert extract_pdf_text(blank_pdf(pages=2)) == "\n\n\n\n"
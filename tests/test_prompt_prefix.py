@@ -0,0 +1,45 @@
+"""Partie statique des prompts identique d'une session à l'autre (cache de préfixe du fournisseur)."""
+import pytest
+
+from benchmarks import check_prompt_prefix as prefix_check
+from src.crew.crew_pool import CV_TASKS
+from src.interview_simulator import entretient_version_prod as interview
+from src.prompt_layout import assemble, check_static, cv_task_description, split_session_part
+
+SESSIONS = 6
+
+
+def test_interview_prompts_share_static_instructions():
+    errors = []
+    static_part = interview.load_instructions()
+    prompts = prefix_check.interview_prompts(SESSIONS)
+    prefix_check.check("entretien", static_part, prompts, errors)
+    assert errors == []
+    assert len(set(prompts)) == SESSIONS
+
+
+@pytest.mark.parametrize("name", CV_TASKS)
+def test_cv_task_prompts_share_static_instructions(name):
+    errors = []
+    static_part, prompts = prefix_check.task_prompts(name, SESSIONS, errors)
+    prefix_check.check(name, static_part, prompts, errors)
+    assert errors == []
+
+
+def test_check_reports_a_session_dependent_prefix():
+    errors = []
+    prefix_check.check("modifié", "Consignes", ["Consignes A", "Autre début"], errors)
+    assert errors[0].startswith("modifié : la session 1")
+
+
+def test_static_part_refuses_fields():
+    with pytest.raises(ValueError):
+        check_static("Consignes pour {poste}")
+    assert check_static("Accolades {{doublées}}") == "Accolades {{doublées}}"
+
+
+def test_session_part_starts_at_cv_block():
+    prompt = cv_task_description("Extrais les compétences.").format(cv_content="Jean Dupont")
+    static_part, session_part = split_session_part(prompt)
+    assert static_part == assemble("Extrais les compétences.", "")
+    assert session_part.endswith("Jean Dupont")
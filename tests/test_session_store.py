@@ -0,0 +1,58 @@
+"""Sessions d'entretien en mémoire : historique en ajout seul, avertissement multi-workers."""
+import asyncio
+import logging
+
+from src.interview_simulator.session_store import (
+    InMemorySessionStore, configured_workers, messages_to_transcript, warn_if_process_local,
+)
+
+
+def message(kind, content):
+    return {"type": kind, "data": {"content": content}}
+
+
+def test_history_is_append_only():
+    async def scenario():
+        store = InMemorySessionStore(max_sessions=10, ttl_seconds=60)
+        turn = [message("human", "Bonjour"), message("ai", "Bonjour, présentez-vous.")]
+        await store.create("s1", {"user_id": "u1"}, [])
+        await store.append_messages("s1", turn)
+        before = await store.get("s1")
+        turn[0]["data"]["content"] = "modifié après l'ajout"
+        assert await store.append_messages("s1", [message("human", "Je suis développeur.")])
+        after = await store.get("s1")
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert len(before["messages"]) == 2
+    assert len(after["messages"]) == 3
+    # Messages copiés une fois à l'ajout, puis partagés entre les lectures
+    assert after["messages"][0] is before["messages"][0]
+    assert messages_to_transcript(after["messages"]) == [
+        {"role": "user", "content": "Bonjour"},
+        {"role": "assistant", "content": "Bonjour, présentez-vous."},
+        {"role": "user", "content": "Je suis développeur."},
+    ]
+
+
+def test_unknown_session():
+    store = InMemorySessionStore()
+    assert asyncio.run(store.get("absente")) is None
+    assert asyncio.run(store.append_messages("absente", [])) is False
+
+
+def test_configured_workers(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert configured_workers(["uvicorn", "main:app"]) == 1
+    assert configured_workers(["uvicorn", "main:app", "--workers", "4"]) == 4
+    assert configured_workers(["uvicorn", "main:app", "--workers=3"]) == 3
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    assert configured_workers(["gunicorn", "main:app"]) == 2
+
+
+def test_warns_for_memory_store_with_several_workers(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert warn_if_process_local(InMemorySessionStore(), workers=4)
+        assert not warn_if_process_local(InMemorySessionStore(), workers=1)
+        assert not warn_if_process_local(object(), workers=4)
+    assert len(caplog.records) == 1
@@ -0,0 +1,75 @@
+"""Lot d'analyses en échec : chaque analyse est rejouée seule avant d'être marquée en échec."""
+import pytest
+
+pytest.importorskip("celery_batches")
+
+import tasks.worker_celery as worker
+from tasks.local_harness import CONVERSATION, JOB_REQUIREMENTS, configure_in_memory, echo_batch
+
+POISON = [{"role": "user", "content": "fait planter le modèle"}]
+
+
+def failing_on_poison(items):
+    if any(conversation == POISON for conversation, _ in items):
+        raise RuntimeError("conversation invalide")
+    return echo_batch(items)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    calls = []
+
+    def handle(items):
+        calls.append(len(items))
+        return failing_on_poison(items)
+
+    monkeypatch.setattr(worker, "analysis_batch_handler", handle)
+    return calls
+
+
+def test_whole_batch_when_it_succeeds(handler):
+    reports = worker.analyse_items([(CONVERSATION, JOB_REQUIREMENTS)] * 3)
+    assert [report["batch_size"] for report in reports] == [3, 3, 3]
+    assert handler == [3]
+
+
+def test_failed_batch_is_replayed_item_by_item(handler):
+    items = [(CONVERSATION, JOB_REQUIREMENTS), (POISON, JOB_REQUIREMENTS), (CONVERSATION, JOB_REQUIREMENTS)]
+    reports = worker.analyse_items(items)
+    assert handler == [3, 1, 1, 1]
+    assert reports[0] == {"batch_size": 1, "turns": len(CONVERSATION)}
+    assert isinstance(reports[1], RuntimeError)
+    assert reports[2] == {"batch_size": 1, "turns": len(CONVERSATION)}
+
+
+def test_single_item_is_not_replayed(handler):
+    reports = worker.analyse_items([(POISON, JOB_REQUIREMENTS)])
+    assert handler == [1]
+    assert isinstance(reports[0], RuntimeError)
+
+
+def test_worker_marks_only_the_failing_analysis(monkeypatch):
+    from celery.contrib.testing.worker import start_worker
+    from celery.signals import worker_process_init
+
+    app = worker.celery_app
+    configure_in_memory(app)
+    monkeypatch.setattr(worker, "analysis_batch_handler", failing_on_poison)
+    monkeypatch.setattr(worker, "save_feedbacks", lambda documents: None)
+    worker_process_init.disconnect(worker.warmup_models)
+    try:
+        with start_worker(app, pool="solo", concurrency=1, perform_ping_check=False, queues=[worker.ANALYSIS_QUEUE]):
+            results = [
+                worker.run_interview_analysis_task.delay(conversation, JOB_REQUIREMENTS, user_id=f"user-{i}")
+                for i, conversation in enumerate([CONVERSATION, POISON, CONVERSATION])
+            ]
+            outcomes = []
+            for result in results:
+                try:
+                    outcomes.append(result.get(timeout=30))
+                except RuntimeError as e:
+                    outcomes.append(e)
+    finally:
+        worker_process_init.connect(worker.warmup_models)
+    assert isinstance(outcomes[1], RuntimeError)
+    assert [outcome["turns"] for outcome in (outcomes[0], outcomes[2])] == [len(CONVERSATION)] * 2